@@ -1,6 +1,12 @@
-from .baseline_config import BaselineConfig
+from .baseline_config import BaselineConfig, SeededGraphEvaluator, EvaluationFactory
+from .baseline_result_cache import BaselineResultCache, hash_operation_array
 from .baseline_strategy import BaselineStrategy
 from .baseline_strategy_exception import BaselineStrategyException
+from .exact_graph_evaluator import ExactGraphEvaluator, ExactGraphEvaluatorException
+from .exhaustive_baseline_config import ExhaustiveBaselineConfig, estimate_n_thoughts, create_feasible_prefix_predicate
+from .exhaustive_baseline_strategy import ExhaustiveBaselineStrategy
+from .parallel_tempering_baseline_config import ParallelTemperingBaselineConfig
+from .parallel_tempering_baseline_strategy import ParallelTemperingBaselineStrategy
 from .random_baseline_strategy import RandomBaselineStrategy
 from .simulated_annealing_baseline_config import SimulatedAnnealingBaselineConfig
 from .simulated_annealing_baseline_strategy import SimulatedAnnealingBaselineStrategy
@@ -1,10 +1,17 @@
 from dataclasses import dataclass, field
-from typing import Sequence, Callable, Optional
+from typing import Sequence, Callable, Optional, Hashable, Tuple
 
 from pure_graph_of_thoughts.api.graph.operation import GraphOfOperations
 from pure_graph_of_thoughts.api.operation import Operation
+from .baseline_result_cache import BaselineResultCache
 from .model import BaselineIterationResult
 
+SeededGraphEvaluator = Callable[[GraphOfOperations, int, int], BaselineIterationResult]
+"""A graph evaluator receiving the graph of operations, the iteration and the seed of the evaluation."""
+
+EvaluationFactory = Callable[[], Tuple[Sequence[Operation], SeededGraphEvaluator]]
+"""A picklable factory of the operations and a seeded graph evaluator, invoked once in each worker process."""
+
 
 @dataclass(frozen=True, kw_only=True)
 class BaselineConfig:
@@ -29,3 +36,25 @@ class BaselineConfig:
 
     seed: Optional[int] = field(default=None)
     """The seed for random number generator"""
+
+    max_workers: int = field(default=1)
+    """The maximum number of worker processes evaluating graphs, only used with a factory of the evaluation"""
+
+    create_evaluation: Optional[EvaluationFactory] = field(default=None)
+    """
+    The factory of the operations and a seeded graph evaluator to evaluate the graphs with instead of the evaluator,
+    the seeds are drawn in iteration order, hence, the results do not depend on the number of worker processes
+    """
+
+    result_cache: Optional[BaselineResultCache] = field(default=None)
+    """
+    The cache of the results of structurally identical graphs, graphs are always evaluated if absent,
+    a cached result replaces the evaluation of a graph,
+    hence, caching is only sound for deterministic or seeded evaluations
+    """
+
+    evaluation_key: Optional[Hashable] = field(default=None)
+    """
+    The key identifying the graph evaluator and the seed of its evaluations in the result cache,
+    cached results are only shared among executions with equal keys, required if a result cache is present
+    """
@@ -0,0 +1,112 @@
+import hashlib
+import json
+from threading import Lock
+from typing import Dict, Tuple, Optional, Hashable
+
+from pure_graph_of_thoughts.api.graph.operation import OperationArray, GraphOfOperations
+from .model import BaselineIterationResult
+
+
+def hash_operation_array(operation_array: OperationArray) -> str:
+    """
+    Creates the canonical hash of an operation array.
+    The hash is built from the keys of the operations in layer order,
+    hence, it is stable across processes and equal for structurally identical graphs of operations.
+    :param operation_array: operation array
+    :return: canonical hash
+    """
+    canonical = json.dumps(
+            [
+                [
+                    [operation.name, operation.n_inputs, operation.n_outputs, operation.type.name]
+                    for operation in layer
+                ]
+                for layer in operation_array
+            ],
+            separators=(',', ':')
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class BaselineResultCache:
+    """
+    A cache of baseline iteration results keyed by the canonical hash of the graph of operations
+    and the key of the evaluation, which identifies the graph evaluator and its seed.
+    The cache may be shared by the strategies of multiple baseline executions, as well as by concurrent evaluations,
+    results are only shared among evaluations with equal keys.
+    """
+
+    _results: Dict[Tuple[str, Hashable], BaselineIterationResult]
+    _lock: Lock
+    _n_hits: int
+    _n_misses: int
+
+    @property
+    def n_entries(self) -> int:
+        """The number of cached results"""
+        return len(self._results)
+
+    @property
+    def n_hits(self) -> int:
+        """The number of cache hits"""
+        return self._n_hits
+
+    @property
+    def n_misses(self) -> int:
+        """The number of cache misses"""
+        return self._n_misses
+
+    @property
+    def hit_rate(self) -> float:
+        """The rate of cache hits among all lookups"""
+        n_lookups = self._n_hits + self._n_misses
+        return self._n_hits / n_lookups if n_lookups > 0 else 0.0
+
+    def __init__(self) -> None:
+        """
+        Instantiates a new baseline result cache.
+        """
+        self._results = {}
+        self._lock = Lock()
+        self._n_hits = 0
+        self._n_misses = 0
+
+    def lookup(
+            self, graph_of_operations: GraphOfOperations, evaluation_key: Hashable
+    ) -> Optional[BaselineIterationResult]:
+        """
+        Looks up the cached result of a graph of operations.
+        :param graph_of_operations: graph of operations
+        :param evaluation_key: key of the evaluation
+        :return: cached result if present
+        """
+        key = (hash_operation_array(graph_of_operations.operation_array), evaluation_key)
+        with self._lock:
+            result = self._results.get(key)
+            if result is None:
+                self._n_misses += 1
+            else:
+                self._n_hits += 1
+        return result
+
+    def store(
+            self, graph_of_operations: GraphOfOperations, evaluation_key: Hashable, result: BaselineIterationResult
+    ) -> None:
+        """
+        Stores the result of a graph of operations.
+        :param graph_of_operations: graph of operations
+        :param evaluation_key: key of the evaluation
+        :param result: result to store
+        """
+        key = (hash_operation_array(graph_of_operations.operation_array), evaluation_key)
+        with self._lock:
+            self._results[key] = result
+
+    def clear(self) -> None:
+        """
+        Removes all cached results and resets the statistics.
+        """
+        with self._lock:
+            self._results.clear()
+            self._n_hits = 0
+            self._n_misses = 0
@@ -1,11 +1,16 @@
 import logging
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
+from dataclasses import replace
 from random import Random
-from typing import Sequence, Callable, List, Optional
+from typing import Sequence, Callable, List, Optional, Deque, Hashable, Tuple
 
-from pure_graph_of_thoughts.api.graph.operation import GraphOfOperations
+from pure_graph_of_thoughts.api.graph.operation import GraphOfOperations, OperationGraphSchema
 from pure_graph_of_thoughts.api.operation import Operation
-from .baseline_config import BaselineConfig
+from .baseline_config import BaselineConfig, EvaluationFactory, SeededGraphEvaluator
+from .baseline_result_cache import BaselineResultCache
+from .baseline_strategy_exception import BaselineStrategyException
 from .graph_generator import GraphGenerator
 from .model import BaselineIterationResult, BaselineResultSummary
 
@@ -22,19 +27,41 @@ class BaselineStrategy(ABC):
     _graph_candidates: List[GraphOfOperations]
     _random: Random
     _logger: logging.Logger
+    _result_cache: Optional[BaselineResultCache]
+    _evaluation_key: Optional[Hashable]
+    _n_duplicates: int
+    _seeded_evaluation: Optional[Tuple[Sequence[Operation], SeededGraphEvaluator]]
+
+    @property
+    def n_duplicates(self) -> int:
+        """The number of results of structurally identical graphs taken from the result cache"""
+        return self._n_duplicates
 
     def __init__(self, config: BaselineConfig) -> None:
         """
         Instantiates a new baseline strategy.
         :param config: baseline strategy configuration
         """
+        if config.max_workers < 1:
+            raise BaselineStrategyException('Maximum number of workers must be positive')
+        if config.result_cache is not None and config.evaluation_key is None:
+            raise BaselineStrategyException('Evaluation key must be present if a result cache is present')
         self._config = config
         self._operations = config.operations
         self._graph_generator = GraphGenerator(config.operations, config.seed)
-        self._evaluate_graph = config.evaluate_graph
+        self._result_cache = config.result_cache
+        self._evaluation_key = config.evaluation_key
+        if config.create_evaluation is not None:
+            self._evaluate_graph = self._evaluate_graph_seeded
+        elif self._result_cache is not None:
+            self._evaluate_graph = self._evaluate_graph_cached
+        else:
+            self._evaluate_graph = config.evaluate_graph
         self._graph_candidates = []
         self._random = Random(config.seed)
         self._logger = logging.getLogger(self.__class__.__name__)
+        self._n_duplicates = 0
+        self._seeded_evaluation = None
 
     @abstractmethod
     def generate(self, max_iterations: int, stop_on_first_valid: bool = False) -> BaselineResultSummary:
@@ -55,6 +82,226 @@ class BaselineStrategy(ABC):
         """
         pass
 
+    def _evaluate_graph_cached(self, graph_of_operations: GraphOfOperations, iteration: int) -> BaselineIterationResult:
+        """
+        Evaluates a graph of operations,
+        unless the result of a structurally identical graph with the same evaluation key is cached.
+        :param graph_of_operations: graph of operations to evaluate
+        :param iteration: current iteration
+        :return: baseline iteration result
+        """
+        cached_result = self._lookup_cached(graph_of_operations, iteration)
+        if cached_result is not None:
+            return cached_result
+        iteration_result = self._config.evaluate_graph(graph_of_operations, iteration)
+        self._store_cached(graph_of_operations, iteration_result)
+        return iteration_result
+
+    def _lookup_cached(
+            self, graph_of_operations: GraphOfOperations, iteration: int
+    ) -> Optional[BaselineIterationResult]:
+        """
+        Looks up the cached result of a structurally identical graph with the same evaluation key.
+        :param graph_of_operations: graph of operations to look up
+        :param iteration: current iteration
+        :return: cached result with the current iteration (if present)
+        """
+        if self._result_cache is None:
+            raise BaselineStrategyException('Result cache is None')
+        cached_result = self._result_cache.lookup(graph_of_operations, self._evaluation_key)
+        if cached_result is None:
+            return None
+        self._n_duplicates += 1
+        return replace(cached_result, iteration=iteration)
+
+    def _store_cached(self, graph_of_operations: GraphOfOperations, iteration_result: BaselineIterationResult) -> None:
+        """
+        Stores the result of an evaluated graph in the result cache.
+        :param graph_of_operations: evaluated graph of operations
+        :param iteration_result: result of the evaluation
+        """
+        if self._result_cache is None:
+            raise BaselineStrategyException('Result cache is None')
+        self._result_cache.store(graph_of_operations, self._evaluation_key, iteration_result)
+
+    def _draw_evaluation_seed(self) -> int:
+        """
+        Draws the seed of the next evaluation of a seeded graph evaluator.
+        :return: seed
+        """
+        return self._random.getrandbits(32)
+
+    def _evaluate_seeded(
+            self, graph_of_operations: GraphOfOperations, iteration: int, seed: int
+    ) -> BaselineIterationResult:
+        """
+        Evaluates a graph of operations in this process by the seeded graph evaluator of the factory of the evaluation.
+        The graph is rebuilt from its schema, like in a worker process, hence, the results equal the ones of workers.
+        :param graph_of_operations: graph of operations to evaluate
+        :param iteration: current iteration
+        :param seed: seed of the evaluation
+        :return: baseline iteration result
+        """
+        if self._seeded_evaluation is None:
+            if self._config.create_evaluation is None:
+                raise BaselineStrategyException('Factory of the evaluation is None')
+            self._seeded_evaluation = self._config.create_evaluation()
+        operations, evaluate_seeded_graph = self._seeded_evaluation
+        return evaluate_seeded_graph(
+                GraphOfOperations.from_schema(graph_of_operations.to_schema(), operations), iteration, seed
+        )
+
+    def _generate_independent(
+            self,
+            max_iterations: int,
+            stop_on_first_valid: bool,
+            create_graph: Callable[[int], GraphOfOperations],
+            evaluate_graph: Callable[[GraphOfOperations, int], BaselineIterationResult]
+    ) -> BaselineResultSummary:
+        """
+        Generates a baseline result from independent iterations.
+        The graphs are created in iteration order, hence, they only depend on the seed.
+        If a factory of the evaluation and multiple workers are configured, the graphs are evaluated by a pool of
+        worker processes, and the seed of each evaluation is drawn after its graph, like the seeded evaluation does.
+        Otherwise, the graphs are evaluated sequentially.
+        The results are merged in iteration order, and if the generation is stopped on the first valid result,
+        the evaluations of subsequent iterations are cancelled.
+        :param max_iterations: maximum number of iterations
+        :param stop_on_first_valid: whether to stop on the first valid result
+        :param create_graph: creates the graph of operations of an iteration
+        :param evaluate_graph: evaluates the graph of operations of an iteration, unless evaluated by worker processes
+        :return: baseline result
+        """
+        iteration_results: List[BaselineIterationResult] = []
+        create_evaluation = self._config.create_evaluation
+        if create_evaluation is None or self._config.max_workers == 1:
+            for i in range(1, max_iterations + 1):
+                iteration_result = evaluate_graph(create_graph(i), i)
+                iteration_results.append(iteration_result)
+                if stop_on_first_valid and iteration_result.is_valid:
+                    return self._summarize(iteration_results, max_iterations, stop_on_first_valid=True)
+            return self._summarize(iteration_results, max_iterations)
+
+        max_pending = 2 * self._config.max_workers
+        with ProcessPoolExecutor(
+                max_workers=self._config.max_workers,
+                initializer=_initialize_worker,
+                initargs=(create_evaluation,)
+        ) as executor:
+            pending: Deque[Tuple[GraphOfOperations, Future[BaselineIterationResult], bool, int]] = deque()
+            next_iteration = 1
+            while next_iteration <= max_iterations or len(pending) > 0:
+                while next_iteration <= max_iterations and len(pending) < max_pending:
+                    pending.append(self._submit(executor, create_graph(next_iteration), next_iteration))
+                    next_iteration += 1
+                iteration_result = self._merge(*pending.popleft())
+                iteration_results.append(iteration_result)
+                if stop_on_first_valid and iteration_result.is_valid:
+                    for _, pending_future, _, _ in pending:
+                        pending_future.cancel()
+                    return self._summarize(iteration_results, max_iterations, stop_on_first_valid=True)
+        return self._summarize(iteration_results, max_iterations)
+
+    def _evaluate_graph_seeded(self, graph_of_operations: GraphOfOperations, iteration: int) -> BaselineIterationResult:
+        """
+        Evaluates a graph of operations in this process by the seeded graph evaluator with the next drawn seed,
+        unless the result of a structurally identical graph with the same evaluation key is cached.
+        The seed is drawn in either case, hence, the seeds do not depend on the result cache.
+        :param graph_of_operations: graph of operations to evaluate
+        :param iteration: current iteration
+        :return: baseline iteration result
+        """
+        seed = self._draw_evaluation_seed()
+        if self._result_cache is None:
+            return self._evaluate_seeded(graph_of_operations, iteration, seed)
+        cached_result = self._lookup_cached(graph_of_operations, iteration)
+        if cached_result is not None:
+            return cached_result
+        iteration_result = self._evaluate_seeded(graph_of_operations, iteration, seed)
+        self._store_cached(graph_of_operations, iteration_result)
+        return iteration_result
+
+    def _submit(
+            self, executor: ProcessPoolExecutor, graph_of_operations: GraphOfOperations, iteration: int
+    ) -> Tuple[GraphOfOperations, Future[BaselineIterationResult], bool, int]:
+        """
+        Submits the evaluation of a graph of operations to a worker process, unless its result is cached.
+        The seed of the evaluation is drawn in either case, like the seeded evaluation in this process does.
+        :param executor: pool of worker processes
+        :param graph_of_operations: graph of operations to evaluate
+        :param iteration: current iteration
+        :return: graph of operations, future of its result, whether the result is cached and iteration
+        """
+        seed = self._draw_evaluation_seed()
+        cached_result = self._lookup_cached(graph_of_operations, iteration) if self._result_cache is not None else None
+        if cached_result is not None:
+            future: Future[BaselineIterationResult] = Future()
+            future.set_result(cached_result)
+            return graph_of_operations, future, True, iteration
+        return graph_of_operations, executor.submit(
+                _evaluate_in_worker, graph_of_operations.to_schema(), iteration, seed
+        ), False, iteration
+
+    def _merge(
+            self,
+            graph_of_operations: GraphOfOperations,
+            future: Future[BaselineIterationResult],
+            is_cached: bool,
+            iteration: int
+    ) -> BaselineIterationResult:
+        """
+        Merges the result of a submitted iteration in iteration order.
+        The result cache is looked up again, as a structurally identical graph may have been evaluated meanwhile,
+        hence, the results from the cache equal the ones of the sequential evaluation.
+        :param graph_of_operations: submitted graph of operations
+        :param future: future of the result
+        :param is_cached: whether the result was taken from the cache on submission
+        :param iteration: submitted iteration
+        :return: baseline iteration result
+        """
+        if self._result_cache is None or is_cached:
+            return future.result()
+        cached_result = self._lookup_cached(graph_of_operations, iteration)
+        if cached_result is not None:
+            future.cancel()
+            return cached_result
+        iteration_result = future.result()
+        self._store_cached(graph_of_operations, iteration_result)
+        return iteration_result
+
+    def _summarize(
+            self,
+            iteration_results: Sequence[BaselineIterationResult],
+            max_iterations: int,
+            stop_on_first_valid: bool = False
+    ) -> BaselineResultSummary:
+        """
+        Summarizes the iteration results.
+        If the generation was stopped on the first valid result, the last result is final,
+        otherwise, the valid result with the lowest cost is final.
+        :param iteration_results: iteration results
+        :param max_iterations: maximum number of iterations
+        :param stop_on_first_valid: whether the generation was stopped on the first valid result
+        :return: baseline result
+        """
+        if stop_on_first_valid:
+            return BaselineResultSummary(
+                    results=iteration_results,
+                    final_result_index=len(iteration_results) - 1,
+                    max_iterations=max_iterations,
+                    stop_on_first_valid=True,
+                    n_duplicates=self._n_duplicates
+            )
+        final_result: Optional[BaselineIterationResult] = self._find_valid_min_cost(iteration_results)
+        return BaselineResultSummary(
+                results=iteration_results,
+                final_result_index=iteration_results.index(
+                        final_result
+                ) if final_result is not None else None,
+                max_iterations=max_iterations,
+                n_duplicates=self._n_duplicates
+        )
+
     @staticmethod
     def _find_valid_min_cost(iteration_results: Sequence[BaselineIterationResult]) -> Optional[BaselineIterationResult]:
         """
@@ -70,3 +317,32 @@ class BaselineStrategy(ABC):
                 valid_results,
                 key=lambda baseline_result: baseline_result.cost
         ) if len(valid_results) > 0 else None
+
+
+_worker_evaluation: Optional[Tuple[Sequence[Operation], SeededGraphEvaluator]] = None
+"""The operations and the seeded graph evaluator of a worker process"""
+
+
+def _initialize_worker(create_evaluation: EvaluationFactory) -> None:
+    """
+    Initializes a worker process by creating its operations and seeded graph evaluator.
+    :param create_evaluation: factory of the operations and the seeded graph evaluator
+    """
+    global _worker_evaluation
+    _worker_evaluation = create_evaluation()
+
+
+def _evaluate_in_worker(
+        graph_of_operations: OperationGraphSchema, iteration: int, seed: int
+) -> BaselineIterationResult:
+    """
+    Evaluates a graph of operations in a worker process.
+    :param graph_of_operations: schema of the graph of operations to evaluate
+    :param iteration: current iteration
+    :param seed: seed of the evaluation
+    :return: baseline iteration result
+    """
+    if _worker_evaluation is None:
+        raise BaselineStrategyException('Worker process is not initialized')
+    operations, evaluate_seeded_graph = _worker_evaluation
+    return evaluate_seeded_graph(GraphOfOperations.from_schema(graph_of_operations, operations), iteration, seed)
@@ -0,0 +1,306 @@
+import json
+from collections import deque
+from dataclasses import dataclass
+from random import Random
+from typing import Sequence, Dict, List, Tuple, Set, Deque, Callable, Hashable, Optional
+
+from pure_graph_of_thoughts.api.graph.operation import GraphOfOperations, OperationNode
+from pure_graph_of_thoughts.api.operation import PromptOperation, ExecOperation, ScorePromptOperation
+from pure_graph_of_thoughts.api.state import State
+from pure_graph_of_thoughts.api.task import Task
+from .model import ExactGraphEvaluation
+from ..language_model import SeededSimulatedLanguageModel
+
+
+class ExactGraphEvaluatorException(Exception):
+    """
+    An exception raised in context of the exact evaluation of a graph of operations.
+    """
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+
+
+@dataclass(frozen=True)
+class _BranchThought:
+    state: State
+    key: Hashable
+    is_reachable: bool
+    layer_index: int
+
+
+@dataclass(frozen=True)
+class _Branch:
+    probability: float
+    outputs: Dict[OperationNode, Sequence[_BranchThought]]
+    sink_layer_index: int
+    sink_thoughts: Sequence[_BranchThought]
+
+    @property
+    def key(self) -> Hashable:
+        return (
+            tuple(tuple(thought.key for thought in thoughts) for thoughts in self.outputs.values()),
+            self.sink_layer_index,
+            tuple(thought.key for thought in self.sink_thoughts)
+        )
+
+
+@dataclass(frozen=True)
+class _NodePlan:
+    node: OperationNode
+    inputs: Sequence[Tuple[OperationNode, int, int]]
+    released: Sequence[OperationNode]
+
+
+class ExactGraphEvaluator:
+    """
+    An evaluator computing the exact solve probability of a graph of operations under a simulated language model.
+    Instead of sampling executions, each prompt is branched into its correct and incorrect answer,
+    weighted by the probability of the simulated behavior.
+    Branches resulting in identical thoughts are merged, hence, the number of tracked branches stays small
+    for the deterministic answers of the simulations.
+    The graph of operations is traversed in the same order and with the same input thoughts
+    as executed by the complete graph controller, and the final thoughts are evaluated like in the environment:
+    The task is solved if the sink layer of the graph of thoughts consists of a single correct thought.
+    """
+
+    _task: Task
+    _language_model: SeededSimulatedLanguageModel
+
+    def __init__(self, task: Task, language_model: SeededSimulatedLanguageModel) -> None:
+        """
+        Instantiates a new exact graph evaluator.
+        :param task: task to solve
+        :param language_model: simulated language model providing the probabilities and answers
+        """
+        self._task = task
+        self._language_model = language_model
+
+    def evaluate(self, graph_of_operations: GraphOfOperations, init_state: State) -> ExactGraphEvaluation:
+        """
+        Evaluates a graph of operations for a given initial state.
+        :param graph_of_operations: graph of operations to evaluate
+        :param init_state: initial state
+        :return: exact evaluation
+        """
+        plans = self._create_plans(graph_of_operations)
+        source_thought = self._create_thought(init_state, True, 0)
+        branches: List[_Branch] = [
+            _Branch(probability=1.0, outputs={}, sink_layer_index=0, sink_thoughts=[source_thought])
+        ]
+        expected_cost = 1.0
+        n_branches = 1
+
+        for plan in plans:
+            answers: Dict[Hashable, Sequence[Tuple[float, Sequence[State]]]] = {}
+            merged_branches: Dict[Hashable, _Branch] = {}
+            for branch in branches:
+                input_thoughts = [source_thought] if plan.node.is_source else [
+                    thought
+                    for predecessor, start, stop in plan.inputs
+                    for thought in branch.outputs.get(predecessor, [])[start:stop]
+                ]
+                input_key = tuple(thought.key for thought in input_thoughts)
+                if input_key not in answers:
+                    answers[input_key] = self._process_operation(plan.node, [thought.state for thought in input_thoughts])
+                is_reachable = any(thought.is_reachable for thought in input_thoughts)
+                layer_index = input_thoughts[0].layer_index + 1 if len(input_thoughts) > 0 else 0
+
+                for probability, output_states in answers[input_key]:
+                    output_thoughts = [
+                        self._create_thought(output_state, is_reachable, layer_index) for output_state in output_states
+                    ]
+                    next_branch = self._create_branch(
+                            branch, plan, branch.probability * probability, output_thoughts, is_reachable, layer_index
+                    )
+                    if is_reachable:
+                        expected_cost += next_branch.probability * len(output_thoughts)
+                    key = next_branch.key
+                    if key in merged_branches:
+                        merged_branch = merged_branches[key]
+                        merged_branches[key] = _Branch(
+                                probability=merged_branch.probability + next_branch.probability,
+                                outputs=merged_branch.outputs,
+                                sink_layer_index=merged_branch.sink_layer_index,
+                                sink_thoughts=merged_branch.sink_thoughts
+                        )
+                    else:
+                        merged_branches[key] = next_branch
+            branches = list(merged_branches.values())
+            n_branches = max(n_branches, len(branches))
+
+        solve_probability = sum(
+                branch.probability for branch in branches
+                if len(branch.sink_thoughts) == 1 and self._task.evaluator.evaluate(
+                        init_state, branch.sink_thoughts[0].state
+                )
+        )
+        return ExactGraphEvaluation(
+                solve_probability=min(solve_probability, 1.0),
+                expected_cost=expected_cost,
+                n_branches=n_branches
+        )
+
+    def evaluate_complexity(
+            self,
+            graph_of_operations: GraphOfOperations,
+            complexity: int,
+            generate_init_state: Callable[[Random, Sequence[int], Task], Tuple[int, State]],
+            n_init_states: int = 1,
+            seed: Optional[int] = None
+    ) -> ExactGraphEvaluation:
+        """
+        Evaluates a graph of operations for a given complexity.
+        The evaluation is exact with respect to the language model, but averaged over the generated initial states.
+        :param graph_of_operations: graph of operations to evaluate
+        :param complexity: complexity of the initial states
+        :param generate_init_state: generator of initial states
+        :param n_init_states: number of initial states to average over
+        :param seed: seed of the initial state generation
+        :return: exact evaluation averaged over the initial states
+        """
+        if n_init_states < 1:
+            raise ExactGraphEvaluatorException('Number of initial states must be positive')
+        rnd = Random(seed)
+        evaluations = [
+            self.evaluate(graph_of_operations, generate_init_state(rnd, [complexity], self._task)[1])
+            for _ in range(n_init_states)
+        ]
+        return ExactGraphEvaluation(
+                solve_probability=sum(evaluation.solve_probability for evaluation in evaluations) / n_init_states,
+                expected_cost=sum(evaluation.expected_cost for evaluation in evaluations) / n_init_states,
+                n_branches=max(evaluation.n_branches for evaluation in evaluations)
+        )
+
+    def _process_operation(
+            self, operation_node: OperationNode, input_states: Sequence[State]
+    ) -> Sequence[Tuple[float, Sequence[State]]]:
+        """
+        Processes an operation with all possible answers of the language model.
+        :param operation_node: operation node to process
+        :param input_states: input states
+        :return: probability and output states of each possible answer
+        """
+        operation = operation_node.operation
+        if isinstance(operation, PromptOperation):
+            if operation.is_scorable and isinstance(operation.score_operation, ScorePromptOperation):
+                raise ExactGraphEvaluatorException(f'Prompted score operations are not supported: {operation}')
+            behaviors = self._language_model.simulated_behaviors
+            if operation.prompt not in behaviors:
+                raise ExactGraphEvaluatorException(f'No simulated behavior found for prompt {operation.prompt}')
+            behavior = behaviors[operation.prompt]
+            input_state = operation.transform_before(input_states)
+            probability = behavior.probability(operation.prompt, input_state)
+            answers: List[Tuple[float, Sequence[State]]] = []
+            if probability > 0.0:
+                answers.append((
+                    probability,
+                    operation.transform_after(behavior.mocked_correct_behavior(operation.prompt, input_state))
+                ))
+            if probability < 1.0:
+                answers.append((
+                    1.0 - probability,
+                    operation.transform_after(behavior.mocked_incorrect_behavior(operation.prompt, input_state))
+                ))
+            return answers
+        elif isinstance(operation, ExecOperation):
+            return [(1.0, operation.execute(input_states))]
+        raise ExactGraphEvaluatorException(f'Operation is not supported: {type(operation)}')
+
+    @staticmethod
+    def _create_branch(
+            branch: _Branch,
+            plan: _NodePlan,
+            probability: float,
+            output_thoughts: Sequence[_BranchThought],
+            is_reachable: bool,
+            layer_index: int
+    ) -> _Branch:
+        """
+        Creates the branch resulting from processing an operation node.
+        :param branch: branch the operation node is processed in
+        :param plan: plan of the operation node
+        :param probability: probability of the resulting branch
+        :param output_thoughts: output thoughts of the operation node
+        :param is_reachable: whether the output thoughts are reachable from the source
+        :param layer_index: layer index of the output thoughts
+        :return: resulting branch
+        """
+        outputs = dict(branch.outputs)
+        outputs[plan.node] = output_thoughts
+        for released_node in plan.released:
+            del outputs[released_node]
+
+        sink_layer_index = branch.sink_layer_index
+        sink_thoughts = branch.sink_thoughts
+        if is_reachable and len(output_thoughts) > 0 and layer_index >= sink_layer_index:
+            if layer_index > sink_layer_index:
+                sink_layer_index = layer_index
+                sink_thoughts = output_thoughts
+            else:
+                sink_thoughts = [*sink_thoughts, *output_thoughts]
+        return _Branch(
+                probability=probability,
+                outputs=outputs,
+                sink_layer_index=sink_layer_index,
+                sink_thoughts=sink_thoughts
+        )
+
+    @staticmethod
+    def _create_plans(graph_of_operations: GraphOfOperations) -> Sequence[_NodePlan]:
+        """
+        Creates the plans of all operation nodes in order of the breadth-first traversal of the controller.
+        The input thoughts of a node are the bucket of each predecessor's output thoughts assigned to the node,
+        and the output thoughts of a node are released once all of its successors are processed.
+        :param graph_of_operations: graph of operations
+        :return: plans of the operation nodes
+        """
+        order: List[OperationNode] = []
+        visited: Set[OperationNode] = set()
+        queue: Deque[OperationNode] = deque([graph_of_operations.source])
+        while queue:
+            operation_node = queue.popleft()
+            if operation_node not in visited:
+                order.append(operation_node)
+                visited.add(operation_node)
+            queue.extend([successor for successor in operation_node.successors if successor not in visited])
+
+        positions = {operation_node: position for position, operation_node in enumerate(order)}
+        released: Dict[int, List[OperationNode]] = {}
+        for operation_node in order:
+            last_position = max(
+                    [
+                        positions[successor] for successor in operation_node.successors
+                        if positions[successor] > positions[operation_node]
+                    ],
+                    default=positions[operation_node]
+            )
+            released.setdefault(last_position, []).append(operation_node)
+
+        plans: List[_NodePlan] = []
+        for operation_node in order:
+            inputs: List[Tuple[OperationNode, int, int]] = []
+            for predecessor in operation_node.predecessors:
+                if predecessor not in positions or positions[predecessor] > positions[operation_node]:
+                    continue
+                index = predecessor.successors.index(operation_node)
+                start = sum(successor.operation.n_inputs for successor in predecessor.successors[:index])
+                inputs.append((predecessor, start, start + operation_node.operation.n_inputs))
+            plans.append(_NodePlan(
+                    node=operation_node,
+                    inputs=inputs,
+                    released=released.get(positions[operation_node], [])
+            ))
+        return plans
+
+    @staticmethod
+    def _create_thought(state: State, is_reachable: bool, layer_index: int) -> _BranchThought:
+        """
+        Creates a thought of a branch.
+        :param state: state of the thought
+        :param is_reachable: whether the thought is reachable from the source
+        :param layer_index: layer index of the thought
+        :return: thought of a branch
+        """
+        key = (json.dumps(state, sort_keys=True, default=str), is_reachable, layer_index)
+        return _BranchThought(state=state, key=key, is_reachable=is_reachable, layer_index=layer_index)
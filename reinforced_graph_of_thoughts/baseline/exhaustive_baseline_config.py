@@ -0,0 +1,117 @@
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Mapping, List, Dict, Tuple, Sequence
+
+from pure_graph_of_thoughts.api.graph.operation import OperationArray
+from pure_graph_of_thoughts.api.language_model import Prompt
+from pure_graph_of_thoughts.api.operation import Operation, PromptOperation, AbsoluteComplexity
+from .baseline_config import BaselineConfig
+from ..language_model import ProbabilityTable
+
+
+def estimate_n_thoughts(operation_array: OperationArray) -> float:
+    """
+    Estimates the cost of an operation array by the number of thoughts produced by its operations.
+    :param operation_array: operation array
+    :return: estimated cost
+    """
+    return float(sum([operation.n_outputs for layer in operation_array for operation in layer]))
+
+
+def create_feasible_prefix_predicate(
+        probability_tables: Mapping[Prompt, ProbabilityTable],
+        complexity: int,
+        min_probability: float = 0.0
+) -> Callable[[OperationArray], bool]:
+    """
+    Creates the predicate whether any graph starting with an operation array may be valid
+    from the probabilities of correct answers of the prompted operations.
+    The local complexity of the thoughts is tracked through the layers like by the graph controller,
+    and a prefix is infeasible if an operation is prompted at a local complexity
+    whose probability does not exceed the minimum probability, i.e. the operation is known to fail.
+    Such a graph either fails or wastes the operation, hence, a cheaper graph without it is not worse.
+    Operations without a probability table are always feasible.
+    :param probability_tables: probability tables by prompt, indexed by the local complexity of the prompted thoughts
+    :param complexity: complexity of the evaluated initial states
+    :param min_probability: probability up to which an operation is known to fail
+    :return: predicate whether a prefix is feasible
+    """
+
+    # the output complexities of a layer only depend on its operations and its input complexities,
+    # hence, they are calculated once per layer and input complexities, None if the layer is known to fail,
+    # the layers are held to identify them by their id
+    output_complexities_by_layer_id: Dict[
+        int, Tuple[Sequence[Operation], Dict[Tuple[int, ...], Optional[Tuple[int, ...]]]]
+    ] = {}
+
+    def calculate_output_complexities(
+            layer: Sequence[Operation], input_complexities: Tuple[int, ...]
+    ) -> Optional[Tuple[int, ...]]:
+        output_complexities: List[int] = []
+        n_consumed = 0
+        for operation in layer:
+            input_complexity = max(input_complexities[n_consumed:n_consumed + operation.n_inputs], default=complexity)
+            n_consumed += operation.n_inputs
+            probability_table = probability_tables.get(
+                    operation.prompt
+            ) if isinstance(operation, PromptOperation) else None
+            if probability_table is not None and probability_table.lookup(input_complexity) <= min_probability:
+                return None
+            if isinstance(operation.output_complexity, AbsoluteComplexity):
+                output_complexity = operation.output_complexity
+            else:
+                output_complexity = max(round(input_complexity * operation.output_complexity), 1)
+            output_complexities.extend([output_complexity] * operation.n_outputs)
+        return tuple(output_complexities)
+
+    # prefixes are usually checked depth-first, hence, the complexities of the layers of the last prefix are reused
+    # as long as its layers are identical, None from the first layer known to fail
+    checked_layers: List[Sequence[Operation]] = []
+    checked_complexities: List[Optional[Tuple[int, ...]]] = [(complexity,)]
+
+    def is_feasible_prefix(operation_array: OperationArray) -> bool:
+        n_reused = 0
+        while (
+                n_reused < len(checked_layers) and n_reused < len(operation_array)
+                and operation_array[n_reused] is checked_layers[n_reused]
+        ):
+            n_reused += 1
+        del checked_layers[n_reused:]
+        del checked_complexities[n_reused + 1:]
+        for layer in operation_array[n_reused:]:
+            complexities = checked_complexities[-1]
+            if complexities is not None:
+                layer_entry = output_complexities_by_layer_id.get(id(layer))
+                if layer_entry is None or layer_entry[0] is not layer:
+                    layer_entry = (layer, {})
+                    output_complexities_by_layer_id[id(layer)] = layer_entry
+                output_complexities_by_input = layer_entry[1]
+                if complexities not in output_complexities_by_input:
+                    output_complexities_by_input[complexities] = calculate_output_complexities(layer, complexities)
+                complexities = output_complexities_by_input[complexities]
+            checked_layers.append(layer)
+            checked_complexities.append(complexities)
+        return checked_complexities[-1] is not None
+
+    return is_feasible_prefix
+
+
+@dataclass(frozen=True, kw_only=True)
+class ExhaustiveBaselineConfig(BaselineConfig):
+    """
+    The configuration of an exhaustive baseline strategy execution.
+    """
+
+    estimate_cost: Callable[[OperationArray], float] = field(default=estimate_n_thoughts)
+    """The estimator of the cost of an operation array, a lower bound of the evaluated cost not decreasing with appended layers"""
+
+    is_feasible_prefix: Optional[Callable[[OperationArray], bool]] = field(default=None)
+    """
+    The predicate whether any graph starting with an operation array may be valid,
+    created from the probability tables and the complexity if absent, all prefixes are feasible if neither is present
+    """
+
+    probability_tables: Optional[Mapping[Prompt, ProbabilityTable]] = field(default=None)
+    """The probability tables of the simulated language model by prompt, indexed by local complexity"""
+
+    complexity: Optional[int] = field(default=None)
+    """The complexity of the evaluated initial states"""
@@ -0,0 +1,164 @@
+from math import floor
+from typing import List, Optional, Iterator, Sequence, Callable
+
+from pure_graph_of_thoughts.api.graph.operation import GraphOfOperations, OperationArray
+from pure_graph_of_thoughts.api.operation import Operation
+from .baseline_strategy import BaselineStrategy
+from .baseline_strategy_exception import BaselineStrategyException
+from .exhaustive_baseline_config import ExhaustiveBaselineConfig, create_feasible_prefix_predicate
+from .model import BaselineResultSummary, BaselineIterationResult
+
+
+class ExhaustiveBaselineStrategy(BaselineStrategy):
+    """
+    Exhaustive baseline strategy.
+    Enumerates all graphs of operations with a single sink up to the maximum depth and breadth in order of their estimated cost.
+    The enumeration is a depth-first search of the operation arrays with an iteratively deepened bound of the estimated cost,
+    hence, only the current operation array is kept in memory.
+    As branch and bound, prefixes whose estimated cost is not lower than the cost of the best valid result are pruned,
+    as well as prefixes that are known to fail.
+    Unless a feasibility predicate is configured, prefixes prompting an operation at a local complexity
+    at which it never answers correctly are known to fail, given the probability tables and the complexity.
+    The estimated cost must be a lower bound of the evaluated cost that does not decrease with appended layers.
+    If it equals the evaluated cost, the first valid result is optimal.
+    """
+
+    _estimate_cost: Callable[[OperationArray], float]
+    _is_feasible_prefix: Optional[Callable[[OperationArray], bool]]
+    _divergence_cutoff: int
+    _graphs: Optional[Iterator[GraphOfOperations]]
+    _best_result: Optional[BaselineIterationResult]
+    _next_bound: Optional[float]
+
+    @property
+    def best_result(self) -> Optional[BaselineIterationResult]:
+        """The valid result with the lowest cost"""
+        return self._best_result
+
+    def __init__(self, config: ExhaustiveBaselineConfig) -> None:
+        """
+        Instantiates an exhaustive baseline strategy.
+        :param config: baseline strategy configuration
+        """
+        super().__init__(config)
+        self._estimate_cost = config.estimate_cost
+        self._is_feasible_prefix = config.is_feasible_prefix
+        if self._is_feasible_prefix is None and config.probability_tables is not None and config.complexity is not None:
+            self._is_feasible_prefix = create_feasible_prefix_predicate(config.probability_tables, config.complexity)
+        self._divergence_cutoff = floor(config.max_depth * config.divergence_cutoff_factor)
+        self._graphs = None
+        self._best_result = None
+        self._next_bound = None
+
+    def generate(self, max_iterations: int, stop_on_first_valid: bool = False) -> BaselineResultSummary:
+        iteration_results: List[BaselineIterationResult] = []
+        for i in range(1, max_iterations + 1):
+            graph_of_operations = self._next_graph()
+            if graph_of_operations is None:
+                self._logger.debug('All graphs of operations are enumerated or pruned')
+                break
+            iteration_result = self._evaluate(graph_of_operations, i)
+            iteration_results.append(iteration_result)
+            if stop_on_first_valid and iteration_result.is_valid:
+                return self._summarize(iteration_results, max_iterations, stop_on_first_valid=True)
+        return self._summarize(iteration_results, max_iterations)
+
+    def _generate_single(self, iteration: int) -> BaselineIterationResult:
+        graph_of_operations = self._next_graph()
+        if graph_of_operations is None:
+            raise BaselineStrategyException('All graphs of operations are enumerated or pruned')
+        return self._evaluate(graph_of_operations, iteration)
+
+    def _evaluate(self, graph_of_operations: GraphOfOperations, iteration: int) -> BaselineIterationResult:
+        """
+        Evaluates a graph of operations and updates the best result.
+        :param graph_of_operations: graph of operations to evaluate
+        :param iteration: current iteration
+        :return: baseline iteration result
+        """
+        iteration_result = self._evaluate_graph(graph_of_operations, iteration)
+        self._graph_candidates.append(graph_of_operations)
+        if iteration_result.is_valid and (
+                self._best_result is None or iteration_result.cost < self._best_result.cost
+        ):
+            self._best_result = iteration_result
+        return iteration_result
+
+    def _next_graph(self) -> Optional[GraphOfOperations]:
+        """
+        Gets the next graph of operations of the enumeration.
+        :return: next graph of operations, None if all graphs are enumerated or pruned
+        """
+        if self._graphs is None:
+            self._graphs = self._enumerate_graphs()
+        return next(self._graphs, None)
+
+    def _enumerate_graphs(self) -> Iterator[GraphOfOperations]:
+        """
+        Enumerates the graphs of operations by iterative deepening of the bound of the estimated cost.
+        Each iteration enumerates the graphs with an estimated cost above the previous bound and up to the current bound,
+        the next bound is the lowest estimated cost of a prefix exceeding the current bound.
+        :return: graphs of operations
+        """
+        source_operations = [
+            operation for operation in self._operations if operation.n_inputs == 1
+        ]
+        previous_bound = float('-inf')
+        bound: Optional[float] = min(
+                [self._estimate_cost([[operation]]) for operation in source_operations], default=None
+        )
+        while bound is not None and (self._best_result is None or bound < self._best_result.cost):
+            self._logger.debug('Enumerating graphs of operations with estimated cost up to %s', bound)
+            self._next_bound = None
+            for source_operation in source_operations:
+                yield from self._enumerate_prefix([[source_operation]], 0, previous_bound, bound)
+            previous_bound, bound = bound, self._next_bound
+
+    def _enumerate_prefix(
+            self,
+            operation_array: List[Sequence[Operation]],
+            max_divergent_layer: int,
+            previous_bound: float,
+            bound: float
+    ) -> Iterator[GraphOfOperations]:
+        """
+        Enumerates the graphs of operations starting with a prefix depth-first.
+        A prefix is a valid graph of operations if it has a single sink
+        and no layer after the divergence cutoff of its depth contains operations with multiple outputs.
+        :param operation_array: prefix operation array
+        :param max_divergent_layer: index of the last layer containing operations with multiple outputs
+        :param previous_bound: previous bound of the estimated cost
+        :param bound: current bound of the estimated cost
+        :return: graphs of operations
+        """
+        estimated_cost = self._estimate_cost(operation_array)
+        if self._best_result is not None and estimated_cost >= self._best_result.cost:
+            return
+        if estimated_cost > bound:
+            if self._next_bound is None or estimated_cost < self._next_bound:
+                self._next_bound = estimated_cost
+            return
+        if self._is_feasible_prefix is not None and not self._is_feasible_prefix(operation_array):
+            return
+
+        depth = len(operation_array)
+        if (
+                len(operation_array[-1]) == 1
+                and estimated_cost > previous_bound
+                and max_divergent_layer <= floor(depth * self._config.divergence_cutoff_factor)
+        ):
+            yield GraphOfOperations.from_operation_array(operation_array)
+        if depth >= self._config.max_depth:
+            return
+
+        n_total_inputs = sum([operation.n_outputs for operation in operation_array[-1]])
+        for candidate in self._graph_generator.get_layer_candidates(
+                n_total_inputs, self._config.max_breadth, depth <= self._divergence_cutoff
+        ):
+            is_divergent = any(operation.n_outputs > 1 for operation in candidate)
+            yield from self._enumerate_prefix(
+                    [*operation_array, candidate],
+                    depth if is_divergent else max_divergent_layer,
+                    previous_bound,
+                    bound
+            )
@@ -1,11 +1,21 @@
 import logging
 from abc import ABC
-from itertools import product
+from bisect import bisect_right
+from dataclasses import dataclass
 from random import Random
-from typing import Sequence, Mapping, Set, Dict, Optional, Callable
+from typing import Sequence, Mapping, Set, Dict, Optional, Iterator, Tuple, List
 
 from pure_graph_of_thoughts.api.graph.operation import GraphOfOperations, OperationArray, OperationNode
 from pure_graph_of_thoughts.api.operation import Operation
+from .baseline_strategy_exception import BaselineStrategyException
+
+
+@dataclass(frozen=True)
+class _CompletionWeights:
+    depth_end: int
+    max_breadth: int
+    divergence_cutoff: int
+    weighted_candidates: Dict[Tuple[int, int], Tuple[Sequence[Sequence[Operation]], Sequence[int]]]
 
 
 class GraphGenerator(ABC):
@@ -17,6 +27,8 @@ class GraphGenerator(ABC):
     _operations_by_n_inputs: Mapping[int, Set[Operation]]
     _random: Random
     _logger: logging.Logger
+    _operation_candidates: Dict[Tuple[int, int, bool], Sequence[Sequence[Operation]]]
+    _completion_weights: Dict[Tuple[int, int, int], _CompletionWeights]
 
     def __init__(self, operations: Sequence[Operation], seed: Optional[int] = None) -> None:
         """
@@ -28,30 +40,36 @@ class GraphGenerator(ABC):
         self._operations_by_n_inputs = self._create_n_inputs_operations_mapping(operations)
         self._random = Random(seed)
         self._logger = logging.getLogger(self.__class__.__name__)
+        self._operation_candidates = {}
+        self._completion_weights = {}
 
     def generate_random_graph(self, graph_depth: int, max_breadth: int, divergence_cutoff: int) -> GraphOfOperations:
         """
-        Generates a random graph of operations.
+        Generates a random graph of operations with a single sink.
+        The graph is drawn uniformly among all graphs of the desired depth with a single sink.
         :param graph_depth: desired depth of the graph
         :param max_breadth: maximum breadth of the graph
         :param divergence_cutoff: divergence cutoff depth
         :return: generated graph of operations
         """
-        single_input_operations = list(self._operations_by_n_inputs[1])
-        source_operation = self._random.choice(single_input_operations)
-        operation_array: OperationArray = [
-            [source_operation]
-        ]
+        single_input_operations = list(self._operations_by_n_inputs.get(1, []))
+        completion_weights = self._get_completion_weights(graph_depth, max_breadth, divergence_cutoff)
+        source_candidates = [(source_operation,) for source_operation in single_input_operations]
+        cumulative_weights = self._accumulate_weights(source_candidates, 0, completion_weights)
+        if len(cumulative_weights) == 0 or cumulative_weights[-1] == 0:
+            raise BaselineStrategyException(
+                    f'No graph of depth {graph_depth} and maximum breadth {max_breadth} with a single sink exists'
+            )
+        source_operation = single_input_operations[self._draw_index(cumulative_weights)]
         graph_of_operations = self.generate_random_graph_layers(
                 1,
                 graph_depth,
                 max_breadth,
                 divergence_cutoff,
-                operation_array
+                [[source_operation]]
         )
         if graph_of_operations is None:
-            self._logger.debug('Generated graph has more than one sink, re-generating')
-            return self.generate_random_graph(graph_depth, max_breadth, divergence_cutoff)
+            raise BaselineStrategyException('Generated graph has no single sink')
 
         return graph_of_operations
 
@@ -64,28 +82,33 @@ class GraphGenerator(ABC):
             initial_operation_array: OperationArray
     ) -> Optional[GraphOfOperations]:
         """
-        Generates random graph layers.
+        Generates random graph layers completing an initial operation array to a graph with a single sink.
+        The number of completions with a single sink is counted backward from the last layer,
+        each layer is then drawn forward with the number of completions it allows as weight,
+        hence, the completion is drawn uniformly among all completions with a single sink.
         :param depth_start: start depth
         :param depth_end: end depth
         :param max_breadth: maximum breadth of the graph
         :param divergence_cutoff: divergence cutoff depth
         :param initial_operation_array: initial operation array
-        :return: generated graph of operations
+        :return: generated graph of operations, None if no completion with a single sink exists
         """
 
-        operation_array: OperationArray = initial_operation_array
+        operation_array: List[Sequence[Operation]] = list(initial_operation_array)
+        if depth_start >= depth_end:
+            if len(operation_array[-1]) != 1:
+                return None
+            return GraphOfOperations.from_operation_array(operation_array)
+
+        completion_weights = self._get_completion_weights(depth_end, max_breadth, divergence_cutoff)
         for depth in range(depth_start, depth_end):
-            divergence = depth <= divergence_cutoff
-            expect_single_output = depth == depth_end
-            operation_array_result: Optional[OperationArray] = self._generate_next_layer(
-                    operation_array,
-                    max_breadth,
-                    divergence,
-                    expect_single_output
+            n_total_inputs = sum([operation.n_outputs for operation in operation_array[-1]])
+            candidates, cumulative_weights = self._weigh_operation_candidates(
+                    depth, n_total_inputs, completion_weights
             )
-            if operation_array_result is None:
+            if len(cumulative_weights) == 0 or cumulative_weights[-1] == 0:
                 return None
-            operation_array = operation_array_result
+            operation_array.append(list(candidates[self._draw_index(cumulative_weights)]))
         return GraphOfOperations.from_operation_array(operation_array)
 
     def generate_singleton_graph(self, operation: Operation, preceding_operation: Optional[Operation] = None) -> GraphOfOperations:
@@ -103,70 +126,226 @@ class GraphGenerator(ABC):
                 OperationNode.of(operation)
         )
 
-    def _generate_next_layer(
+    def get_layer_candidates(
             self,
-            operation_array: OperationArray,
+            n_total_inputs: int,
             max_breadth: int,
-            divergence: bool,
-            expect_single_output: bool
-    ) -> Optional[OperationArray]:
-        predecessor_operations: Sequence[Operation] = operation_array[-1]
-        successor_operation_candidates = self._next_operation_candidates(
-                predecessor_operations,
-                max_breadth,
-                divergence,
-                expect_single_output
-        )
-        if len(successor_operation_candidates) == 0:
-            return None
-        successor_operations: Sequence[Operation] = self._random.choice(successor_operation_candidates)
+            divergence: bool = True
+    ) -> Sequence[Sequence[Operation]]:
+        """
+        Gets the candidates of a layer.
+        The candidates only depend on the total number of outputs of the predecessors and the constraints of the layer,
+        hence, they are enumerated once per combination and looked up afterward.
+        :param n_total_inputs: total number of outputs of the preceding layer
+        :param max_breadth: maximum breadth of the graph
+        :param divergence: whether operations with multiple outputs are allowed
+        :return: candidates of the layer
+        """
+        key = (n_total_inputs, max_breadth, divergence)
+        if key not in self._operation_candidates:
+            self._operation_candidates[key] = tuple(
+                    tuple(operations) for operations in self._enumerate_operation_candidates(*key)
+            )
+        return self._operation_candidates[key]
 
-        return list(operation_array) + [successor_operations]
+    def _get_completion_weights(self, depth_end: int, max_breadth: int, divergence_cutoff: int) -> _CompletionWeights:
+        """
+        Gets the completion weights of graphs with the given constraints, created once per combination.
+        :param depth_end: end depth
+        :param max_breadth: maximum breadth of the graph
+        :param divergence_cutoff: divergence cutoff depth
+        :return: completion weights
+        """
+        key = (depth_end, max_breadth, divergence_cutoff)
+        if key not in self._completion_weights:
+            self._completion_weights[key] = _CompletionWeights(
+                    depth_end=depth_end,
+                    max_breadth=max_breadth,
+                    divergence_cutoff=divergence_cutoff,
+                    weighted_candidates={}
+            )
+        return self._completion_weights[key]
 
-    def _next_operation_candidates(
+    def _weigh_operation_candidates(
             self,
-            predecessors: Sequence[Operation],
-            max_breadth: int,
-            divergence: bool = True,
-            expect_single_output: bool = False
-    ) -> Sequence[Sequence[Operation]]:
-        n_total_inputs = sum([predecessor.n_outputs for predecessor in predecessors])
-        n_inputs_combinations = self._get_n_inputs_combinations(n_total_inputs)
-        next_operation_candidates = [
-            list(operations) for n_inputs in n_inputs_combinations for operations in product(*[
-                self._operations_by_n_inputs[n_input] for n_input in n_inputs if n_input in self._operations_by_n_inputs
-            ]) if (
-                    len(operations) > 0
-                    and sum([operation.n_inputs for operation in operations]) == n_total_inputs
-                    and sum([operation.n_outputs for operation in operations]) <= max_breadth
+            depth: int,
+            n_total_inputs: int,
+            completion_weights: _CompletionWeights
+    ) -> Tuple[Sequence[Sequence[Operation]], Sequence[int]]:
+        """
+        Weighs the candidates of a layer by the number of their completions with a single sink.
+        :param depth: depth of the layer
+        :param n_total_inputs: total number of outputs of the preceding layer
+        :param completion_weights: completion weights of the graph constraints
+        :return: candidates of the layer and their cumulative weights
+        """
+        key = (depth, n_total_inputs)
+        if key not in completion_weights.weighted_candidates:
+            candidates = self.get_layer_candidates(
+                    n_total_inputs,
+                    completion_weights.max_breadth,
+                    depth <= completion_weights.divergence_cutoff
             )
-        ]
-
-        filter_operations: Optional[Callable[[Sequence[Operation]], bool]] = None
-        if expect_single_output:
-            filter_operations = lambda operations: sum([operation.n_outputs for operation in operations]) == 1
-        elif not divergence:
-            filter_operations = lambda operations: not any(operation.n_outputs > 1 for operation in operations)
-
-        if filter_operations is not None:
-            return list(
-                    filter(
-                            filter_operations,
-                            next_operation_candidates
-                    )
+            completion_weights.weighted_candidates[key] = (
+                candidates,
+                self._accumulate_weights(candidates, depth, completion_weights)
             )
+        return completion_weights.weighted_candidates[key]
 
-        return next_operation_candidates
+    def _accumulate_weights(
+            self,
+            candidates: Sequence[Sequence[Operation]],
+            depth: int,
+            completion_weights: _CompletionWeights
+    ) -> Sequence[int]:
+        """
+        Accumulates the number of completions with a single sink of the candidates of a layer.
+        A candidate of the last layer has a single completion if it consists of a single operation,
+        a candidate of a preceding layer has as many completions as the candidates of the next layer together.
+        :param candidates: candidates of the layer
+        :param depth: depth of the layer
+        :param completion_weights: completion weights of the graph constraints
+        :return: cumulative weights of the candidates
+        """
+        cumulative_weights: List[int] = []
+        total_weight = 0
+        for candidate in candidates:
+            if depth >= completion_weights.depth_end - 1:
+                weight = 1 if len(candidate) == 1 else 0
+            elif any(operation.n_outputs == 0 for operation in candidate):
+                # operations without outputs are additional sinks
+                weight = 0
+            else:
+                _, next_cumulative_weights = self._weigh_operation_candidates(
+                        depth + 1,
+                        sum([operation.n_outputs for operation in candidate]),
+                        completion_weights
+                )
+                weight = next_cumulative_weights[-1] if len(next_cumulative_weights) > 0 else 0
+            total_weight += weight
+            cumulative_weights.append(total_weight)
+        return cumulative_weights
+
+    def _draw_index(self, cumulative_weights: Sequence[int]) -> int:
+        """
+        Draws an index with probability proportional to its weight.
+        :param cumulative_weights: cumulative weights with a positive total
+        :return: index
+        """
+        return bisect_right(cumulative_weights, self._random.randrange(cumulative_weights[-1]))
+
+    def _enumerate_operation_candidates(
+            self,
+            n_total_inputs: int,
+            max_breadth: int,
+            divergence: bool
+    ) -> Iterator[Sequence[Operation]]:
+        """
+        Enumerates the candidates of the next layer lazily.
+        A candidate consumes all outputs of the predecessors and its outputs do not exceed the maximum breadth.
+        Without divergence, operations with multiple outputs are excluded.
+        The candidates are enumerated by number of operations, then by the number of inputs of the operations.
+        :param n_total_inputs: total number of outputs of the preceding layer
+        :param max_breadth: maximum breadth of the graph
+        :param divergence: whether operations with multiple outputs are allowed
+        :return: candidates of the next layer
+        """
+        max_n_outputs = max_breadth
+        operations_by_n_inputs: Dict[int, Sequence[Operation]] = {}
+        for n_inputs, n_inputs_operations in self._operations_by_n_inputs.items():
+            allowed_operations = [
+                operation for operation in n_inputs_operations
+                if n_inputs > 0 and (divergence or operation.n_outputs <= 1)
+            ]
+            if len(allowed_operations) > 0:
+                operations_by_n_inputs[n_inputs] = allowed_operations
+        if len(operations_by_n_inputs) == 0:
+            return
+        min_n_outputs = {
+            n_inputs: min(operation.n_outputs for operation in allowed_operations)
+            for n_inputs, allowed_operations in operations_by_n_inputs.items()
+        }
+
+        for n_operations in range(1, n_total_inputs + 1):
+            if n_operations * min(min_n_outputs.values()) > max_n_outputs:
+                break
+            for n_inputs_composition in self._iterate_n_inputs_compositions(
+                    n_total_inputs, n_operations, min_n_outputs, max_n_outputs
+            ):
+                for operations in self._iterate_operation_products(
+                        [operations_by_n_inputs[n_inputs] for n_inputs in n_inputs_composition], max_n_outputs
+                ):
+                    yield operations
 
     @staticmethod
-    def _get_n_inputs_combinations(max_n_inputs: int) -> Sequence[Sequence[int]]:
-        # TODO: investigate expensive cartesian product generation
-        return [
-            list(n) for n_inputs in range(1, max_n_inputs, 1)
-            for n in product(range(1, max_n_inputs + 1), repeat=n_inputs) if sum(n) == max_n_inputs
-        ] + [
-            [1 for _ in range(max_n_inputs)]
-        ]
+    def _iterate_n_inputs_compositions(
+            n_total_inputs: int,
+            n_operations: int,
+            min_n_outputs: Mapping[int, int],
+            max_n_outputs: int
+    ) -> Iterator[Tuple[int, ...]]:
+        """
+        Enumerates the compositions of the total number of inputs into the numbers of inputs of the operations
+        in lexicographic order.
+        Only numbers of inputs of available operations are used,
+        and compositions whose operations exceed the maximum number of outputs are pruned while enumerating.
+        :param n_total_inputs: total number of inputs
+        :param n_operations: number of operations
+        :param min_n_outputs: minimum number of outputs of the available operations by number of inputs
+        :param max_n_outputs: maximum number of outputs of all operations
+        :return: compositions
+        """
+        n_inputs_values = sorted(min_n_outputs.keys())
+        min_operation_outputs = min(min_n_outputs.values())
+
+        def iterate(prefix: Tuple[int, ...], n_remaining_inputs: int, n_outputs: int) -> Iterator[Tuple[int, ...]]:
+            n_remaining_operations = n_operations - len(prefix)
+            if n_remaining_operations == 0:
+                if n_remaining_inputs == 0:
+                    yield prefix
+                return
+            for n_inputs in n_inputs_values:
+                n_rest_inputs = n_remaining_inputs - n_inputs
+                if n_rest_inputs < (n_remaining_operations - 1) * n_inputs_values[0]:
+                    break
+                if n_rest_inputs > (n_remaining_operations - 1) * n_inputs_values[-1]:
+                    continue
+                n_next_outputs = n_outputs + min_n_outputs[n_inputs]
+                if n_next_outputs + (n_remaining_operations - 1) * min_operation_outputs > max_n_outputs:
+                    continue
+                yield from iterate((*prefix, n_inputs), n_rest_inputs, n_next_outputs)
+
+        return iterate((), n_total_inputs, 0)
+
+    @staticmethod
+    def _iterate_operation_products(
+            operations_per_position: Sequence[Sequence[Operation]],
+            max_n_outputs: int
+    ) -> Iterator[Sequence[Operation]]:
+        """
+        Enumerates the Cartesian product of the operations per position in the order of itertools.product,
+        products exceeding the maximum number of outputs are pruned while enumerating.
+        :param operations_per_position: possible operations of each position
+        :param max_n_outputs: maximum number of outputs of all operations
+        :return: sequences of operations
+        """
+        min_rest_outputs = [0 for _ in range(len(operations_per_position) + 1)]
+        for position in range(len(operations_per_position) - 1, -1, -1):
+            min_rest_outputs[position] = min_rest_outputs[position + 1] + min(
+                    operation.n_outputs for operation in operations_per_position[position]
+            )
+
+        def iterate(prefix: List[Operation], n_outputs: int) -> Iterator[Sequence[Operation]]:
+            position = len(prefix)
+            if position == len(operations_per_position):
+                yield list(prefix)
+                return
+            for operation in operations_per_position[position]:
+                n_next_outputs = n_outputs + operation.n_outputs
+                if n_next_outputs + min_rest_outputs[position + 1] <= max_n_outputs:
+                    yield from iterate([*prefix, operation], n_next_outputs)
+
+        return iterate([], 0)
 
     @staticmethod
     def _create_n_inputs_operations_mapping(operations: Sequence[Operation]) -> Mapping[int, Set[Operation]]:
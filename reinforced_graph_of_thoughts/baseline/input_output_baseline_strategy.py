@@ -1,10 +1,12 @@
 import json
 import logging
-from typing import List, Optional, Callable
+from functools import partial
+from typing import Optional, Callable, Sequence, Tuple
 
 from pure_graph_of_thoughts.api.graph.operation import GraphOfOperations
 from pure_graph_of_thoughts.api.operation import Operation
 from . import BaselineConfig
+from .baseline_config import EvaluationFactory, SeededGraphEvaluator
 from .baseline_strategy import BaselineStrategy
 from .model import BaselineResultSummary, BaselineIterationResult
 
@@ -22,53 +24,102 @@ class InputOutputBaselineStrategy(BaselineStrategy):
             self,
             evaluate_graph: Callable[[GraphOfOperations, int], BaselineIterationResult],
             operation: Operation,
-            preceding_operation: Optional[Operation] = None
+            preceding_operation: Optional[Operation] = None,
+            max_workers: int = 1,
+            create_evaluation: Optional[EvaluationFactory] = None,
+            seed: Optional[int] = None
     ) -> None:
         """
         Instantiates a new Input-Output baseline strategy.
         :param evaluate_graph: graph evaluation function
         :param operation: operation to use
+        :param preceding_operation: potential preceding operation (e.g. noop)
+        :param max_workers: maximum number of worker processes evaluating graphs, requires a factory of the evaluation
+        :param create_evaluation: picklable factory of the operations and a seeded graph evaluator to evaluate with
+        :param seed: seed to draw the seeds of the seeded graph evaluator from
         """
         super().__init__(BaselineConfig(
             max_depth=1,
             max_breadth=1,
             divergence_cutoff_factor=0,
             operations=[operation],
-            evaluate_graph=evaluate_graph
+            evaluate_graph=evaluate_graph,
+            max_workers=max_workers,
+            create_evaluation=partial(
+                _create_evaluation_with_retries, create_evaluation
+            ) if create_evaluation is not None else None,
+            seed=seed
         ))
         self._operation = operation
         self._preceding_operation = preceding_operation
 
     def generate(self, max_iterations: int, stop_on_first_valid: bool = False) -> BaselineResultSummary:
-        iteration_results: List[BaselineIterationResult] = []
-        for i in range(1, max_iterations + 1):
-            iteration_result = self._generate_single(i)
-            iteration_results.append(iteration_result)
-            if stop_on_first_valid and iteration_result.is_valid:
-                return BaselineResultSummary(
-                    results=iteration_results,
-                    final_result_index=iteration_results.index(iteration_result),
-                    max_iterations=max_iterations,
-                    stop_on_first_valid=True
-                )
-
-        final_result: Optional[BaselineIterationResult] = self._find_valid_min_cost(iteration_results)
-        return BaselineResultSummary(
-            results=iteration_results,
-            final_result_index=iteration_results.index(
-                final_result
-            ) if final_result is not None else None,
-            max_iterations=max_iterations
+        return self._generate_independent(
+            max_iterations,
+            stop_on_first_valid,
+            self._create_graph,
+            self._evaluate
         )
 
     def _generate_single(self, iteration: int) -> BaselineIterationResult:
-        graph_of_operations: GraphOfOperations = self._graph_generator.generate_singleton_graph(self._operation, self._preceding_operation)
-        for attempt in range(16):
-            try:
-                return self._evaluate_graph(graph_of_operations, iteration)
-            except Exception as e:
-                if isinstance(e, json.JSONDecodeError) or isinstance(e.__cause__, json.JSONDecodeError):
-                    logging.warning("JSONDecodeError during evaluation, retrying iteration %d (attempt %d/16)...", iteration, attempt + 1)
-                    continue
-                raise
-        raise RuntimeError(f"Evaluation failed after 16 retries due to JSONDecodeError (iteration {iteration})")
\ No newline at end of file
+        return self._evaluate(self._create_graph(iteration), iteration)
+
+    def _create_graph(self, iteration: int) -> GraphOfOperations:
+        """
+        Creates the singleton graph of operations of an iteration.
+        :param iteration: current iteration
+        :return: graph of operations
+        """
+        return self._graph_generator.generate_singleton_graph(self._operation, self._preceding_operation)
+
+    def _evaluate(self, graph_of_operations: GraphOfOperations, iteration: int) -> BaselineIterationResult:
+        """
+        Evaluates a graph of operations, retrying evaluations failing due to malformed JSON responses.
+        The seeded graph evaluator of a factory of the evaluation retries on its own.
+        :param graph_of_operations: graph of operations to evaluate
+        :param iteration: current iteration
+        :return: baseline iteration result
+        """
+        if self._config.create_evaluation is not None:
+            return self._evaluate_graph(graph_of_operations, iteration)
+        return _evaluate_with_retries(self._evaluate_graph, graph_of_operations, iteration)
+
+
+def _evaluate_with_retries(
+        evaluate_graph: Callable[[GraphOfOperations, int], BaselineIterationResult],
+        graph_of_operations: GraphOfOperations,
+        iteration: int
+) -> BaselineIterationResult:
+    """
+    Evaluates a graph of operations, retrying evaluations failing due to malformed JSON responses.
+    :param evaluate_graph: graph evaluator
+    :param graph_of_operations: graph of operations to evaluate
+    :param iteration: current iteration
+    :return: baseline iteration result
+    """
+    for attempt in range(16):
+        try:
+            return evaluate_graph(graph_of_operations, iteration)
+        except Exception as e:
+            if isinstance(e, json.JSONDecodeError) or isinstance(e.__cause__, json.JSONDecodeError):
+                logging.warning("JSONDecodeError during evaluation, retrying iteration %d (attempt %d/16)...", iteration, attempt + 1)
+                continue
+            raise
+    raise RuntimeError(f"Evaluation failed after 16 retries due to JSONDecodeError (iteration {iteration})")
+
+
+def _create_evaluation_with_retries(
+        create_evaluation: EvaluationFactory
+) -> Tuple[Sequence[Operation], SeededGraphEvaluator]:
+    """
+    Creates the operations and a seeded graph evaluator retrying evaluations failing due to malformed JSON responses.
+    The retries are evaluated with the same seed.
+    :param create_evaluation: factory of the operations and the seeded graph evaluator
+    :return: operations and retrying seeded graph evaluator
+    """
+    operations, evaluate_seeded_graph = create_evaluation()
+    return operations, lambda graph_of_operations, iteration, seed: _evaluate_with_retries(
+            lambda retried_graph, retried_iteration: evaluate_seeded_graph(retried_graph, retried_iteration, seed),
+            graph_of_operations,
+            iteration
+    )
@@ -1,3 +1,4 @@
 from .baseline_iteration_result import BaselineIterationResult
 from .baseline_meta_info import BaselineMetaInfo
 from .baseline_result_summary import BaselineResultSummary
+from .exact_graph_evaluation import ExactGraphEvaluation
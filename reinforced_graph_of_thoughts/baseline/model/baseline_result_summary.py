@@ -27,10 +27,18 @@ class BaselineResultSummary(Schema):
     created_at: datetime = field(default_factory=datetime.now)
     """The timestamp of the baseline result summary creation"""
 
+    n_duplicates: int = field(default=0)
+    """The number of results of structurally identical graphs taken from the result cache"""
+
     @property
     def final_result(self) -> Optional[BaselineIterationResult]:
         return self.results[self.final_result_index] if self.final_result_index is not None else None
 
+    @property
+    def duplicate_rate(self) -> float:
+        """The rate of results taken from the result cache among all results"""
+        return self.n_duplicates / len(self.results) if len(self.results) > 0 else 0.0
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> Self:
         return cls(
@@ -40,5 +48,6 @@ class BaselineResultSummary(Schema):
                 final_result_index=data['final_result_index'],
                 max_iterations=data['max_iterations'],
                 stop_on_first_valid=data['stop_on_first_valid'],
-                created_at=datetime.fromisoformat(data['created_at'])
+                created_at=datetime.fromisoformat(data['created_at']),
+                n_duplicates=data.get('n_duplicates', 0)
         )
@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, kw_only=True)
+class ExactGraphEvaluation:
+    """
+    Represents the exact evaluation of a graph of operations under a simulated language model.
+    """
+
+    solve_probability: float
+    """The probability that the execution of the graph of operations solves the task"""
+
+    expected_cost: float
+    """The expected number of thoughts in the resulting graph of thoughts"""
+
+    n_branches: int
+    """The maximum number of distinct execution branches tracked at once"""
@@ -0,0 +1,20 @@
+from dataclasses import dataclass, field
+from typing import Sequence
+
+from .simulated_annealing_baseline_config import SimulatedAnnealingBaselineConfig
+
+
+@dataclass(frozen=True, kw_only=True)
+class ParallelTemperingBaselineConfig(SimulatedAnnealingBaselineConfig):
+    """
+    The configuration of a parallel tempering baseline strategy execution.
+    """
+
+    temperatures: Sequence[float]
+    """The initial temperatures of the chains in increasing order."""
+
+    cooling_factor: float = field(default=1.0)
+    """The cooling factor to decrease the temperatures of all chains with, the temperatures are fixed by default."""
+
+    swap_interval: int = field(default=1)
+    """The number of steps of all chains between swap attempts of adjacent chains."""
@@ -0,0 +1,364 @@
+from dataclasses import replace
+from math import exp
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Connection
+from typing import List, Sequence, Optional, Tuple, Dict, Any, Mapping
+
+from pure_graph_of_thoughts.api.graph.operation import GraphOfOperations, OperationGraphSchema
+from .baseline_config import EvaluationFactory
+from .baseline_result_cache import BaselineResultCache
+from .baseline_strategy import BaselineStrategy
+from .baseline_strategy_exception import BaselineStrategyException
+from .model import BaselineIterationResult, BaselineResultSummary
+from .parallel_tempering_baseline_config import ParallelTemperingBaselineConfig
+from .simulated_annealing_baseline_config import SimulatedAnnealingBaselineConfig
+from .simulated_annealing_baseline_strategy import SimulatedAnnealingBaselineStrategy
+
+ChainState = Tuple[Optional[OperationGraphSchema], float]
+"""The graph of operations of the current result of a chain if it is valid, and the energy of the current result."""
+
+
+class ParallelTemperingBaselineStrategy(BaselineStrategy):
+    """
+    Parallel tempering baseline strategy.
+    Multiple simulated annealing chains at different temperatures are stepped simultaneously,
+    and the current states of adjacent chains are swapped periodically,
+    such that the current graphs of low cost migrate to the chains of low temperatures,
+    while the chains of high temperatures escape from regions of invalid graphs.
+    A swap of two chains is accepted with probability min(1, exp((E_i - E_j) * (1 / T_i - 1 / T_j))).
+    If a factory of the evaluation and multiple workers are configured, the chains are stepped by worker processes,
+    which create their own operations and seeded graph evaluator, and only the swapped states are sent to the workers.
+    The seeds of the evaluations of a chain are drawn by the chain, hence, the results do not depend on the workers.
+    The worker processes live for a single generation, their chains continue from the current states and temperatures.
+    Otherwise, the chains are stepped sequentially in this process.
+    The results of all chains are aggregated in order of their steps and the valid result with the lowest cost is final.
+    """
+
+    _META_INFO_CHAIN = 'chain'
+
+    _chains: Sequence[SimulatedAnnealingBaselineStrategy]
+    _n_worker_processes: int
+    _swap_interval: int
+    _temperatures: List[float]
+    _chain_states: List[ChainState]
+    _pending_states: Dict[int, ChainState]
+    _connections: List[Connection]
+    _n_worker_duplicates: int
+    _n_steps: int
+    _n_swap_attempts: int
+    _n_swaps: int
+    _all_results: List[BaselineIterationResult]
+
+    @property
+    def chains(self) -> Sequence[SimulatedAnnealingBaselineStrategy]:
+        """
+        The simulated annealing chains stepped in this process in order of their initial temperatures,
+        empty if the chains are stepped by worker processes
+        """
+        return self._chains
+
+    @property
+    def swap_rate(self) -> float:
+        """The rate of accepted swaps among all swap attempts"""
+        return self._n_swaps / self._n_swap_attempts if self._n_swap_attempts > 0 else 0.0
+
+    def __init__(self, config: ParallelTemperingBaselineConfig) -> None:
+        """
+        Instantiates a parallel tempering baseline strategy.
+        :param config: baseline strategy configuration
+        """
+        super().__init__(config)
+        if len(config.temperatures) == 0:
+            raise BaselineStrategyException('At least one temperature is required')
+        if any(temperature <= 0 for temperature in config.temperatures):
+            raise BaselineStrategyException('Temperatures must be positive')
+        if config.swap_interval < 1:
+            raise BaselineStrategyException('Swap interval must be positive')
+        self._temperatures = sorted(config.temperatures)
+        self._n_worker_processes = min(config.max_workers, len(self._temperatures)) if (
+                config.create_evaluation is not None and config.max_workers > 1
+        ) else 0
+        self._chains = [
+            SimulatedAnnealingBaselineStrategy(replace(
+                    config,
+                    initial_temperature=temperature,
+                    seed=config.seed + i if config.seed is not None else None
+            ))
+            for i, temperature in enumerate(self._temperatures)
+        ] if self._n_worker_processes == 0 else []
+        self._swap_interval = config.swap_interval
+        self._chain_states = [(None, 1.0)] * len(self._temperatures)
+        self._pending_states = {}
+        self._connections = []
+        self._n_worker_duplicates = 0
+        self._n_steps = 0
+        self._n_swap_attempts = 0
+        self._n_swaps = 0
+        self._all_results = []
+
+    def generate(self, max_iterations: int, stop_on_first_valid: bool = False) -> BaselineResultSummary:
+        if self._n_worker_processes == 0:
+            iteration_results, is_stopped = self._generate_steps(max_iterations, stop_on_first_valid)
+            return self._summarize_chains(iteration_results, max_iterations, is_stopped)
+
+        config = self._config
+        if config.create_evaluation is None:
+            raise BaselineStrategyException('Factory of the evaluation is required to step chains in worker processes')
+        processes: List[Process] = []
+        try:
+            for worker in range(self._n_worker_processes):
+                connection, worker_connection = Pipe()
+                process = Process(
+                        target=_step_chains,
+                        args=(
+                            worker_connection,
+                            config.create_evaluation,
+                            {
+                                i: self._create_chain_config(i)
+                                for i in range(worker, len(self._temperatures), self._n_worker_processes)
+                            },
+                            self._result_cache is not None
+                        ),
+                        daemon=True
+                )
+                process.start()
+                worker_connection.close()
+                processes.append(process)
+                self._connections.append(connection)
+            # the workers create their chains from scratch, hence, the states of all chains are restored
+            self._pending_states = dict(enumerate(self._chain_states))
+            iteration_results, is_stopped = self._generate_steps(max_iterations, stop_on_first_valid)
+            for connection in self._connections:
+                self._send(connection, None)
+            self._n_worker_duplicates += sum(self._receive(connection) for connection in self._connections)
+        finally:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+            for process in processes:
+                process.join(timeout=1.0)
+                if process.is_alive():
+                    process.terminate()
+        return self._summarize_chains(iteration_results, max_iterations, is_stopped)
+
+    def _generate_steps(
+            self,
+            max_iterations: int,
+            stop_on_first_valid: bool
+    ) -> Tuple[List[BaselineIterationResult], bool]:
+        """
+        Steps the chains until the maximum number of iterations is reached.
+        Each iteration is the evaluation of a single chain, hence, the last step may only advance the first chains.
+        :param max_iterations: maximum number of iterations
+        :param stop_on_first_valid: whether to stop on the first valid result
+        :return: iteration results and whether the generation was stopped on the first valid result
+        """
+        iteration_results: List[BaselineIterationResult] = []
+        while len(iteration_results) < max_iterations:
+            step_results = self._step(max_iterations - len(iteration_results))
+            for step_result in step_results:
+                iteration_results.append(step_result)
+                if stop_on_first_valid and step_result.is_valid:
+                    return iteration_results, True
+            if self._n_steps % self._swap_interval == 0:
+                self._swap_adjacent()
+        return iteration_results, False
+
+    def _generate_single(self, iteration: int) -> BaselineIterationResult:
+        if self._n_worker_processes > 0:
+            raise BaselineStrategyException('Chains stepped by worker processes can only be stepped during generation')
+        return self._step(1)[0]
+
+    def _step(self, max_chains: int) -> Sequence[BaselineIterationResult]:
+        """
+        Steps the chains once, after setting the states of the chains swapped since their last step.
+        :param max_chains: maximum number of chains to step, in order of their temperatures
+        :return: results of the stepped chains
+        """
+        self._n_steps += 1
+        first_iteration = len(self._all_results) + 1
+        n_chains = min(max_chains, len(self._temperatures))
+        pending_states = self._pending_states
+        self._pending_states = {}
+
+        step_results: List[Optional[BaselineIterationResult]] = [None] * n_chains
+        if self._n_worker_processes == 0:
+            for i, state in pending_states.items():
+                self._chains[i].current_state = state
+            for i in range(n_chains):
+                step_results[i] = self._chains[i].generate_step(first_iteration + i)
+        else:
+            for worker, connection in enumerate(self._connections):
+                self._send(connection, (
+                    {i: state for i, state in pending_states.items() if i % self._n_worker_processes == worker},
+                    [
+                        (i, first_iteration + i)
+                        for i in range(worker, n_chains, self._n_worker_processes)
+                    ]
+                ))
+            for connection in self._connections:
+                for i, step_result in self._receive(connection):
+                    step_results[i] = step_result
+
+        chain_results = []
+        for i, step_result in enumerate(step_results):
+            if step_result is None:
+                raise BaselineStrategyException(f'Chain {i} was not stepped')
+            self._update_chain_state(i, step_result)
+            chain_results.append(
+                    step_result.with_meta_info({**(step_result.meta_info or {}), self._META_INFO_CHAIN: i})
+            )
+        self._all_results.extend(chain_results)
+        return chain_results
+
+    def _update_chain_state(self, chain: int, step_result: BaselineIterationResult) -> None:
+        """
+        Updates the known state and temperature of a chain from the meta info of its step result.
+        :param chain: index of the chain
+        :param step_result: result of the step of the chain
+        """
+        meta_info = step_result.meta_info or {}
+        self._temperatures[chain] = meta_info[SimulatedAnnealingBaselineStrategy._META_INFO_TEMPERATURE]
+        if meta_info[SimulatedAnnealingBaselineStrategy._META_INFO_IS_SELECTED]:
+            self._chain_states[chain] = (
+                step_result.graph_of_operations if step_result.is_valid else None,
+                meta_info[SimulatedAnnealingBaselineStrategy._META_INFO_ENERGY]
+            )
+
+    def _swap_adjacent(self) -> None:
+        """
+        Attempts to swap the current states of all adjacent chains, starting with the chains of the lowest temperatures.
+        The swapped states are set when the chains are stepped next.
+        """
+        for lower, higher in zip(range(len(self._temperatures) - 1), range(1, len(self._temperatures))):
+            self._n_swap_attempts += 1
+            exponent = (self._chain_states[lower][1] - self._chain_states[higher][1]) * (
+                    1 / self._temperatures[lower] - 1 / self._temperatures[higher]
+            )
+            if exponent >= 0 or self._random.random() <= exp(exponent):
+                self._n_swaps += 1
+                self._chain_states[lower], self._chain_states[higher] = (
+                    self._chain_states[higher], self._chain_states[lower]
+                )
+                self._pending_states[lower] = self._chain_states[lower]
+                self._pending_states[higher] = self._chain_states[higher]
+
+    def _create_chain_config(self, chain: int) -> Mapping[str, Any]:
+        """
+        Creates the picklable configuration of a chain stepped by a worker process,
+        which continues from the current temperature of the chain.
+        :param chain: index of the chain
+        :return: configuration without operations, graph evaluator and result cache
+        """
+        config = self._config
+        if not isinstance(config, SimulatedAnnealingBaselineConfig):
+            raise BaselineStrategyException('Simulated annealing configuration is required')
+        return {
+            'max_breadth': config.max_breadth,
+            'max_depth': config.max_depth,
+            'divergence_cutoff_factor': config.divergence_cutoff_factor,
+            'seed': config.seed + chain if config.seed is not None else None,
+            'evaluation_key': config.evaluation_key,
+            'neighbor_regeneration_threshold': config.neighbor_regeneration_threshold,
+            'cooling_factor': config.cooling_factor,
+            'initial_temperature': self._temperatures[chain]
+        }
+
+    @classmethod
+    def _send(cls, connection: Connection, message: Any) -> None:
+        """
+        Sends a message to a worker process.
+        If the worker process has already failed, its failure is raised instead.
+        :param connection: connection to the worker process
+        :param message: message
+        """
+        try:
+            connection.send(message)
+        except OSError as e:
+            cls._receive(connection)
+            raise BaselineStrategyException('Chain worker process terminated unexpectedly') from e
+
+    @staticmethod
+    def _receive(connection: Connection) -> Any:
+        """
+        Receives a message from a worker process.
+        :param connection: connection to the worker process
+        :return: message
+        """
+        try:
+            message = connection.recv()
+        except EOFError as e:
+            raise BaselineStrategyException('Chain worker process terminated unexpectedly') from e
+        if isinstance(message, BaselineStrategyException):
+            raise message
+        return message
+
+    def _summarize_chains(
+            self,
+            iteration_results: Sequence[BaselineIterationResult],
+            max_iterations: int,
+            stop_on_first_valid: bool = False
+    ) -> BaselineResultSummary:
+        """
+        Summarizes the iteration results of all chains.
+        :param iteration_results: iteration results
+        :param max_iterations: maximum number of iterations
+        :param stop_on_first_valid: whether the generation was stopped on the first valid result
+        :return: baseline result
+        """
+        self._n_duplicates = sum(chain.n_duplicates for chain in self._chains) + self._n_worker_duplicates
+        return self._summarize(iteration_results, max_iterations, stop_on_first_valid)
+
+
+def _step_chains(
+        connection: Connection,
+        create_evaluation: EvaluationFactory,
+        chain_configs: Mapping[int, Mapping[str, Any]],
+        use_result_cache: bool
+) -> None:
+    """
+    Steps simulated annealing chains in a worker process until it is stopped.
+    Each message contains the states to set of the swapped chains and the chains to step with their iterations,
+    and it is answered by the results of the stepped chains.
+    The message None stops the worker, and it is answered by the number of duplicates of its chains.
+    :param connection: connection to the parent process
+    :param create_evaluation: factory of the operations and the seeded graph evaluator
+    :param chain_configs: picklable configurations of the chains by their indices
+    :param use_result_cache: whether the chains of the worker share a result cache
+    """
+    try:
+        evaluation = create_evaluation()
+        operations, _ = evaluation
+        result_cache = BaselineResultCache() if use_result_cache else None
+        chains = {
+            i: SimulatedAnnealingBaselineStrategy(SimulatedAnnealingBaselineConfig(
+                    operations=operations,
+                    evaluate_graph=_evaluate_unseeded,
+                    create_evaluation=lambda: evaluation,
+                    result_cache=result_cache,
+                    **chain_config
+            ))
+            for i, chain_config in chain_configs.items()
+        }
+        message = connection.recv()
+        while message is not None:
+            states, steps = message
+            for i, state in states.items():
+                chains[i].current_state = state
+            connection.send([(i, chains[i].generate_step(iteration)) for i, iteration in steps])
+            message = connection.recv()
+        connection.send(sum(chain.n_duplicates for chain in chains.values()))
+    except Exception as e:
+        connection.send(BaselineStrategyException(f'Chain worker failed: {e!r}'))
+    finally:
+        connection.close()
+
+
+def _evaluate_unseeded(graph_of_operations: GraphOfOperations, iteration: int) -> BaselineIterationResult:
+    """
+    The graph evaluator of the chains in worker processes, which evaluate graphs by the seeded graph evaluator only.
+    :param graph_of_operations: graph of operations to evaluate
+    :param iteration: current iteration
+    :return: never returns
+    """
+    raise BaselineStrategyException('Chains in worker processes evaluate graphs by the seeded graph evaluator')
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from .baseline_config import BaselineConfig
 
@@ -14,3 +14,6 @@ class SimulatedAnnealingBaselineConfig(BaselineConfig):
 
     cooling_factor: float
     """The cooling factor to decrease the temperature with."""
+
+    initial_temperature: float = field(default=1.0)
+    """The temperature before the first cooling."""
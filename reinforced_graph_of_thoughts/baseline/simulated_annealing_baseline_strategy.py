@@ -1,7 +1,7 @@
 from math import exp, floor
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
-from pure_graph_of_thoughts.api.graph.operation import GraphOfOperations
+from pure_graph_of_thoughts.api.graph.operation import GraphOfOperations, OperationGraphSchema
 from .baseline_strategy import BaselineStrategy
 from .model import BaselineIterationResult, BaselineResultSummary
 from .simulated_annealing_baseline_config import SimulatedAnnealingBaselineConfig
@@ -14,8 +14,9 @@ class SimulatedAnnealingBaselineStrategy(BaselineStrategy):
     The first graph is generated randomly.
     After the first generation, a neighbor of the graph is generated.
     A neighbor is defined as a serial composition of a subgraph of the original graph and a randomly generated subgraph.
-    The current graph is clipped at a random depth and extended with a subgraph of a random depth.
-    If the neighbor could not be generated, the generation is re-tried until a certain threshold
+    The current graph is clipped at a random depth and extended with a subgraph of a random depth,
+    which is drawn among the completions of the clipped graph with a single sink.
+    If the clipped graph has no such completion, the generation is re-tried until a certain threshold
     is reached and a complete re-generation is applied.
     """
 
@@ -30,6 +31,8 @@ class SimulatedAnnealingBaselineStrategy(BaselineStrategy):
     _best_energy: float
     _all_results: List[BaselineIterationResult]
     _selected_result: Optional[BaselineIterationResult]
+    _selected_graph_of_operations: Optional[OperationGraphSchema]
+    _selected_energy: float
     _neighbor_regeneration_threshold: int
     _max_cost: int
 
@@ -38,11 +41,33 @@ class SimulatedAnnealingBaselineStrategy(BaselineStrategy):
         """The current result"""
         return self._selected_result
 
+    @current_result.setter
+    def current_result(self, current_result: Optional[BaselineIterationResult]) -> None:
+        self._select(current_result)
+
     @property
-    def _selected_energy(self) -> float:
-        if self._selected_result is None:
-            return 1.0
-        return self._calculate_energy(self._selected_result)
+    def current_energy(self) -> float:
+        """The energy of the current result"""
+        return self._selected_energy
+
+    @property
+    def current_state(self) -> Tuple[Optional[OperationGraphSchema], float]:
+        """The graph of operations of the current result if it is valid, and the energy of the current result"""
+        return self._selected_graph_of_operations, self._selected_energy
+
+    @current_state.setter
+    def current_state(self, current_state: Tuple[Optional[OperationGraphSchema], float]) -> None:
+        """
+        Sets the current state, e.g. the state of another chain, whose result is not known to this chain.
+        :param current_state: graph of operations if valid and energy
+        """
+        self._selected_result = None
+        self._selected_graph_of_operations, self._selected_energy = current_state
+
+    @property
+    def temperature(self) -> float:
+        """The current temperature"""
+        return self._temperature
 
     def __init__(self, config: SimulatedAnnealingBaselineConfig) -> None:
         """
@@ -51,24 +76,26 @@ class SimulatedAnnealingBaselineStrategy(BaselineStrategy):
         """
         super().__init__(config)
 
-        self._temperature = 1.0
+        self._temperature = config.initial_temperature
         self._cooling_factor = config.cooling_factor
         self._best_energy = 0
         self._all_results = []
         self._selected_result = None
+        self._selected_graph_of_operations = None
+        self._selected_energy = 1.0
         self._neighbor_regeneration_threshold = config.neighbor_regeneration_threshold
         self._max_cost = config.max_depth * config.max_breadth
 
     def generate(self, max_iterations: int, stop_on_first_valid: bool = False) -> BaselineResultSummary:
         for i in range(1, max_iterations + 1):
-            iteration_result = self._generate_single(i)
-            self._all_results.append(iteration_result)
+            iteration_result = self.generate_step(i)
             if stop_on_first_valid and iteration_result.is_valid:
                 return BaselineResultSummary(
                         results=self._all_results,
                         final_result_index=self._all_results.index(iteration_result),
                         max_iterations=max_iterations,
-                        stop_on_first_valid=True
+                        stop_on_first_valid=True,
+                        n_duplicates=self._n_duplicates
                 )
 
         return BaselineResultSummary(
@@ -76,16 +103,27 @@ class SimulatedAnnealingBaselineStrategy(BaselineStrategy):
                 final_result_index=self._all_results.index(
                         self._selected_result
                 ) if self._selected_result is not None else None,
-                max_iterations=max_iterations
+                max_iterations=max_iterations,
+                n_duplicates=self._n_duplicates
         )
 
+    def generate_step(self, iteration: int) -> BaselineIterationResult:
+        """
+        Generates a single step of the chain and records its result.
+        :param iteration: current iteration
+        :return: iteration result
+        """
+        iteration_result = self._generate_single(iteration)
+        self._all_results.append(iteration_result)
+        return iteration_result
+
     def _generate_single(self, iteration: int) -> BaselineIterationResult:
         self._temperature *= self._cooling_factor
         neighbor_graph = self._create_neighbor(
                 GraphOfOperations.from_schema(
-                        self._selected_result.graph_of_operations,
+                        self._selected_graph_of_operations,
                         self._operations
-                ) if self._selected_result is not None and self._selected_result.is_valid else None
+                ) if self._selected_graph_of_operations is not None else None
         )
         iteration_result = self._evaluate_graph(neighbor_graph, iteration)
         current_energy = self._calculate_energy(iteration_result)
@@ -104,10 +142,21 @@ class SimulatedAnnealingBaselineStrategy(BaselineStrategy):
         })
 
         if is_selected:
-            self._selected_result = iteration_result
+            self._select(iteration_result)
 
         return iteration_result
 
+    def _select(self, iteration_result: Optional[BaselineIterationResult]) -> None:
+        """
+        Selects an iteration result as the current result.
+        :param iteration_result: iteration result to select
+        """
+        self._selected_result = iteration_result
+        self._selected_graph_of_operations = iteration_result.graph_of_operations if (
+                iteration_result is not None and iteration_result.is_valid
+        ) else None
+        self._selected_energy = self._calculate_energy(iteration_result) if iteration_result is not None else 1.0
+
     def _calculate_energy(self, iteration_result: BaselineIterationResult) -> float:
         """
         Calculates the energy of a given iteration result.
@@ -130,7 +179,7 @@ class SimulatedAnnealingBaselineStrategy(BaselineStrategy):
         prev_depth = len(operation_array)
 
         clip_depth = self._random.randint(0, prev_depth)
-        clip_layers = operation_array[:clip_depth - 1]
+        clip_layers = operation_array[:max(clip_depth - 1, 0)]
 
         if len(clip_layers) == 0:
             return self._create_neighbor()
@@ -144,14 +193,14 @@ class SimulatedAnnealingBaselineStrategy(BaselineStrategy):
                 divergence_cutoff,
                 clip_layers
         )
-        if neighbor is None or len(neighbor.sinks) > 1:
+        if neighbor is None:
             for _ in range(self._neighbor_regeneration_threshold):
-                self._logger.debug('Generated graph has more than one sink, re-generating neighbor')
+                self._logger.debug('Clipped graph has no completion with a single sink, re-generating neighbor')
                 neighbor = self._create_neighbor(graph)
                 if neighbor is not None:
                     return neighbor
 
-            self._logger.debug('Generated graph has more than one sink, generating random graph')
+            self._logger.debug('Clipped graph has no completion with a single sink, generating random graph')
             return self._create_complete_graph()
 
         return neighbor
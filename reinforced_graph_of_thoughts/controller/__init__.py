@@ -1,2 +1,5 @@
 from .continuous_graph_controller import ContinuousGraphController
 from .layer_action_result import LayerActionResult
+from .layer_execution_cache import LayerExecutionCache, LayerExecutionCacheException, CachedLayer, LayerCachePath
+from .layer_snapshot import LayerSnapshot, ThoughtReference
+from .controller_state import ControllerState, LayerState
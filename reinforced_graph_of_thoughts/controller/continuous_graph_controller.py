@@ -1,32 +1,44 @@
+import asyncio
+import copy
+from concurrent.futures import ThreadPoolExecutor, Executor
+from dataclasses import replace
 from math import ceil
-from typing import Sequence, Optional, Callable, Tuple, List, Dict
+from typing import Sequence, Optional, Callable, Tuple, List, Self, Mapping
 
-from pure_graph_of_thoughts.api.controller import Controller, GraphOfOperationsExecution, ControllerException
-from pure_graph_of_thoughts.api.graph import GraphMutationException
+from pure_graph_of_thoughts.api.controller import Controller, ControllerException
 from pure_graph_of_thoughts.api.graph.operation import GraphOfOperations, OperationNode
-from pure_graph_of_thoughts.api.graph.thought import GraphOfThoughts
+from pure_graph_of_thoughts.api.graph.thought import GraphOfThoughts, ThoughtNode
+from pure_graph_of_thoughts.api.internal.id import Id
 from pure_graph_of_thoughts.api.language_model import LanguageModel
-from pure_graph_of_thoughts.api.operation import Operation, Complexity, AbsoluteComplexity, RelativeComplexity
+from pure_graph_of_thoughts.api.operation import Operation, Complexity, AbsoluteComplexity, RelativeComplexity, \
+    OperationKey, PromptOperation, ScorePromptOperation
 from pure_graph_of_thoughts.api.state import State
+from pure_graph_of_thoughts.api.thought import Thought
+from ..language_model import SeededSimulatedLanguageModel, BatchedLanguageModel
+from .controller_state import ControllerState, LayerState
 from .layer_action_result import LayerActionResult
+from .layer_execution_cache import LayerExecutionCache, LayerCachePath, CachedLayer
+from .layer_snapshot import LayerSnapshot, ThoughtReference
 
 
 class ContinuousGraphController(Controller):
     """
     A controller for executing a graph of operations on a layer basis.
+    The executed layers are kept as a persistent stack of immutable snapshots,
+    hence, removing the sink layer as well as restoring a previous state only requires replacing the top snapshot.
     """
 
     _generate_init_state: Callable[[], Tuple[int, State]]
 
     _complexity: int
 
-    _local_complexity: int
+    _init_state: State
 
-    _local_complexities: Dict[int, int]
+    _source_thought: Thought
 
-    _init_state: State
+    _snapshot: Optional[LayerSnapshot]
 
-    _execution: Optional[GraphOfOperationsExecution]
+    _materialized: Optional[Tuple[LayerSnapshot, GraphOfOperations, GraphOfThoughts]]
 
     _max_depth: int
 
@@ -40,6 +52,12 @@ class ContinuousGraphController(Controller):
 
     _n_operations: int
 
+    _layer_cache: Optional[LayerExecutionCache]
+
+    _max_concurrency: int
+
+    _executor: Optional[ThreadPoolExecutor]
+
     @property
     def max_depth(self) -> int:
         """The maximum depth"""
@@ -69,36 +87,53 @@ class ContinuousGraphController(Controller):
     @property
     def is_initialized(self) -> bool:
         """Whether the controller is initialized"""
-        return self._execution is not None
+        return self._snapshot is not None
 
     @property
     def init_state(self) -> State:
         """The initial state"""
         return self._init_state
 
+    @property
+    def snapshot(self) -> Optional[LayerSnapshot]:
+        """The snapshot of the sink layer, absent if no layer has been appended"""
+        return self._snapshot
+
     @property
     def graph_of_thoughts(self) -> Optional[GraphOfThoughts]:
         """The graph of thoughts"""
-        if self._execution is None:
+        if self._snapshot is None:
             return None
-        return self._execution.graph_of_thoughts
+        _, graph_of_thoughts = self._materialize(self._snapshot)
+        return graph_of_thoughts
 
     @property
     def graph_of_operations(self) -> GraphOfOperations:
         """The graph of operations"""
-        if self._execution is None:
+        if self._snapshot is None:
             raise ControllerException('Graph of operations is None')
-        return self._execution.graph_of_operations
+        graph_of_operations, _ = self._materialize(self._snapshot)
+        return graph_of_operations
+
+    @property
+    def layer_operations(self) -> Sequence[Operation]:
+        """The operations of the layers of the graph of operations"""
+        return [layer.operation for layer in self._snapshot.layers] if self._snapshot is not None else []
+
+    @property
+    def sink_thoughts(self) -> Optional[Sequence[Thought]]:
+        """The thoughts of the sink layer of the graph of thoughts"""
+        return self._snapshot.sink_thoughts if self._snapshot is not None else None
 
     @property
     def current_depth(self) -> int:
         """The current depth"""
-        return self._execution.graph_of_operations.depth if self._execution is not None else 0
+        return self._snapshot.depth if self._snapshot is not None else 0
 
     @property
     def current_breadth(self) -> int:
         """The current breadth"""
-        return self._execution.graph_of_operations.breadth if self._execution is not None else 0
+        return self._snapshot.breadth if self._snapshot is not None else 0
 
     @property
     def complexity(self) -> int:
@@ -108,7 +143,7 @@ class ContinuousGraphController(Controller):
     @property
     def local_complexity(self) -> int:
         """The local complexity"""
-        return self._local_complexity
+        return self._snapshot.local_complexity if self._snapshot is not None else self._complexity
 
     @property
     def divergence(self) -> bool:
@@ -121,10 +156,14 @@ class ContinuousGraphController(Controller):
         return self._n_operations
 
     @property
-    def _present_execution(self) -> GraphOfOperationsExecution:
-        if self._execution is None:
-            raise ControllerException('Execution is None')
-        return self._execution
+    def layer_cache(self) -> Optional[LayerExecutionCache]:
+        """The layer execution cache if present"""
+        return self._layer_cache
+
+    @property
+    def max_concurrency(self) -> int:
+        """The maximum number of operation nodes of a layer processed concurrently"""
+        return self._max_concurrency
 
     def __init__(
             self,
@@ -134,8 +173,25 @@ class ContinuousGraphController(Controller):
             max_breadth: int,
             divergence_cutoff_factor: float,
             max_complexity: int,
-            max_operations: int
+            max_operations: int,
+            layer_cache: Optional[LayerExecutionCache] = None,
+            max_concurrency: int = 1
     ) -> None:
+        """
+        Instantiates a new continuous graph controller.
+        :param language_model: language model to use
+        :param generate_init_state: generator for tuples of complexity and initial state
+        :param max_depth: maximum depth of the graph of operations
+        :param max_breadth: maximum breadth of the graph of operations
+        :param divergence_cutoff_factor: factor used to calculate the divergence cutoff
+        :param max_complexity: maximum local complexity
+        :param max_operations: maximum number of executed operations
+        :param layer_cache: optional cache for executed layers, may be shared across episodes,
+            layers of language models drawing from a random stream are only reused by rollouts from restored states
+        :param max_concurrency: maximum number of operation nodes of a layer processed concurrently,
+            intended for language models answering prompts with high latency,
+            the worker threads are created on first use and owned by the controller until it is closed
+        """
         super().__init__(language_model)
         self._generate_init_state = generate_init_state
         self._max_depth = max_depth
@@ -143,12 +199,12 @@ class ContinuousGraphController(Controller):
         self._divergence_cutoff_factor = divergence_cutoff_factor
         self._max_complexity = max_complexity
         self._max_operations = max_operations
-
-        self._execution = None
-        self._complexity, self._init_state = self._generate_init_state()
-        self._local_complexity = self._complexity
-        self._local_complexities = {}
-        self._n_operations = 0
+        self._layer_cache = layer_cache
+        if max_concurrency < 1:
+            raise ControllerException(f'Maximum concurrency must be positive: {max_concurrency}')
+        self._max_concurrency = max_concurrency
+        self._executor = None
+        self.reset()
 
     def append_layer(self, operation: Operation) -> LayerActionResult:
         """
@@ -167,14 +223,8 @@ class ContinuousGraphController(Controller):
             if local_complexity > self._max_complexity:
                 return LayerActionResult.invalid()
 
-            self._local_complexity = local_complexity
-
             # process valid first operation
-            self._initialize_controller(operation)
-            self._execute_sink_layer()
-
-            self._local_complexities[self.graph_of_operations.sink_layer_index] = self._local_complexity
-            return self._create_layer_action_result()
+            return self._execute_layer(operation, 1, local_complexity)
 
         predecessor_n_outputs, n_operations = self._prepare_append_operation(operation)
         is_valid = self._validate_append_operation(operation, predecessor_n_outputs, n_operations)
@@ -182,17 +232,22 @@ class ContinuousGraphController(Controller):
         if not is_valid:
             return LayerActionResult.invalid()
 
-        operation_nodes: Sequence[OperationNode] = [OperationNode.of(operation) for _ in range(n_operations)]
-
         local_complexity = self._calculate_local_complexity(operation.output_complexity)
         if local_complexity > self._max_complexity:
             return LayerActionResult.invalid()
 
-        self._local_complexity = local_complexity
-        self.graph_of_operations.append_layer(operation_nodes)
-        self._execute_sink_layer()
-        self._local_complexities[self.graph_of_operations.sink_layer_index] = self._local_complexity
-        return self._create_layer_action_result()
+        return self._execute_layer(operation, n_operations, local_complexity)
+
+    async def async_append_layer(self, operation: Operation, executor: Optional[Executor] = None) -> LayerActionResult:
+        """
+        Appends a layer of a given operation to the graph of operations without blocking the event loop.
+        The layer is executed in a worker thread, hence, other coroutines proceed while waiting for the language model.
+        The controller must not be used by other coroutines until the layer is appended.
+        :param operation: operation to append layer of
+        :param executor: executor to append the layer in, the default executor of the event loop if absent
+        :return: action result
+        """
+        return await asyncio.get_running_loop().run_in_executor(executor, self.append_layer, operation)
 
     def _prepare_append_operation(self, operation: Operation) -> Tuple[int, int]:
         """
@@ -200,8 +255,8 @@ class ContinuousGraphController(Controller):
         :param operation: operation to append layer of
         :return: tuple of number of outputs of the predecessors and number of operations to append
         """
-        operation_array = self.graph_of_operations.operation_array
-        predecessor_n_outputs = sum([operation.n_outputs for operation in operation_array[-1]])
+        sink_layer = self._present_snapshot
+        predecessor_n_outputs = sink_layer.n_operation_nodes * sink_layer.operation.n_outputs
         n_operations: int = predecessor_n_outputs // operation.n_inputs
         return predecessor_n_outputs, n_operations
 
@@ -209,7 +264,7 @@ class ContinuousGraphController(Controller):
         if isinstance(output_complexity, AbsoluteComplexity):
             return output_complexity
         elif isinstance(output_complexity, RelativeComplexity):
-            return max(round(self._local_complexity * output_complexity), 1)
+            return max(round(self.local_complexity * output_complexity), 1)
 
     def validate_append_operation(self, operation: Operation) -> bool:
         """
@@ -217,10 +272,39 @@ class ContinuousGraphController(Controller):
         :param operation: operation to append layer of
         :return: whether the appending of the operation is valid
         """
-        if not self.is_initialized:
-            return operation.n_inputs == 1
-        predecessor_n_outputs, n_operations = self._prepare_append_operation(operation)
-        return self._validate_append_operation(operation, predecessor_n_outputs, n_operations)
+        return self.validate_append_operations([operation])[0]
+
+    def validate_append_operations(self, operations: Sequence[Operation]) -> Sequence[bool]:
+        """
+        Validates the appending of each of the given operations in a single pass.
+        The validation follows the same rules as appending a layer, including the maximum local complexity.
+        :param operations: operations to validate
+        :return: whether the appending is valid for each operation
+        """
+        if self._snapshot is None:
+            return [
+                operation.n_inputs == 1
+                and self._calculate_local_complexity(operation.output_complexity) <= self._max_complexity
+                for operation in operations
+            ]
+
+        # limits independent of the operation
+        if self.n_operations >= self.max_operations or self.current_depth > self._max_depth - 1:
+            return [False for _ in operations]
+
+        predecessor_n_outputs = self._snapshot.n_operation_nodes * self._snapshot.operation.n_outputs
+        return [
+            self._validate_append_operation(operation, predecessor_n_outputs, predecessor_n_outputs // operation.n_inputs)
+            and self._calculate_local_complexity(operation.output_complexity) <= self._max_complexity
+            for operation in operations
+        ]
+
+    def validate_remove_sink_layer(self) -> bool:
+        """
+        Validates the removal of the sink layer.
+        :return: whether the removal of the sink layer is valid
+        """
+        return self._snapshot is not None and self._snapshot.parent is not None
 
     def _validate_append_operation(self, operation: Operation, predecessor_n_outputs: int, n_operations: int) -> bool:
 
@@ -249,54 +333,406 @@ class ContinuousGraphController(Controller):
     def remove_sink_layer(self) -> LayerActionResult:
         """
         Removes the sink layer of the graph of operations.
+        The number of executed operations is retained.
         :return: action result
         """
-        if not self.is_initialized or self.graph_of_operations.sink_layer_index == 0:
-            return LayerActionResult.invalid()
-        graph_of_operations = self.graph_of_operations
-        graph_of_thoughts = self.graph_of_thoughts
-        try:
-            graph_of_operations.remove_layer(graph_of_operations.sink_layer_index)
-            if graph_of_thoughts is not None:
-                graph_of_thoughts.remove_layer(graph_of_thoughts.sink_layer_index)
-            self._local_complexity = self._local_complexities[graph_of_operations.sink_layer_index]
-            return self._create_layer_action_result()
-        except GraphMutationException:
+        if self._snapshot is None or self._snapshot.parent is None:
             return LayerActionResult.invalid()
+        self._snapshot = self._snapshot.parent
+        return LayerActionResult(score=self._snapshot.score)
 
-    def _create_layer_action_result(self) -> LayerActionResult:
-        sink_thought_layer = self._present_execution.graph_of_thoughts.sink_layer
-        sink_thoughts = [thought_node.thought for thought_node in sink_thought_layer]
+    def restore(self, snapshot: Optional[LayerSnapshot]) -> None:
+        """
+        Restores the state of a previously taken snapshot of the current initial state.
+        The number of executed operations is restored to the number at the time the snapshot was taken.
+        :param snapshot: snapshot to restore, absent to restore the state without any layers
+        """
+        if snapshot is not None and snapshot.source is not self._source_thought:
+            raise ControllerException('Snapshot does not originate from the current initial state')
+        self._snapshot = snapshot
+        self._n_operations = snapshot.n_operations if snapshot is not None else 0
 
+    def get_state(self) -> ControllerState:
+        """
+        Captures the state of the controller.
+        The state of the random number generator of the language model is included if the language model is seeded.
+        :return: picklable controller state
+        """
+        return ControllerState(
+                complexity=self._complexity,
+                init_state=self._init_state,
+                layers=[
+                    LayerState(
+                            operation_key=layer.operation.key,
+                            operation_node_ids=layer.operation_node_ids,
+                            thoughts=layer.thoughts,
+                            local_complexity=layer.local_complexity,
+                            n_operations=layer.n_operations,
+                            layer_cache_path=layer.layer_cache_path
+                    )
+                    for layer in (self._snapshot.layers if self._snapshot is not None else [])
+                ],
+                n_operations=self._n_operations,
+                language_model_random_state=self._language_model.random_state if isinstance(
+                        self._language_model, SeededSimulatedLanguageModel
+                ) else None
+        )
+
+    def set_state(self, state: ControllerState, operations: Sequence[Operation]) -> None:
+        """
+        Sets the state of the controller.
+        The layers are restored from the captured thoughts without prompting the language model.
+        :param state: controller state to set
+        :param operations: operations to resolve the operation keys of the layers with
+        """
+        operations_by_key: Mapping[OperationKey, Operation] = {
+            operation.key: operation for operation in operations
+        }
+        self._complexity = state.complexity
+        self._init_state = state.init_state
+        self._source_thought = Thought(state=self._init_state)
+        self._snapshot = None
+        self._materialized = None
+
+        for layer in state.layers:
+            if layer.operation_key not in operations_by_key:
+                raise ControllerException(f'Operation is not available: {layer.operation_key}')
+            operation = operations_by_key[layer.operation_key]
+            parent = self._snapshot
+            inputs = self._wire_inputs(
+                    self._get_predecessor_thoughts(parent),
+                    parent.operation.n_outputs if parent is not None else 1,
+                    operation.n_inputs,
+                    len(layer.operation_node_ids)
+            )
+            self._n_operations = layer.n_operations
+            self._push_layer(
+                    operation,
+                    layer.operation_node_ids,
+                    inputs,
+                    layer.thoughts,
+                    layer.local_complexity,
+                    # the stream positions at which the layers were executed are only known from the captured paths
+                    layer.layer_cache_path
+                    if self._layer_cache is not None and self._layer_cache.is_stream_dependent
+                    else self._create_layer_cache_path(parent, operation)
+            )
+        self._n_operations = state.n_operations
+
+        if state.language_model_random_state is not None:
+            if not isinstance(self._language_model, SeededSimulatedLanguageModel):
+                raise ControllerException('Language model does not support setting the random state')
+            self._language_model.random_state = state.language_model_random_state
+
+    def clone(self) -> Self:
+        """
+        Clones the controller.
+        The clone shares the language model, the layer execution cache and all snapshots with the controller,
+        but appending and removing layers does not affect the original controller.
+        The clone owns its own worker threads.
+        :return: cloned controller
+        """
+        clone = copy.copy(self)
+        clone._executor = None
+        return clone
+
+    def close(self) -> None:
+        """
+        Shuts down the worker threads processing the operation nodes of layers concurrently.
+        The worker threads are created again if further layers are processed concurrently.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    @property
+    def _present_snapshot(self) -> LayerSnapshot:
+        if self._snapshot is None:
+            raise ControllerException('Snapshot is None')
+        return self._snapshot
+
+    def _execute_layer(self, operation: Operation, n_operation_nodes: int, local_complexity: int) -> LayerActionResult:
+        parent = self._snapshot
+        predecessor_thoughts = self._get_predecessor_thoughts(parent)
+        predecessor_n_outputs = parent.operation.n_outputs if parent is not None else 1
+
+        operation_nodes = [OperationNode.of(operation) for _ in range(n_operation_nodes)]
+        inputs = self._wire_inputs(predecessor_thoughts, predecessor_n_outputs, operation.n_inputs, n_operation_nodes)
+        self._n_operations += n_operation_nodes
+
+        layer_cache_path = self._create_layer_cache_path(parent, operation)
+        cached_layer: Optional[CachedLayer] = None
+        if self._layer_cache is not None and layer_cache_path is not None:
+            cached_layer = self._layer_cache.lookup(layer_cache_path)
+
+        thoughts: Sequence[Sequence[Thought]]
+        if self._layer_cache is not None and cached_layer is not None:
+            self._layer_cache.seek(cached_layer)
+            thoughts = [
+                [replace(thought, origin_id=operation_node.id) for thought in node_thoughts]
+                for operation_node, node_thoughts in zip(operation_nodes, cached_layer.thoughts)
+            ]
+        else:
+            thoughts = self._process_layer(
+                    operation,
+                    operation_nodes,
+                    [
+                        [predecessor_thoughts[node_index][output_index] for node_index, output_index in node_inputs]
+                        for node_inputs in inputs
+                    ]
+            )
+
+        snapshot = self._push_layer(
+                operation,
+                [operation_node.id for operation_node in operation_nodes],
+                inputs,
+                thoughts,
+                local_complexity,
+                layer_cache_path
+        )
+
+        if self._layer_cache is not None and layer_cache_path is not None and cached_layer is None:
+            self._layer_cache.store(layer_cache_path, self._layer_cache.create_layer(thoughts, snapshot.score))
+
+        return LayerActionResult(score=snapshot.score)
+
+    def _process_layer(
+            self,
+            operation: Operation,
+            operation_nodes: Sequence[OperationNode],
+            input_thoughts: Sequence[Sequence[Thought]]
+    ) -> Sequence[Sequence[Thought]]:
+        """
+        Processes the operation nodes of a layer.
+        The prompts of a prompt operation are answered at once if the language model supports batches,
+        unless the score operation prompts the language model as well, as the order of the prompts is preserved.
+        Otherwise, the operation nodes are processed concurrently if the maximum concurrency permits,
+        the output thoughts are joined in order of the operation nodes.
+        :param operation: operation of the layer
+        :param operation_nodes: operation nodes of the layer
+        :param input_thoughts: input thoughts of each operation node
+        :return: output thoughts of each operation node
+        """
+        if (
+                isinstance(operation, PromptOperation)
+                and isinstance(self._language_model, BatchedLanguageModel)
+                and not isinstance(operation.score_operation, ScorePromptOperation)
+        ):
+            return self._process_prompt_layer(operation, self._language_model, operation_nodes, input_thoughts)
+        if self._max_concurrency > 1 and len(operation_nodes) > 1:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_concurrency)
+            return list(self._executor.map(self._process_operation, operation_nodes, input_thoughts))
+        return [
+            self._process_operation(operation_node, node_input_thoughts)
+            for operation_node, node_input_thoughts in zip(operation_nodes, input_thoughts)
+        ]
+
+    def _process_prompt_layer(
+            self,
+            operation: PromptOperation,
+            language_model: BatchedLanguageModel,
+            operation_nodes: Sequence[OperationNode],
+            input_thoughts: Sequence[Sequence[Thought]]
+    ) -> Sequence[Sequence[Thought]]:
+        """
+        Processes the operation nodes of a prompt operation layer with a single batch of prompts.
+        The thoughts are equal to the thoughts of processing each operation node in order.
+        :param operation: prompt operation of the layer
+        :param language_model: language model to prompt
+        :param operation_nodes: operation nodes of the layer
+        :param input_thoughts: input thoughts of each operation node
+        :return: output thoughts of each operation node
+        """
+        self._logger.info('Processing operation %s for %d operation nodes', operation, len(operation_nodes))
+        input_states = [
+            operation.transform_before([thought.state for thought in node_input_thoughts])
+            for node_input_thoughts in input_thoughts
+        ]
+        cumulative_scores = [
+            sum([
+                thought.cumulative_score for thought in node_input_thoughts if thought.cumulative_score is not None
+            ])
+            for node_input_thoughts in input_thoughts
+        ]
+        raw_output_states = language_model.prompt_batch([(operation.prompt, input_state) for input_state in input_states])
+
+        thoughts: List[Sequence[Thought]] = []
+        for operation_node, input_state, cumulative_score, raw_output_state in zip(
+                operation_nodes, input_states, cumulative_scores, raw_output_states
+        ):
+            output_states = operation.transform_after(raw_output_state)
+            if operation.is_scorable and operation.score_operation is not None:
+                thoughts.append([
+                    self._process_score_operation(
+                            operation.score_operation,
+                            operation_node,
+                            cumulative_score,
+                            input_state,
+                            output_state,
+                            output_states
+                    )
+                    for output_state in output_states
+                ])
+            else:
+                thoughts.append([
+                    Thought(state=output_state, origin_id=operation_node.id, cumulative_score=cumulative_score)
+                    for output_state in output_states
+                ])
+        return thoughts
+
+    def _get_predecessor_thoughts(self, parent: Optional[LayerSnapshot]) -> Sequence[Sequence[Thought]]:
+        return parent.thoughts if parent is not None else [[self._source_thought]]
+
+    def _create_layer_cache_path(self, parent: Optional[LayerSnapshot], operation: Operation) -> Optional[LayerCachePath]:
+        if self._layer_cache is None:
+            return None
+        if parent is None:
+            predecessor_path: LayerCachePath = (LayerExecutionCache.fingerprint(self._init_state),)
+        elif parent.layer_cache_path is not None:
+            predecessor_path = parent.layer_cache_path
+        else:
+            # layers below an uncached layer are not cached either
+            return None
+        return predecessor_path + (self._layer_cache.create_layer_key(operation),)
+
+    def _push_layer(
+            self,
+            operation: Operation,
+            operation_node_ids: Sequence[Id],
+            inputs: Sequence[Sequence[ThoughtReference]],
+            thoughts: Sequence[Sequence[Thought]],
+            local_complexity: int,
+            layer_cache_path: Optional[LayerCachePath]
+    ) -> LayerSnapshot:
+        """
+        Pushes the snapshot of an executed layer on top of the current snapshot.
+        :param operation: operation of the layer
+        :param operation_node_ids: IDs of the operation nodes
+        :param inputs: references to the input thoughts of each operation node
+        :param thoughts: output thoughts of each operation node
+        :param local_complexity: local complexity after executing the layer
+        :param layer_cache_path: path of the layer in the layer execution cache if applicable
+        :return: pushed snapshot
+        """
+        parent = self._snapshot
+        predecessor_is_reachable: Sequence[bool] = parent.is_reachable if parent is not None else [True]
+        predecessor_thought_layer_indices: Sequence[int] = parent.thought_layer_indices if parent is not None else [0]
+
+        # a thought is part of the graph of thoughts if any of its input thoughts is,
+        # its layer index is determined by its first input thought
+        is_reachable = [
+            any(predecessor_is_reachable[node_index] for node_index, _ in node_inputs) for node_inputs in inputs
+        ]
+        thought_layer_indices = [
+            predecessor_thought_layer_indices[node_inputs[0][0]] + 1 if len(node_inputs) > 0 else 0
+            for node_inputs in inputs
+        ]
+        sink_thought_layer_index = parent.sink_thought_layer_index if parent is not None else 0
+        sink_thoughts: Sequence[Thought] = parent.sink_thoughts if parent is not None else [self._source_thought]
+        for node_thoughts, is_node_reachable, thought_layer_index in zip(thoughts, is_reachable, thought_layer_indices):
+            if not is_node_reachable or len(node_thoughts) == 0 or thought_layer_index < sink_thought_layer_index:
+                continue
+            if thought_layer_index > sink_thought_layer_index:
+                sink_thought_layer_index = thought_layer_index
+                sink_thoughts = []
+            sink_thoughts = [*sink_thoughts, *node_thoughts]
         scores = [
             sink_thought.score for sink_thought in sink_thoughts if sink_thought.score is not None
         ]
-        score = min(scores) if len(scores) > 0 else None
-
-        return LayerActionResult(score=score)
-
-    def _execute_sink_layer(self) -> None:
-        sink_operation_layer: Sequence[OperationNode] = self.graph_of_operations.sink_layer
-        self._n_operations += len(sink_operation_layer)
-        for operation_node in sink_operation_layer:
-            self._present_execution.process_operation(operation_node, self._process_operation_node)
-
-    def _initialize_controller(self, operation: Operation) -> None:
-        source_operation_node = OperationNode.of(operation)
-        graph_of_operations = GraphOfOperations.from_source(source_operation_node)
-        graph_of_thoughts = GraphOfThoughts.from_init_state(self._init_state)
-        self._execution = GraphOfOperationsExecution(
-                graph_of_operations=graph_of_operations,
-                graph_of_thoughts=graph_of_thoughts,
-                operation_cursor=source_operation_node
+
+        n_operation_nodes = len(operation_node_ids)
+        self._snapshot = LayerSnapshot(
+                parent=parent,
+                source=self._source_thought,
+                operation=operation,
+                operation_node_ids=operation_node_ids,
+                inputs=inputs,
+                thoughts=thoughts,
+                is_reachable=is_reachable,
+                thought_layer_indices=thought_layer_indices,
+                sink_thought_layer_index=sink_thought_layer_index,
+                sink_thoughts=sink_thoughts,
+                score=min(scores) if len(scores) > 0 else None,
+                local_complexity=local_complexity,
+                n_operations=self._n_operations,
+                depth=parent.depth + 1 if parent is not None else 1,
+                breadth=max(parent.breadth, n_operation_nodes) if parent is not None else n_operation_nodes,
+                layer_cache_path=layer_cache_path
         )
+        return self._snapshot
+
+    @staticmethod
+    def _wire_inputs(
+            predecessor_thoughts: Sequence[Sequence[Thought]],
+            predecessor_n_outputs: int,
+            n_inputs: int,
+            n_operation_nodes: int
+    ) -> Sequence[Sequence[ThoughtReference]]:
+        """
+        Wires the output thoughts of the predecessor layer to the inputs of the operation nodes of a new layer.
+        The wiring is equivalent to the execution of a graph of operations:
+        Each predecessor fills its output thoughts into buckets of the size of the successors' number of inputs,
+        and each connection to a predecessor contributes the bucket at the first position of the successor.
+        :param predecessor_thoughts: output thoughts of each operation node of the predecessor layer
+        :param predecessor_n_outputs: number of outputs of the predecessor operation
+        :param n_inputs: number of inputs of the operation
+        :param n_operation_nodes: number of operation nodes of the new layer
+        :return: references to the input thoughts for each operation node
+        """
+        inputs: List[Sequence[ThoughtReference]] = []
+        for node_index in range(n_operation_nodes):
+            node_inputs: List[ThoughtReference] = []
+            for input_index in range(n_inputs):
+                predecessor_index = (node_index * n_inputs + input_index) // predecessor_n_outputs
+                bucket_index = max(node_index * n_inputs - predecessor_index * predecessor_n_outputs, 0)
+                bucket_end = min((bucket_index + 1) * n_inputs, len(predecessor_thoughts[predecessor_index]))
+                node_inputs.extend(
+                        (predecessor_index, output_index)
+                        for output_index in range(bucket_index * n_inputs, bucket_end)
+                )
+            inputs.append(node_inputs)
+        return inputs
+
+    def _materialize(self, snapshot: LayerSnapshot) -> Tuple[GraphOfOperations, GraphOfThoughts]:
+        """
+        Materializes the graph of operations and the graph of thoughts of the given snapshot.
+        The graphs of the most recently materialized snapshot are memoized.
+        :param snapshot: snapshot to materialize
+        :return: tuple of graph of operations and graph of thoughts
+        """
+        if self._materialized is not None and self._materialized[0] is snapshot:
+            return self._materialized[1], self._materialized[2]
+
+        source_thought_node = ThoughtNode.of(snapshot.source)
+        predecessor_thought_nodes: Sequence[Sequence[ThoughtNode]] = [[source_thought_node]]
+        graph_of_operations: Optional[GraphOfOperations] = None
+        for layer in snapshot.layers:
+            operation_nodes = [
+                OperationNode.of(layer.operation, id=operation_node_id) for operation_node_id in layer.operation_node_ids
+            ]
+            if graph_of_operations is None:
+                graph_of_operations = GraphOfOperations.from_source(operation_nodes[0])
+            else:
+                graph_of_operations.append_layer(operation_nodes)
+            thought_nodes = [[ThoughtNode.of(thought) for thought in node_thoughts] for node_thoughts in layer.thoughts]
+            for node_inputs, output_thought_nodes in zip(layer.inputs, thought_nodes):
+                for node_index, output_index in node_inputs:
+                    predecessor_thought_nodes[node_index][output_index].append_all(output_thought_nodes)
+            predecessor_thought_nodes = thought_nodes
+
+        if graph_of_operations is None:
+            raise ControllerException('Graph of operations is None')
+        graph_of_thoughts = GraphOfThoughts.from_source(source_thought_node)
+        self._materialized = (snapshot, graph_of_operations, graph_of_thoughts)
+        return graph_of_operations, graph_of_thoughts
 
     def reset(self) -> None:
         """
         Resets the execution state.
         """
-        self._execution = None
         self._complexity, self._init_state = self._generate_init_state()
-        self._local_complexity = self._complexity
-        self._local_complexities = {}
+        self._source_thought = Thought(state=self._init_state)
+        self._snapshot = None
+        self._materialized = None
         self._n_operations = 0
@@ -0,0 +1,57 @@
+from dataclasses import dataclass, field
+from typing import Sequence, Optional
+
+from pure_graph_of_thoughts.api.internal.id import Id
+from pure_graph_of_thoughts.api.operation import OperationKey
+from pure_graph_of_thoughts.api.state import State
+from pure_graph_of_thoughts.api.thought import Thought
+from .layer_execution_cache import LayerCachePath
+from ..language_model import RandomState
+
+
+@dataclass(frozen=True, kw_only=True)
+class LayerState:
+    """
+    Represents the picklable state of an executed layer.
+    """
+
+    operation_key: OperationKey
+    """The key of the operation of the layer"""
+
+    operation_node_ids: Sequence[Id]
+    """The IDs of the operation nodes of the layer"""
+
+    thoughts: Sequence[Sequence[Thought]]
+    """The output thoughts of each operation node"""
+
+    local_complexity: int
+    """The local complexity after executing the layer"""
+
+    n_operations: int
+    """The number of operations executed by the controller up to and including the layer"""
+
+    layer_cache_path: Optional[LayerCachePath] = field(default=None)
+    """The path of the layer in the layer execution cache if applicable"""
+
+
+@dataclass(frozen=True, kw_only=True)
+class ControllerState:
+    """
+    Represents the picklable state of a continuous graph controller.
+    The state does not contain any operations, they are referenced by their keys instead.
+    """
+
+    complexity: int
+    """The complexity of the initial state"""
+
+    init_state: State
+    """The initial state"""
+
+    layers: Sequence[LayerState]
+    """The states of all executed layers from the source layer to the sink layer"""
+
+    n_operations: int
+    """The number of executed operations"""
+
+    language_model_random_state: Optional[RandomState] = field(default=None)
+    """The state of the random number generator of the language model if applicable"""
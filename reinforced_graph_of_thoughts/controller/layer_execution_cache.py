@@ -0,0 +1,226 @@
+import json
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Sequence, Dict, Hashable, Callable, Tuple, Self
+
+from pure_graph_of_thoughts.api.operation import Operation
+from pure_graph_of_thoughts.api.state import State
+from pure_graph_of_thoughts.api.thought import Thought
+from ..language_model import StreamPosition
+
+LayerCachePath = Tuple[Hashable, ...]
+"""Represents a path in the layer execution cache, consisting of the initial state fingerprint and the layer keys."""
+
+
+@dataclass(frozen=True, kw_only=True)
+class CachedLayer:
+    """
+    Represents the cached result of an executed layer.
+    """
+
+    thoughts: Sequence[Sequence[Thought]]
+    """The output thoughts of each operation node of the layer"""
+
+    score: Optional[float] = field(default=None)
+    """The score of the layer if applicable"""
+
+    stream_position: Optional[StreamPosition] = field(default=None)
+    """The position in the stream of the language model after executing the layer if applicable"""
+
+
+@dataclass(eq=False)
+class _TrieNode:
+    key: Hashable
+    parent: Optional[Self]
+    children: Dict[Hashable, Self] = field(default_factory=dict)
+    layer: Optional[CachedLayer] = field(default=None)
+
+
+class LayerExecutionCache:
+    """
+    A bounded cache for executed layers of a graph of operations.
+    The cache is structured as a trie.
+    A path consists of the fingerprint of the initial state followed by the keys of all layers up to the cached layer.
+    Cached layers are evicted in least recently used order once the maximum size is exceeded.
+    For language models drawing from a random stream, each layer key contains the position in the stream
+    before executing the layer, and a cache hit advances the stream to the position after executing the layer,
+    hence, the cache does not change the answers of the language model.
+    Such layers are only reused if the stream is at the same position again, i.e. by rollouts from a restored state,
+    whereas backtracking and re-appending a layer or later episodes advance the stream and never hit the cache.
+    """
+
+    _max_size: int
+    _stream_position: Optional[Callable[[], StreamPosition]]
+    _seek_stream_position: Optional[Callable[[StreamPosition], None]]
+    _root: _TrieNode
+    _lru: OrderedDict[LayerCachePath, _TrieNode]
+    _n_hits: int
+    _n_misses: int
+
+    @property
+    def max_size(self) -> int:
+        """The maximum number of cached layers"""
+        return self._max_size
+
+    @property
+    def size(self) -> int:
+        """The number of cached layers"""
+        return len(self._lru)
+
+    @property
+    def is_stream_dependent(self) -> bool:
+        """Whether cached layers depend on the position in the stream of the language model"""
+        return self._stream_position is not None
+
+    @property
+    def n_hits(self) -> int:
+        """The number of cache hits"""
+        return self._n_hits
+
+    @property
+    def n_misses(self) -> int:
+        """The number of cache misses"""
+        return self._n_misses
+
+    @property
+    def hit_rate(self) -> float:
+        """The rate of cache hits among all lookups"""
+        n_lookups = self._n_hits + self._n_misses
+        return self._n_hits / n_lookups if n_lookups > 0 else 0.0
+
+    def __init__(
+            self,
+            max_size: int,
+            stream_position: Optional[Callable[[], StreamPosition]] = None,
+            seek_stream_position: Optional[Callable[[StreamPosition], None]] = None
+    ) -> None:
+        """
+        Instantiates a new layer execution cache.
+        :param max_size: maximum number of cached layers
+        :param stream_position: optional function returning the current position in the language model's seed stream,
+                                cached layers are then only reused for the same position
+        :param seek_stream_position: function advancing the language model's seed stream to a given position,
+                                     required if the stream position is given
+        """
+        if max_size < 1:
+            raise LayerExecutionCacheException('Maximum size must be positive')
+        if (stream_position is None) != (seek_stream_position is None):
+            raise LayerExecutionCacheException('Stream position and seeking the stream position must be given together')
+        self._max_size = max_size
+        self._stream_position = stream_position
+        self._seek_stream_position = seek_stream_position
+        self._root = _TrieNode(key=None, parent=None)
+        self._lru = OrderedDict()
+        self._n_hits = 0
+        self._n_misses = 0
+
+    @staticmethod
+    def fingerprint(init_state: State) -> Hashable:
+        """
+        Creates the fingerprint of an initial state.
+        :param init_state: initial state
+        :return: fingerprint
+        """
+        return json.dumps(init_state, sort_keys=True, default=str)
+
+    def create_layer_key(self, operation: Operation) -> Hashable:
+        """
+        Creates the key of a layer of the given operation.
+        The key must be created before the layer is executed.
+        :param operation: operation of the layer
+        :return: layer key
+        """
+        if self._stream_position is None:
+            return operation.key
+        return operation.key, self._stream_position()
+
+    def create_layer(self, thoughts: Sequence[Sequence[Thought]], score: Optional[float]) -> CachedLayer:
+        """
+        Creates the cached layer of an executed layer.
+        The cached layer must be created right after the layer is executed.
+        :param thoughts: output thoughts of each operation node of the layer
+        :param score: score of the layer if applicable
+        :return: cached layer
+        """
+        return CachedLayer(
+                thoughts=thoughts,
+                score=score,
+                stream_position=self._stream_position() if self._stream_position is not None else None
+        )
+
+    def seek(self, layer: CachedLayer) -> None:
+        """
+        Advances the stream of the language model to the position after executing a cached layer.
+        The stream must be at the position before executing the layer, as given by its key.
+        :param layer: cached layer
+        """
+        if self._seek_stream_position is not None and layer.stream_position is not None:
+            self._seek_stream_position(layer.stream_position)
+
+    def lookup(self, path: LayerCachePath) -> Optional[CachedLayer]:
+        """
+        Looks up the cached layer at the given path.
+        :param path: cache path
+        :return: cached layer if present
+        """
+        node = self._find_node(path)
+        if node is None or node.layer is None:
+            self._n_misses += 1
+            return None
+        self._n_hits += 1
+        self._lru.move_to_end(path)
+        return node.layer
+
+    def store(self, path: LayerCachePath, layer: CachedLayer) -> None:
+        """
+        Stores a layer at the given path.
+        :param path: cache path
+        :param layer: layer to cache
+        """
+        node = self._root
+        for key in path:
+            child = node.children.get(key)
+            if child is None:
+                child = _TrieNode(key=key, parent=node)
+                node.children[key] = child
+            node = child
+        node.layer = layer
+        self._lru[path] = node
+        self._lru.move_to_end(path)
+        while len(self._lru) > self._max_size:
+            _, evicted_node = self._lru.popitem(last=False)
+            self._evict(evicted_node)
+
+    def clear(self) -> None:
+        """
+        Removes all cached layers and resets the statistics.
+        """
+        self._root = _TrieNode(key=None, parent=None)
+        self._lru.clear()
+        self._n_hits = 0
+        self._n_misses = 0
+
+    def _find_node(self, path: LayerCachePath) -> Optional[_TrieNode]:
+        node: Optional[_TrieNode] = self._root
+        for key in path:
+            if node is None:
+                return None
+            node = node.children.get(key)
+        return node
+
+    @staticmethod
+    def _evict(node: _TrieNode) -> None:
+        node.layer = None
+        current = node
+        while current.parent is not None and current.layer is None and len(current.children) == 0:
+            del current.parent.children[current.key]
+            current = current.parent
+
+
+class LayerExecutionCacheException(Exception):
+    """
+    An exception raised in context of the layer execution cache.
+    """
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
@@ -0,0 +1,83 @@
+from dataclasses import dataclass, field
+from typing import Optional, Sequence, Tuple, List
+
+from pure_graph_of_thoughts.api.internal.id import Id
+from pure_graph_of_thoughts.api.operation import Operation
+from pure_graph_of_thoughts.api.thought import Thought
+from .layer_execution_cache import LayerCachePath
+
+ThoughtReference = Tuple[int, int]
+"""Represents a reference to an output thought by the index of the operation node and the index of the output."""
+
+
+@dataclass(frozen=True, kw_only=True, eq=False)
+class LayerSnapshot:
+    """
+    Represents an immutable snapshot of an executed layer.
+    Each snapshot references the snapshot of its predecessor layer,
+    hence, the snapshots form a persistent stack with structural sharing among all derived snapshots.
+    """
+
+    parent: Optional['LayerSnapshot']
+    """The snapshot of the predecessor layer, absent for the source layer"""
+
+    source: Thought
+    """The initial thought of the graph of thoughts"""
+
+    operation: Operation
+    """The operation of the layer"""
+
+    operation_node_ids: Sequence[Id]
+    """The IDs of the operation nodes of the layer"""
+
+    inputs: Sequence[Sequence[ThoughtReference]]
+    """The references to the input thoughts in the predecessor layer for each operation node"""
+
+    thoughts: Sequence[Sequence[Thought]]
+    """The output thoughts of each operation node"""
+
+    is_reachable: Sequence[bool]
+    """Whether the output thoughts of each operation node are reachable from the initial thought"""
+
+    thought_layer_indices: Sequence[int]
+    """The index of the layer in the graph of thoughts of the output thoughts of each operation node"""
+
+    sink_thought_layer_index: int
+    """The index of the sink layer of the graph of thoughts"""
+
+    sink_thoughts: Sequence[Thought]
+    """The thoughts of the sink layer of the graph of thoughts"""
+
+    score: Optional[float]
+    """The score of the sink layer if applicable"""
+
+    local_complexity: int
+    """The local complexity after executing the layer"""
+
+    n_operations: int
+    """The number of operations executed by the controller up to and including the layer"""
+
+    depth: int
+    """The depth of the graph of operations"""
+
+    breadth: int
+    """The breadth of the graph of operations"""
+
+    layer_cache_path: Optional[LayerCachePath] = field(default=None)
+    """The path of the layer in the layer execution cache if applicable"""
+
+    @property
+    def n_operation_nodes(self) -> int:
+        """The number of operation nodes in the layer"""
+        return len(self.operation_node_ids)
+
+    @property
+    def layers(self) -> Sequence['LayerSnapshot']:
+        """All snapshots from the source layer to the current layer"""
+        layers: List[LayerSnapshot] = []
+        snapshot: Optional[LayerSnapshot] = self
+        while snapshot is not None:
+            layers.append(snapshot)
+            snapshot = snapshot.parent
+        layers.reverse()
+        return layers
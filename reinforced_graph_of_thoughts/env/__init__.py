@@ -3,6 +3,8 @@ from gymnasium.envs.registration import register
 from .action_type import ActionType
 from .graph_observation_component import GraphObservationComponent
 from .graph_of_thoughts_env import GraphOfThoughtsEnv, GraphOfThoughtsEnvException
+from .graph_of_thoughts_env_state import GraphOfThoughtsEnvState
+from .graph_of_thoughts_vec_env import GraphOfThoughtsVecEnv
 from .graph_step_reward import GraphStepReward, GraphStepRewardException
 from .graph_step_reward_version import GraphStepRewardVersion
 from .layer_action import LayerAction
@@ -1,7 +1,10 @@
+import asyncio
 import logging
-from typing import Any, SupportsFloat, Sequence, Tuple, Dict, Optional, Callable, Mapping, List
+from concurrent.futures import Executor
+from typing import Any, SupportsFloat, Sequence, Tuple, Dict, Optional, Callable, Mapping
 
 import numpy as np
+import numpy.typing as npt
 from gymnasium import Env
 from gymnasium.vector.utils import spaces
 
@@ -10,8 +13,10 @@ from pure_graph_of_thoughts.api.graph.thought import GraphOfThoughts
 from pure_graph_of_thoughts.api.operation import Operation
 from pure_graph_of_thoughts.api.state import State
 from pure_graph_of_thoughts.api.task import Task, InvertedOperationIndex
+from pure_graph_of_thoughts.api.thought import Thought
 from .action_type import ActionType
 from .graph_observation_component import GraphObservationComponent
+from .graph_of_thoughts_env_state import GraphOfThoughtsEnvState
 from .graph_step_reward import GraphStepReward
 from .graph_step_reward_version import GraphStepRewardVersion
 from .layer_action import LayerAction
@@ -26,9 +31,109 @@ DEFAULT_ACTION_LOOKBACK = 4
 DEFAULT_MAX_STEPS = 100
 
 
+def create_observation_space(
+        n_operations: int,
+        max_depth: int,
+        max_breadth: int,
+        max_complexity: int,
+        action_lookback: int,
+        seed: int
+) -> MultiSpace:
+    """
+    Creates the observation space of a graph of thoughts environment.
+    :param n_operations: number of operations of the task
+    :param max_depth: maximum depth of the graph of operations
+    :param max_breadth: maximum breadth of the graph of operations
+    :param max_complexity: maximum complexity
+    :param action_lookback: lookback for actions
+    :param seed: seed for the random number generator
+    :return: observation space
+    """
+    optional_operation_representation = n_operations + 1
+    optional_action_representation = len([ActionType.STOP, ActionType.BACKTRACK]) + n_operations + 1
+    return MultiSpace.of({
+        GraphObservationComponent.DEPTH: OrdinalDiscreteSpace(max_depth + 1, seed=seed),
+        GraphObservationComponent.BREADTH: OrdinalDiscreteSpace(max_breadth + 1, seed=seed),
+        GraphObservationComponent.COMPLEXITY: OrdinalDiscreteSpace(max_complexity, start=1, seed=seed),
+        GraphObservationComponent.LOCAL_COMPLEXITY: OrdinalDiscreteSpace(max_complexity + 1, start=0, seed=seed),
+        GraphObservationComponent.GRAPH_OPERATIONS: MultiDiscreteSpace(
+                [
+                    optional_operation_representation
+                    for _ in range(max_depth)
+                ],
+                seed=seed
+        ),
+        GraphObservationComponent.PREV_ACTIONS: MultiDiscreteSpace(
+                [
+                    optional_action_representation
+                    for _ in range(action_lookback)
+                ],
+                seed=seed
+        ),
+        GraphObservationComponent.PREV_SCORE: OptionalBoolSpace(seed=seed)
+    }, seed=seed)
+
+
+def calculate_final_reward(
+        task: Task, controller: ContinuousGraphController, reward: GraphStepReward
+) -> GraphStepReward:
+    """
+    Calculates the final reward by evaluating the sink thoughts of the controller.
+    :param task: task to solve
+    :param controller: controller of the episode
+    :param reward: reward of the final step
+    :return: final reward
+    """
+    reward = reward.final()
+    sink_thoughts: Optional[Sequence[Thought]] = controller.sink_thoughts
+    if sink_thoughts is None:
+        return reward.invalid()
+    if len(sink_thoughts) > 1:
+        return reward.scored(False)
+    init_state: State = controller.init_state
+    final_state: State = sink_thoughts[0].state
+    is_solved = task.evaluator.evaluate(init_state, final_state)
+    if is_solved:
+        return reward.scored(True)
+    else:
+        return reward.scored(False)
+
+
+def create_layer_actions(operations: Sequence[Operation]) -> Sequence[LayerAction]:
+    """
+    Creates the table of all layer actions indexed by encoded action.
+    :param operations: operations of the task
+    :return: layer actions indexed by encoded action
+    """
+    return (
+        LayerAction(ActionType.STOP),
+        LayerAction(ActionType.BACKTRACK),
+        *(LayerAction(ActionType.APPEND_OPERATION, operation) for operation in operations)
+    )
+
+
+def create_action_mask(
+        controller: ContinuousGraphController, operations: Sequence[Operation]
+) -> npt.NDArray[np.bool_]:
+    """
+    Creates the mask of valid actions of a controller.
+    Stopping is always valid.
+    :param controller: controller of the episode
+    :param operations: operations of the task
+    :return: boolean mask of valid actions indexed by encoded action
+    """
+    return np.array([
+        True,
+        controller.validate_remove_sink_layer(),
+        *controller.validate_append_operations(operations)
+    ], dtype=np.bool_)
+
+
 class GraphOfThoughtsEnv(Env[ObsType, ActType]):
     """
     The graph of thoughts environment.
+    The arrays of the observations are views of buffers updated in place,
+    they remain valid until the next step and have to be copied to be retained beyond.
     """
 
     _task: Task
@@ -36,16 +141,21 @@ class GraphOfThoughtsEnv(Env[ObsType, ActType]):
     _max_steps: int
     _reward_version: GraphStepRewardVersion
     _transform_observation: Callable[[Mapping[ObservationComponent, Any]], Mapping[str, Any]]
+    _layer_actions: Sequence[LayerAction]
+    _operation_codes: InvertedOperationIndex
 
     _terminated: bool
     _truncated: bool
     _total_reward: float
     _n_steps: int
     _action_lookback: int
-    _prev_actions: List[Optional[LayerAction]]
-    _graph_of_operations_representation: Sequence[Operation]
+    _prev_actions: npt.NDArray[np.int64]
+    _prev_actions_position: int
+    _graph_operations: npt.NDArray[np.int64]
     _prev_result: Optional[LayerActionResult]
     _is_solved: bool
+    _cached_observation: Optional[ObsType]
+    _validate_observations: bool
 
     _logger: logging.Logger
 
@@ -132,39 +242,31 @@ class GraphOfThoughtsEnv(Env[ObsType, ActType]):
 
     @property
     def _all_actions(self) -> Sequence[LayerAction]:
-        return [
-            LayerAction(ActionType.STOP),
-            LayerAction(ActionType.BACKTRACK),
-        ] + [
-            LayerAction(ActionType.APPEND_OPERATION, operation)
-            for operation in self._task.operations
-        ]
+        return self._layer_actions
 
     @property
-    def _graph_operations(self) -> Sequence[Optional[Operation]]:
-        operations = [
-            layer[0].operation
-            for layer in self.graph_of_operations.layers
-        ] if self._controller.is_initialized else []
-        empty_layers = self.max_depth - len(operations)
-        return operations + ([None] * empty_layers)
+    def _prev_actions_view(self) -> npt.NDArray[np.int64]:
+        return self._prev_actions[self._prev_actions_position:self._prev_actions_position + self._action_lookback]
 
     @property
     def _observation(self) -> ObsType:
-        return self._transform_observation({
+        if self._cached_observation is None:
+            self._cached_observation = self._create_observation()
+        return self._cached_observation
+
+    def _create_observation(self) -> ObsType:
+        observation: ObsType = self._transform_observation({
             GraphObservationComponent.DEPTH: self.current_depth,
             GraphObservationComponent.BREADTH: self.current_breadth,
             GraphObservationComponent.COMPLEXITY: self._controller.complexity,
             GraphObservationComponent.LOCAL_COMPLEXITY: self._controller.local_complexity,
-            GraphObservationComponent.GRAPH_OPERATIONS: [
-                self.encode_optional_operation(operation) for operation in self._graph_operations
-            ],
-            GraphObservationComponent.PREV_ACTIONS: [
-                self.encode_optional_action(prev_action)
-                for prev_action in self._prev_actions[-self._action_lookback:]
-            ],
+            GraphObservationComponent.GRAPH_OPERATIONS: self._graph_operations,
+            GraphObservationComponent.PREV_ACTIONS: self._prev_actions_view,
             GraphObservationComponent.PREV_SCORE: self._prev_score
         })
+        if self._validate_observations and observation not in self.observation_space:
+            raise GraphOfThoughtsEnvException(f'Observation is not in observation space: {observation}')
+        return observation
 
     def __init__(
             self,
@@ -174,6 +276,7 @@ class GraphOfThoughtsEnv(Env[ObsType, ActType]):
             reward_version: GraphStepRewardVersion,
             action_lookback: int = DEFAULT_ACTION_LOOKBACK,
             max_steps: int = DEFAULT_MAX_STEPS,
+            validate_observations: bool = False
     ) -> None:
         """
         Instantiates a new graph of thoughts environment.
@@ -184,6 +287,7 @@ class GraphOfThoughtsEnv(Env[ObsType, ActType]):
         :param reward_version: reward version
         :param action_lookback: the lookback for actions
         :param max_steps: maximum number of steps per episode
+        :param validate_observations: whether to validate each observation against the observation space
         """
         self._logger = logging.getLogger(self.__class__.__name__)
 
@@ -192,44 +296,31 @@ class GraphOfThoughtsEnv(Env[ObsType, ActType]):
         self._action_lookback = action_lookback
         self._max_steps = max_steps
         self._reward_version = reward_version
+        self._validate_observations = validate_observations
+        self._layer_actions = create_layer_actions(self._task.operations)
+        self._operation_codes = self._task.inverted_operation_index
 
         self._terminated = False
         self._truncated = False
         self._total_reward = 0.0
         self._n_steps = 0
-        self._prev_actions = [None] * self._action_lookback
         self._prev_result = None
         self._is_solved = False
+        self._cached_observation = None
+        self._reset_observation_buffers()
 
         n_operations: int = len(self._task.operations)
-        depth_representation: int = self.max_depth + 1
-        breadth_representation: int = self.max_breadth + 1
-        action_representation: int = len([ActionType.STOP, ActionType.BACKTRACK]) + n_operations
-        observation_space = MultiSpace.of({
-            GraphObservationComponent.DEPTH: OrdinalDiscreteSpace(depth_representation, seed=seed),
-            GraphObservationComponent.BREADTH: OrdinalDiscreteSpace(breadth_representation, seed=seed),
-            GraphObservationComponent.COMPLEXITY: OrdinalDiscreteSpace(self.max_complexity, start=1, seed=seed),
-            GraphObservationComponent.LOCAL_COMPLEXITY: OrdinalDiscreteSpace(self.max_complexity + 1, start=0,
-                                                                             seed=seed),
-            GraphObservationComponent.GRAPH_OPERATIONS: MultiDiscreteSpace(
-                    [
-                        self._optional_operation_representation
-                        for _ in range(self.max_depth)
-                    ],
-                    seed=seed
-            ),
-            GraphObservationComponent.PREV_ACTIONS: MultiDiscreteSpace(
-                    [
-                        self._optional_action_representation
-                        for _ in range(self._action_lookback)
-                    ],
-                    seed=seed
-            ),
-            GraphObservationComponent.PREV_SCORE: OptionalBoolSpace(seed=seed)
-        }, seed=seed)
+        observation_space = create_observation_space(
+                n_operations=n_operations,
+                max_depth=self.max_depth,
+                max_breadth=self.max_breadth,
+                max_complexity=self.max_complexity,
+                action_lookback=self._action_lookback,
+                seed=seed
+        )
         self.observation_space = observation_space
         self._transform_observation = observation_space.transform
-        self.action_space = spaces.Discrete(action_representation, seed=seed)
+        self.action_space = spaces.Discrete(len(self._layer_actions), seed=seed)
 
     def step(self, encoded_action: ActType) -> Tuple[ObsType, SupportsFloat, bool, bool, Dict[str, Any]]:
 
@@ -243,8 +334,20 @@ class GraphOfThoughtsEnv(Env[ObsType, ActType]):
 
         self._n_steps += 1
 
-        action = self.decode_action(encoded_action)
-        return self._process_step(action)
+        return self._process_step(self._decode_action_id(encoded_action))
+
+    async def async_step(
+            self, encoded_action: ActType, executor: Optional[Executor] = None
+    ) -> Tuple[ObsType, SupportsFloat, bool, bool, Dict[str, Any]]:
+        """
+        Executes a step without blocking the event loop.
+        The step is executed in a worker thread, hence, other coroutines proceed while waiting for the language model.
+        The environment must not be used by other coroutines until the step is executed.
+        :param encoded_action: encoded action to execute
+        :param executor: executor to execute the step in, the default executor of the event loop if absent
+        :return: observation, reward, terminated, truncated and info like the synchronous step
+        """
+        return await asyncio.get_running_loop().run_in_executor(executor, self.step, encoded_action)
 
     def reset(
             self, *, seed: int | None = None, options: Dict[str, Any] | None = None
@@ -255,18 +358,60 @@ class GraphOfThoughtsEnv(Env[ObsType, ActType]):
         self._truncated = False
         self._total_reward = 0.0
         self._n_steps = 0
-        self._prev_actions = [None] * self._action_lookback
         self._prev_result = None
         self._is_solved = False
         self._controller.reset()
-
-        if self._observation not in self.observation_space:
-            raise GraphOfThoughtsEnvException(f'Observation is not in observation space: {self._observation}')
+        self._cached_observation = None
+        self._reset_observation_buffers()
 
         return self._observation, {}
 
-    def _process_step(self, action: LayerAction) -> Tuple[ObsType, SupportsFloat, bool, bool, Dict[str, Any]]:
+    def close(self) -> None:
+        self._controller.close()
+
+    def get_state(self) -> GraphOfThoughtsEnvState:
+        """
+        Captures the state of the environment including the state of the underlying controller.
+        :return: picklable environment state
+        """
+        return GraphOfThoughtsEnvState(
+                controller_state=self._controller.get_state(),
+                prev_actions=self._prev_actions_view.tolist(),
+                n_steps=self._n_steps,
+                total_reward=self._total_reward,
+                terminated=self._terminated,
+                truncated=self._truncated,
+                is_solved=self._is_solved,
+                prev_result=self._prev_result
+        )
+
+    def set_state(self, state: GraphOfThoughtsEnvState) -> ObsType:
+        """
+        Sets the state of the environment including the state of the underlying controller.
+        :param state: environment state to set
+        :return: observation of the set state
+        """
+        if len(state.prev_actions) != self._action_lookback:
+            raise GraphOfThoughtsEnvException(
+                    f'Number of previous actions does not match the action lookback: {len(state.prev_actions)}'
+            )
+        self._controller.set_state(state.controller_state, self._task.operations)
+        self._reset_observation_buffers()
+        self._prev_actions[:self._action_lookback] = state.prev_actions
+        self._prev_actions[self._action_lookback:] = state.prev_actions
+        self._update_graph_operations(0)
+        self._n_steps = state.n_steps
+        self._total_reward = state.total_reward
+        self._terminated = state.terminated
+        self._truncated = state.truncated
+        self._is_solved = state.is_solved
+        self._prev_result = state.prev_result
+        self._cached_observation = None
+        return self._observation
+
+    def _process_step(self, action_id: int) -> Tuple[ObsType, SupportsFloat, bool, bool, Dict[str, Any]]:
         info: Dict[str, Any] = {}
+        action = self._layer_actions[action_id]
         reward = GraphStepReward(
                 version=self._reward_version,
                 action=action,
@@ -275,9 +420,10 @@ class GraphOfThoughtsEnv(Env[ObsType, ActType]):
                 prev_scored=self._prev_score
         )
 
-        self._prev_actions.append(action)
+        self._push_prev_action(action_id)
+        self._cached_observation = None
 
-        if action.type == ActionType.STOP:
+        if action_id == ActionType.STOP.value:
             self._terminated = True
             reward = self._calculate_final_reward(reward)
             info['solved'] = reward.is_solved
@@ -285,13 +431,13 @@ class GraphOfThoughtsEnv(Env[ObsType, ActType]):
             return self._observation, reward, self._terminated, self._truncated, info
 
         result: Optional[LayerActionResult] = None
-        if action.type == ActionType.BACKTRACK:
+        prev_depth = self.current_depth
+        if action_id == ActionType.BACKTRACK.value:
             result = self._controller.remove_sink_layer()
-        elif action.type == ActionType.APPEND_OPERATION:
-            if action.operation is None:
-                raise GraphOfThoughtsEnvException('Operation to append is None')
+        elif action.operation is not None:
             result = self._controller.append_layer(action.operation)
 
+        self._update_graph_operations(prev_depth)
         reward.depth = self.current_depth
         reward.n_operations = self.n_operations
 
@@ -305,27 +451,45 @@ class GraphOfThoughtsEnv(Env[ObsType, ActType]):
         elif result.is_scored:
             reward = reward.scored(result.score == 1.0)
 
-        if self._observation not in self.observation_space:
-            raise GraphOfThoughtsEnvException(f'Observation is not in observation space: {self._observation}')
         return self._observation, reward, self._terminated, self._truncated, info
 
+    def _reset_observation_buffers(self) -> None:
+        """
+        Allocates new observation buffers, hence, observations handed out before remain unchanged.
+        The previous actions are kept in a mirrored ring buffer of twice the lookback,
+        such that the latest actions are always a contiguous view.
+        """
+        self._prev_actions = np.full(2 * self._action_lookback, self._optional_action_representation - 1, dtype=np.int64)
+        self._prev_actions_position = 0
+        self._graph_operations = np.full(self.max_depth, self._optional_operation_representation - 1, dtype=np.int64)
+
+    def _push_prev_action(self, encoded_action: int) -> None:
+        """
+        Pushes an encoded action to the ring buffer of previous actions, replacing the oldest action.
+        :param encoded_action: encoded action to push
+        """
+        if self._action_lookback == 0:
+            return
+        position = self._prev_actions_position
+        self._prev_actions[position] = encoded_action
+        self._prev_actions[position + self._action_lookback] = encoded_action
+        self._prev_actions_position = (position + 1) % self._action_lookback
+
+    def _update_graph_operations(self, prev_depth: int) -> None:
+        """
+        Updates the encoded operations of the layers in place after the depth of the graph of operations changed.
+        :param prev_depth: depth of the graph of operations before the change
+        """
+        depth = self.current_depth
+        if depth > prev_depth:
+            layer_operations = self._controller.layer_operations
+            for i in range(prev_depth, depth):
+                self._graph_operations[i] = self.encode_operation(layer_operations[i])
+        elif depth < prev_depth:
+            self._graph_operations[depth:prev_depth] = self._optional_operation_representation - 1
+
     def _calculate_final_reward(self, reward: GraphStepReward) -> GraphStepReward:
-        reward = reward.final()
-        graph_of_thoughts: Optional[GraphOfThoughts] = self._controller.graph_of_thoughts
-        if graph_of_thoughts is None:
-            return reward.invalid()
-        sink_thoughts = [
-            thought_node.thought for thought_node in graph_of_thoughts.layers[-1]
-        ]
-        if len(sink_thoughts) > 1:
-            return reward.scored(False)
-        init_state: State = self._controller.init_state
-        final_state: State = sink_thoughts[0].state
-        is_solved = self._task.evaluator.evaluate(init_state, final_state)
-        if is_solved:
-            return reward.scored(True)
-        else:
-            return reward.scored(False)
+        return calculate_final_reward(self._task, self._controller, reward)
 
     def encode_operation(self, operation: Operation) -> int:
         """
@@ -333,8 +497,7 @@ class GraphOfThoughtsEnv(Env[ObsType, ActType]):
         :param operation: operation to encode
         :return: encoded operation
         """
-        inverted_operation_index: InvertedOperationIndex = self._task.inverted_operation_index
-        return inverted_operation_index[operation.key]
+        return self._operation_codes[operation.key]
 
     def decode_operation(self, encoded_operation: int) -> Operation:
         """
@@ -351,11 +514,18 @@ class GraphOfThoughtsEnv(Env[ObsType, ActType]):
         :param encoded_action: action to decode
         :return: decoded action
         """
-        scalar = encoded_action.item()
-        if scalar <= 1:
-            return LayerAction(ActionType(scalar))
-        operation_index = scalar - ActionType.APPEND_OPERATION.value
-        return LayerAction(type=ActionType.APPEND_OPERATION, operation=self.decode_operation(operation_index))
+        return self._layer_actions[self._decode_action_id(encoded_action)]
+
+    def _decode_action_id(self, encoded_action: np.int64 | np.intp | np.ndarray[Any, Any]) -> int:
+        """
+        Decodes an encoded action to the index of the action in the table of layer actions.
+        :param encoded_action: action to decode
+        :return: index of the action
+        """
+        action_id: int = encoded_action.item()
+        if not 0 <= action_id < len(self._layer_actions):
+            raise GraphOfThoughtsEnvException(f'Encoded action is out of range: {action_id}')
+        return action_id
 
     def encode_action(self, action: LayerAction) -> int:
         """
@@ -398,11 +568,19 @@ class GraphOfThoughtsEnv(Env[ObsType, ActType]):
         if action.type == ActionType.STOP:
             return True
         if action.type == ActionType.BACKTRACK:
-            return self._controller.is_initialized
+            return self._controller.validate_remove_sink_layer()
         if action.type == ActionType.APPEND_OPERATION and action.operation is not None:
             return self._controller.validate_append_operation(action.operation)
         return False
 
+    def action_masks(self) -> npt.NDArray[np.bool_]:
+        """
+        Computes the mask of valid actions in the current state.
+        The mask is compatible with masked policy implementations such as MaskablePPO of sb3-contrib.
+        :return: boolean mask of valid actions indexed by encoded action
+        """
+        return create_action_mask(self._controller, self._task.operations)
+
 
 class GraphOfThoughtsEnvException(Exception):
     """
@@ -0,0 +1,35 @@
+from dataclasses import dataclass, field
+from typing import Sequence, Optional
+
+from ..controller import ControllerState, LayerActionResult
+
+
+@dataclass(frozen=True, kw_only=True)
+class GraphOfThoughtsEnvState:
+    """
+    Represents the picklable state of a graph of thoughts environment.
+    """
+
+    controller_state: ControllerState
+    """The state of the underlying controller"""
+
+    prev_actions: Sequence[int]
+    """The encoded previous actions within the action lookback"""
+
+    n_steps: int
+    """The number of steps taken in the episode"""
+
+    total_reward: float
+    """The total reward of the episode"""
+
+    terminated: bool
+    """Whether the episode is terminated"""
+
+    truncated: bool
+    """Whether the episode is truncated"""
+
+    is_solved: bool
+    """Whether the task is solved"""
+
+    prev_result: Optional[LayerActionResult] = field(default=None)
+    """The result of the previous action if applicable"""
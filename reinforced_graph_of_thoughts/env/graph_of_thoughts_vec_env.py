@@ -0,0 +1,351 @@
+import time
+from typing import Sequence, Optional, Set, Dict, Any, List, Mapping, Type, Callable, Iterable
+
+import gymnasium as gym
+import numpy as np
+import numpy.typing as npt
+from gymnasium import spaces
+from stable_baselines3.common.vec_env import VecEnv
+from stable_baselines3.common.vec_env.base_vec_env import VecEnvObs, VecEnvStepReturn, VecEnvIndices
+
+from pure_graph_of_thoughts.api.operation import Operation
+from pure_graph_of_thoughts.api.task import Task
+from .action_type import ActionType
+from .graph_observation_component import GraphObservationComponent
+from .graph_of_thoughts_env import DEFAULT_ACTION_LOOKBACK, DEFAULT_MAX_STEPS, create_observation_space, \
+    calculate_final_reward, create_action_mask, create_layer_actions, GraphOfThoughtsEnvException
+from .graph_step_reward import GraphStepReward
+from .graph_step_reward_version import GraphStepRewardVersion
+from .layer_action import LayerAction
+from ..controller import ContinuousGraphController, LayerActionResult
+from ..space import MultiSpace, OrdinalDiscreteSpace
+from ..space.optional_bool_space import ABSENT_BOOL
+
+_ACTION_MASKS = 'action_masks'
+
+_ORDINAL_COMPONENTS: Sequence[GraphObservationComponent] = [
+    GraphObservationComponent.DEPTH,
+    GraphObservationComponent.BREADTH,
+    GraphObservationComponent.COMPLEXITY,
+    GraphObservationComponent.LOCAL_COMPLEXITY,
+]
+
+
+class GraphOfThoughtsVecEnv(VecEnv):
+    """
+    A natively vectorized graph of thoughts environment.
+    The episodes of all controllers are stepped in lockstep.
+    Their bookkeeping is held in structure-of-arrays form and observations are written into preallocated buffers.
+    Episodes are reset automatically, the last observation of an episode is provided as terminal observation
+    and the episode statistics are provided in the same form as by a Monitor wrapper.
+    """
+
+    _task: Task
+    _controllers: Sequence[ContinuousGraphController]
+    _reward_version: GraphStepRewardVersion
+    _action_lookback: int
+    _max_steps: int
+    _validate_observations: bool
+
+    _full_observation_space: MultiSpace
+    _observation_components: Sequence[GraphObservationComponent]
+    _layer_actions: Sequence[LayerAction]
+    _absent_operation: int
+    _absent_action: int
+
+    _n_steps: npt.NDArray[np.int64]
+    _depths: npt.NDArray[np.int64]
+    _breadths: npt.NDArray[np.int64]
+    _complexities: npt.NDArray[np.int64]
+    _local_complexities: npt.NDArray[np.int64]
+    _graph_operations: npt.NDArray[np.int64]
+    _prev_actions: npt.NDArray[np.int64]
+    _prev_scores: npt.NDArray[np.int64]
+    _episode_returns: npt.NDArray[np.float64]
+    _episode_lengths: npt.NDArray[np.int64]
+    _observation_buffers: Dict[str, npt.NDArray[Any]]
+    _actions: Optional[npt.NDArray[np.int64]]
+    _t_start: float
+
+    @property
+    def controllers(self) -> Sequence[ContinuousGraphController]:
+        """The underlying controllers"""
+        return self._controllers
+
+    def __init__(
+            self,
+            task: Task,
+            controllers: Sequence[ContinuousGraphController],
+            seed: int,
+            reward_version: GraphStepRewardVersion,
+            observation_filter: Optional[Set[GraphObservationComponent]] = None,
+            action_lookback: int = DEFAULT_ACTION_LOOKBACK,
+            max_steps: int = DEFAULT_MAX_STEPS,
+            validate_observations: bool = False
+    ) -> None:
+        """
+        Instantiates a new vectorized graph of thoughts environment.
+        All controllers must share the same limits.
+
+        :param task: task to solve
+        :param controllers: underlying controllers, one per environment
+        :param seed: seed for the random number generator of the spaces
+        :param reward_version: reward version
+        :param observation_filter: observation components to include, all components if absent
+        :param action_lookback: the lookback for actions
+        :param max_steps: maximum number of steps per episode
+        :param validate_observations: whether to validate each observation against the observation space
+        """
+        if len(controllers) == 0:
+            raise GraphOfThoughtsEnvException('At least one controller is required')
+        self._task = task
+        self._controllers = controllers
+        self._reward_version = reward_version
+        self._action_lookback = action_lookback
+        self._max_steps = max_steps
+        self._validate_observations = validate_observations
+
+        controller = controllers[0]
+        operations: Sequence[Operation] = task.operations
+        self._full_observation_space = create_observation_space(
+                n_operations=len(operations),
+                max_depth=controller.max_depth,
+                max_breadth=controller.max_breadth,
+                max_complexity=controller.max_complexity,
+                action_lookback=action_lookback,
+                seed=seed
+        )
+        self._observation_components = [
+            component for component in GraphObservationComponent
+            if observation_filter is None or component in observation_filter
+        ]
+        observation_space = spaces.Dict({
+            component.value: self._full_observation_space[component.value]
+            for component in self._observation_components
+        }, seed=seed)
+
+        self._layer_actions = create_layer_actions(operations)
+        self._absent_operation = len(operations)
+        self._absent_action = len(self._layer_actions)
+
+        n_envs = len(controllers)
+        self._n_steps = np.zeros(n_envs, dtype=np.int64)
+        self._depths = np.zeros(n_envs, dtype=np.int64)
+        self._breadths = np.zeros(n_envs, dtype=np.int64)
+        self._complexities = np.zeros(n_envs, dtype=np.int64)
+        self._local_complexities = np.zeros(n_envs, dtype=np.int64)
+        self._graph_operations = np.full((n_envs, controller.max_depth), self._absent_operation, dtype=np.int64)
+        self._prev_actions = np.full((n_envs, action_lookback), self._absent_action, dtype=np.int64)
+        self._prev_scores = np.full(n_envs, ABSENT_BOOL, dtype=np.int64)
+        self._episode_returns = np.zeros(n_envs, dtype=np.float64)
+        self._episode_lengths = np.zeros(n_envs, dtype=np.int64)
+        self._observation_buffers = {
+            key: np.zeros((n_envs, *(space.shape or ())), dtype=space.dtype)
+            for key, space in observation_space.spaces.items()
+        }
+        self._actions = None
+        self._t_start = time.time()
+
+        super().__init__(n_envs, observation_space, spaces.Discrete(len(self._layer_actions), seed=seed))
+
+    def reset(self) -> VecEnvObs:
+        for i in range(self.num_envs):
+            self._reset_episode(i)
+        self._write_observations()
+        self._reset_seeds()
+        self._reset_options()
+        return self._copy_observations()
+
+    def step_async(self, actions: npt.NDArray[Any]) -> None:
+        self._actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self) -> VecEnvStepReturn:
+        if self._actions is None:
+            raise GraphOfThoughtsEnvException('No actions to step with')
+        actions = self._actions
+        self._actions = None
+
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        infos: List[Dict[str, Any]] = [{} for _ in range(self.num_envs)]
+
+        # episodes exceeding the maximum number of steps are truncated without taking the action
+        truncated = self._n_steps >= self._max_steps
+        stepping = ~truncated
+        terminated = stepping & (actions == ActionType.STOP.value)
+
+        self._n_steps[stepping] += 1
+        self._episode_lengths += 1
+        self._prev_actions[stepping, :-1] = self._prev_actions[stepping, 1:]
+        self._prev_actions[stepping, -1] = actions[stepping]
+
+        for i in np.flatnonzero(stepping):
+            reward = self._process_action(i, int(actions[i]), infos[i])
+            rewards[i] = reward
+            self._episode_returns[i] += reward
+
+        self._write_observations()
+
+        dones = terminated | truncated
+        done_indices = np.flatnonzero(dones)
+        for i in done_indices:
+            info = infos[i]
+            info['terminal_observation'] = {
+                key: buffer[i].copy() for key, buffer in self._observation_buffers.items()
+            }
+            info['TimeLimit.truncated'] = bool(truncated[i])
+            info['episode'] = {
+                'r': round(float(self._episode_returns[i]), 6),
+                'l': int(self._episode_lengths[i]),
+                't': round(time.time() - self._t_start, 6)
+            }
+            self._reset_episode(i)
+        if len(done_indices) > 0:
+            self._write_observations(done_indices)
+
+        return self._copy_observations(), rewards, dones, infos
+
+    def _process_action(self, i: int, action: int, info: Dict[str, Any]) -> float:
+        controller = self._controllers[i]
+        layer_action = self._layer_actions[action]
+        prev_score = self._prev_scores[i]
+        reward = GraphStepReward(
+                version=self._reward_version,
+                action=layer_action,
+                max_depth=controller.max_depth,
+                max_operations=controller.max_operations,
+                prev_scored=bool(prev_score) if prev_score != ABSENT_BOOL else None
+        )
+
+        if layer_action.type == ActionType.STOP:
+            reward = calculate_final_reward(self._task, controller, reward)
+            info['solved'] = reward.is_solved
+            return float(reward)
+
+        result: LayerActionResult
+        if layer_action.type == ActionType.BACKTRACK:
+            result = controller.remove_sink_layer()
+        else:
+            result = controller.append_layer(self._task.operations[action - ActionType.APPEND_OPERATION.value])
+
+        reward.depth = controller.current_depth
+        reward.n_operations = controller.n_operations
+
+        if not result.is_valid:
+            reward = reward.invalid()
+        elif result.is_scored:
+            reward = reward.scored(result.score == 1.0)
+
+        self._prev_scores[i] = int(result.score == 1.0) if result.is_scored else ABSENT_BOOL
+        self._update_graph(i, action)
+        return float(reward)
+
+    def _update_graph(self, i: int, action: int) -> None:
+        controller = self._controllers[i]
+        prev_depth = self._depths[i]
+        depth = controller.current_depth
+        if depth > prev_depth:
+            self._graph_operations[i, prev_depth:depth] = action - ActionType.APPEND_OPERATION.value
+        elif depth < prev_depth:
+            self._graph_operations[i, depth:prev_depth] = self._absent_operation
+        self._depths[i] = depth
+        self._breadths[i] = controller.current_breadth
+        self._local_complexities[i] = controller.local_complexity
+
+    def _reset_episode(self, i: int) -> None:
+        controller = self._controllers[i]
+        controller.reset()
+        self._n_steps[i] = 0
+        self._depths[i] = controller.current_depth
+        self._breadths[i] = controller.current_breadth
+        self._complexities[i] = controller.complexity
+        self._local_complexities[i] = controller.local_complexity
+        self._graph_operations[i] = self._absent_operation
+        self._prev_actions[i] = self._absent_action
+        self._prev_scores[i] = ABSENT_BOOL
+        self._episode_returns[i] = 0.0
+        self._episode_lengths[i] = 0
+
+    def _write_observations(self, indices: Optional[npt.NDArray[np.intp]] = None) -> None:
+        """
+        Writes the observations of the given environments into the observation buffers.
+        :param indices: indices of the environments, all environments if absent
+        """
+        rows = slice(None) if indices is None else indices
+        values: Mapping[GraphObservationComponent, npt.NDArray[np.int64]] = {
+            GraphObservationComponent.DEPTH: self._depths,
+            GraphObservationComponent.BREADTH: self._breadths,
+            GraphObservationComponent.COMPLEXITY: self._complexities,
+            GraphObservationComponent.LOCAL_COMPLEXITY: self._local_complexities,
+            GraphObservationComponent.GRAPH_OPERATIONS: self._graph_operations,
+            GraphObservationComponent.PREV_ACTIONS: self._prev_actions,
+            GraphObservationComponent.PREV_SCORE: self._prev_scores,
+        }
+        for component in self._observation_components:
+            buffer = self._observation_buffers[component.value]
+            if component in _ORDINAL_COMPONENTS:
+                space = self._full_observation_space[component.value]
+                if not isinstance(space, OrdinalDiscreteSpace):
+                    raise GraphOfThoughtsEnvException(f'Space of {component} is not ordinal discrete')
+                buffer[rows] = space.batch_transform(values[component][rows])
+            else:
+                buffer[rows] = values[component][rows]
+        if self._validate_observations:
+            self._validate_written_observations(range(self.num_envs) if indices is None else indices)
+
+    def _validate_written_observations(self, indices: Iterable[int]) -> None:
+        """
+        Validates the written observations of the given environments against the observation space.
+        :param indices: indices of the environments
+        """
+        for i in indices:
+            observation = {key: buffer[i] for key, buffer in self._observation_buffers.items()}
+            if observation not in self.observation_space:
+                raise GraphOfThoughtsEnvException(f'Observation is not in observation space: {observation}')
+
+    def _copy_observations(self) -> Dict[str, npt.NDArray[Any]]:
+        return {
+            key: buffer.copy() for key, buffer in self._observation_buffers.items()
+        }
+
+    def action_masks(self) -> npt.NDArray[np.bool_]:
+        """
+        Computes the masks of valid actions in the current states of all environments.
+        :return: boolean masks of valid actions of shape (n_envs, n_actions)
+        """
+        masks = np.empty((self.num_envs, len(self._layer_actions)), dtype=np.bool_)
+        for i, controller in enumerate(self._controllers):
+            masks[i] = create_action_mask(controller, self._task.operations)
+        return masks
+
+    def close(self) -> None:
+        for controller in self._controllers:
+            controller.close()
+
+    def get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> List[Any]:
+        # the environment does not render
+        if attr_name == 'render_mode':
+            return [None for _ in self._get_indices(indices)]
+        if attr_name == _ACTION_MASKS:
+            return [self._create_env_action_masks(i) for i in self._get_indices(indices)]
+        return [getattr(self._controllers[i], attr_name) for i in self._get_indices(indices)]
+
+    def _create_env_action_masks(self, i: int) -> Callable[[], npt.NDArray[np.bool_]]:
+        return lambda: create_action_mask(self._controllers[i], self._task.operations)
+
+    def set_attr(self, attr_name: str, value: Any, indices: VecEnvIndices = None) -> None:
+        for i in self._get_indices(indices):
+            setattr(self._controllers[i], attr_name, value)
+
+    def env_method(
+            self, method_name: str, *method_args: Any, indices: VecEnvIndices = None, **method_kwargs: Any
+    ) -> List[Any]:
+        # per-environment action masks as requested by masked policy implementations
+        if method_name == _ACTION_MASKS:
+            return [create_action_mask(self._controllers[i], self._task.operations) for i in self._get_indices(indices)]
+        return [
+            getattr(self._controllers[i], method_name)(*method_args, **method_kwargs)
+            for i in self._get_indices(indices)
+        ]
+
+    def env_is_wrapped(self, wrapper_class: Type[gym.Wrapper[Any, Any, Any, Any]], indices: VecEnvIndices = None) -> List[bool]:
+        return [False for _ in self._get_indices(indices)]
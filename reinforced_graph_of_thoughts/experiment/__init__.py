@@ -2,6 +2,7 @@ from .agent_evaluation import AgentEvaluation
 from .agent_evaluation_summary import AgentEvaluationSummary
 from .episode import Episode
 from .evaluate_agent import evaluate_agent
+from .async_evaluate_agent import async_evaluate_agent
 from .experiment import Experiment
 from .experiment_configuration import ExperimentConfiguration
 from .language_model_simulation_type import LanguageModelSimulationType
@@ -0,0 +1,97 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, Executor
+from typing import Callable
+
+from ..env.graph_of_thoughts_env import ObsType, ActType
+from .agent_evaluation import AgentEvaluation
+from .episode import Episode
+from .experiment import Experiment
+
+
+async def async_evaluate_agent(
+        experiment: Experiment,
+        name: str,
+        n_episodes_per_complexity: int,
+        agent_act: Callable[[ObsType], ActType],
+        max_concurrency: int = 128
+) -> AgentEvaluation:
+    """
+    Evaluates an agent on a single event loop.
+    Each episode is evaluated on its own environment, and the episodes of all complexities are stepped concurrently,
+    hence, the evaluation is bound by the throughput of the language model rather than by its latency.
+    The environment of an episode is seeded by the complexity and the index of the episode,
+    disjoint from the seeds of the training environments,
+    hence, the evaluated episodes do not depend on the order in which the episodes are stepped.
+    Unlike in evaluate_agent, the episodes of a complexity do not share an environment,
+    hence, both evaluations sample different episodes.
+    :param experiment: the experiment
+    :param name: the name of the evaluated system
+    :param n_episodes_per_complexity: the number of episodes per complexity to evaluate
+    :param agent_act: the agent call, invoked on the event loop
+    :param max_concurrency: the maximum number of episodes evaluated concurrently,
+                            as well as the number of worker threads stepping the environments
+    :return: evaluated episodes
+    """
+    if max_concurrency < 1:
+        raise ValueError(f'Maximum concurrency must be positive: {max_concurrency}')
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        async def evaluate_episode(complexity: int, index: int) -> Episode:
+            async with semaphore:
+                return await _async_evaluate_episode(experiment, complexity, index, agent_act, executor)
+
+        episodes = await asyncio.gather(
+                *(
+                    evaluate_episode(complexity, index)
+                    for complexity in experiment.config.eval_complexities
+                    for index in range(n_episodes_per_complexity)
+                )
+        )
+    return AgentEvaluation(
+            name=name,
+            n_episodes_per_complexity=n_episodes_per_complexity,
+            episodes=list(episodes),
+            train_complexities=set(experiment.config.train_complexities),
+            eval_complexities=set(experiment.config.eval_complexities)
+    )
+
+
+async def _async_evaluate_episode(
+        experiment: Experiment,
+        complexity: int,
+        index: int,
+        agent_act: Callable[[ObsType], ActType],
+        executor: Executor
+) -> Episode:
+    """
+    Evaluates a single episode on its own environment.
+    :param experiment: the experiment
+    :param complexity: the complexity to evaluate
+    :param index: the index of the episode, used with the complexity to seed the environment
+    :param agent_act: the agent call
+    :param executor: the executor to step the environment in
+    :return: evaluated episode
+    """
+    env, filtered_env = experiment.create_eval_episode_env_tuple(complexity, index)
+    obs, _ = filtered_env.reset()
+    terminated = False
+    truncated = False
+    total_reward = 0.0
+    n_steps = 0
+
+    while not terminated and not truncated:
+        action = agent_act(obs)
+        env_obs, reward, terminated, truncated, _ = await env.async_step(action, executor)
+        obs = filtered_env.observation(env_obs)
+        total_reward += float(reward)
+        n_steps += 1
+
+    return Episode(
+            index=index,
+            length=n_steps,
+            complexity=env.complexity,
+            total_reward=total_reward,
+            is_solved=env.is_solved,
+            n_operations=env.n_operations
+    )
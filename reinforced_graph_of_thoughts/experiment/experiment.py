@@ -1,13 +1,18 @@
 from random import Random
 from typing import Sequence, Tuple, Optional
 
+from pure_graph_of_thoughts.api.language_model import LanguageModel
+
 from .experiment_configuration import ExperimentConfiguration
-from ..controller import ContinuousGraphController
-from ..env import GraphOfThoughtsEnv
+from ..controller import ContinuousGraphController, LayerExecutionCache, LayerExecutionCacheException
+from ..env import GraphOfThoughtsEnv, GraphOfThoughtsVecEnv, GraphObservationComponent
 from ..env.wrapper import DictObsFilterWrapper
+from ..language_model import SeededSimulatedLanguageModel
 from reinforced_graph_of_thoughts.experiment.experiment_task_type import ExperimentTaskType
 
 _LANGUAGE_MODEL_SEED_SHIFT = 100_0000
+# the env indices of evaluated episodes start beyond the seeds of the training envs and their language models
+_EVAL_EPISODE_INDEX_SHIFT = 2 * _LANGUAGE_MODEL_SEED_SHIFT
 
 class Experiment:
     """
@@ -43,20 +48,63 @@ class Experiment:
         env = self._create_env(self._config, controller, i)
         return self._create_filtered_env(self._config, env)
 
+    def create_train_vec_env(self, n_envs: int) -> GraphOfThoughtsVecEnv:
+        """
+        Creates a natively vectorized and filtered training environment.
+        :param n_envs: number of environments
+        :return: vectorized training environment
+        """
+        controllers = [
+            self._create_controller(self._config, self._config.train_complexities, i) for i in range(n_envs)
+        ]
+        return GraphOfThoughtsVecEnv(
+                self._config.task,
+                controllers,
+                seed=self._config.seed,
+                reward_version=self._config.reward_version,
+                observation_filter={
+                    GraphObservationComponent(component.value) for component in self._config.observation_filter
+                },
+                max_steps=self._config.max_steps,
+                validate_observations=self._config.validate_observations
+        )
+
     def created_eval_env_tuple(
-            self, eval_complexities: Optional[Sequence[int]] = None
+            self, eval_complexities: Optional[Sequence[int]] = None, i: int = 0
     ) -> Tuple[GraphOfThoughtsEnv, DictObsFilterWrapper]:
         """
         Creates a filtered evaluation environment.
         :param eval_complexities: complexities to evaluate
+        :param i: index of the current env
         :return: tuple of unwrapped environment and filtered environment
         """
         if eval_complexities is None:
             eval_complexities = self._config.eval_complexities
-        controller = self._create_controller(self._config, eval_complexities)
-        env = self._create_env(self._config, controller)
+        controller = self._create_controller(self._config, eval_complexities, i)
+        env = self._create_env(self._config, controller, i)
         return env, self._create_filtered_env(self._config, env)
 
+    def create_eval_episode_env_tuple(
+            self, complexity: int, index: int
+    ) -> Tuple[GraphOfThoughtsEnv, DictObsFilterWrapper]:
+        """
+        Creates a filtered evaluation environment for a single episode.
+        The environment is seeded by the complexity and the index of the episode,
+        disjoint from the seeds of the training environments.
+        :param complexity: complexity to evaluate
+        :param index: index of the episode
+        :return: tuple of unwrapped environment and filtered environment
+        """
+        return self.created_eval_env_tuple([complexity], self._get_eval_episode_env_index(complexity, index))
+
+    @staticmethod
+    def _get_eval_episode_env_index(complexity: int, index: int) -> int:
+        if complexity < 0 or index < 0:
+            raise ValueError(f'Complexity and episode index must not be negative: {complexity}, {index}')
+        # the Cantor pairing is unique for all pairs of complexity and episode index
+        pairing = (complexity + index) * (complexity + index + 1) // 2 + index
+        return _EVAL_EPISODE_INDEX_SHIFT + pairing
+
     @staticmethod
     def _create_controller(config: ExperimentConfiguration, complexities: Sequence[int], i: int = 0) -> ContinuousGraphController:
         task_type = config.task_type if config.task_type is not None else ExperimentTaskType.from_task(config.task)
@@ -70,7 +118,25 @@ class Experiment:
                 max_breadth=config.max_breadth,
                 divergence_cutoff_factor=config.divergence_cutoff_factor,
                 max_complexity=config.max_complexity,
-                max_operations=config.max_operations
+                max_operations=config.max_operations,
+                layer_cache=Experiment._create_layer_cache(config, language_model),
+                max_concurrency=config.max_concurrency
+        )
+
+    @staticmethod
+    def _create_layer_cache(
+            config: ExperimentConfiguration, language_model: LanguageModel
+    ) -> Optional[LayerExecutionCache]:
+        if config.layer_cache_max_size is None:
+            return None
+        # simulated language models are stochastic, hence, layers are cached by the position in the seed stream,
+        # which is only repeated by rollouts from restored states
+        if not isinstance(language_model, SeededSimulatedLanguageModel):
+            raise LayerExecutionCacheException('Layers can only be cached for seeded simulated language models')
+        return LayerExecutionCache(
+                config.layer_cache_max_size,
+                stream_position=lambda: language_model.stream_position,
+                seek_stream_position=language_model.seek
         )
 
     @staticmethod
@@ -80,7 +146,8 @@ class Experiment:
                 controller,
                 seed=config.seed + i,
                 reward_version=config.reward_version,
-                max_steps=config.max_steps
+                max_steps=config.max_steps,
+                validate_observations=config.validate_observations
         )
 
     @staticmethod
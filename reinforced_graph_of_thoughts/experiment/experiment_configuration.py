@@ -63,3 +63,16 @@ class ExperimentConfiguration:
 
     extra_args: Mapping[str, Any] = field(default_factory=dict)
     """The extra arguments to pass to the language model simulation factory"""
+
+    layer_cache_max_size: Optional[int] = field(default=None)
+    """
+    The maximum number of cached layers per controller, layers are not cached if absent,
+    the layers are keyed by the position in the stream of the simulated language model,
+    hence, they are only reused by rollouts from restored environment states, not by training episodes
+    """
+
+    max_concurrency: int = field(default=1)
+    """The maximum number of operation nodes of a layer processed concurrently by each controller"""
+
+    validate_observations: bool = field(default=False)
+    """Whether to validate each observation against the observation space, intended for debugging"""
@@ -1,2 +1,8 @@
 from .simulated_chat_gpt_sum_list import create_simulated_realistic_chat_gpt_sum_list, \
     create_simulated_deterministic_chat_gpt_sum_list
+from .batched_language_model import BatchedLanguageModel
+from .seeded_random import SeededRandom, RandomState
+from .seeded_simulated_language_model import SeededSimulatedLanguageModel, StreamPosition
+from .probability_table import ProbabilityTable
+from .cached_language_model import CachedLanguageModel
+from .cached_language_model_mode import CachedLanguageModelMode
@@ -0,0 +1,21 @@
+from abc import ABC, abstractmethod
+from typing import Sequence, Tuple
+
+from pure_graph_of_thoughts.api.language_model import LanguageModel, Prompt
+from pure_graph_of_thoughts.api.state import State
+
+
+class BatchedLanguageModel(LanguageModel, ABC):
+    """
+    Represents a language model capable of answering many prompts at once.
+    """
+
+    @abstractmethod
+    def prompt_batch(self, requests: Sequence[Tuple[Prompt, State]]) -> Sequence[State]:
+        """
+        Processes many prompts with their states at once.
+        The answers are equal to the answers of processing each request in order.
+        :param requests: prompts with their states to apply
+        :return: answers of the language model in order of the requests
+        """
+        pass
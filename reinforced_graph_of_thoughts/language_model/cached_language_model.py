@@ -0,0 +1,297 @@
+import hashlib
+import json
+import sqlite3
+from threading import Lock
+from typing import Optional, Mapping, Any, Dict
+
+from pure_graph_of_thoughts.api.language_model import LanguageModel, Prompt, LanguageModelException
+from pure_graph_of_thoughts.api.state import State
+from .cached_language_model_mode import CachedLanguageModelMode
+
+_CREATE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY,
+        response TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        accessed INTEGER NOT NULL
+    )
+'''
+
+_CREATE_INDEX = 'CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)'
+
+
+class CachedLanguageModel(LanguageModel):
+    """
+    A language model caching the responses of another language model in a local SQLite database.
+    Responses are keyed by a canonical hash of the prompt instruction, the examples, the input state
+    and the sampling parameters of the underlying language model.
+    Repeated identical prompts within a session are keyed by their occurrence index in addition,
+    such that replaying a session returns the recorded responses of a stochastic language model in the same order.
+    Once the responses exceed the maximum size, they are evicted in least recently used order.
+    The access times of cache hits are kept in memory and written in a single transaction
+    once enough accesses are pending, before evicting responses and when the cache is closed.
+    """
+
+    _language_model: Optional[LanguageModel]
+    _mode: CachedLanguageModelMode
+    _parameters: Mapping[str, Any]
+    _max_size: Optional[int]
+    _connection: sqlite3.Connection
+    _lock: Lock
+    _size: int
+    _access_counter: int
+    _access_flush_interval: int
+    _pending_accesses: Dict[str, int]
+    _occurrences: Dict[str, int]
+    _n_hits: int
+    _n_misses: int
+
+    @property
+    def mode(self) -> CachedLanguageModelMode:
+        """The mode of the cache"""
+        return self._mode
+
+    @property
+    def max_size(self) -> Optional[int]:
+        """The maximum size of all cached responses in bytes, unbounded if absent"""
+        return self._max_size
+
+    @property
+    def size(self) -> int:
+        """The size of all cached responses in bytes"""
+        return self._size
+
+    @property
+    def n_entries(self) -> int:
+        """The number of cached responses"""
+        with self._lock:
+            n_entries: int = self._connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        return n_entries
+
+    @property
+    def n_hits(self) -> int:
+        """The number of cache hits"""
+        return self._n_hits
+
+    @property
+    def n_misses(self) -> int:
+        """The number of cache misses"""
+        return self._n_misses
+
+    @property
+    def hit_rate(self) -> float:
+        """The rate of cache hits among all lookups"""
+        n_lookups = self._n_hits + self._n_misses
+        return self._n_hits / n_lookups if n_lookups > 0 else 0.0
+
+    def __init__(
+            self,
+            language_model: Optional[LanguageModel],
+            path: str,
+            mode: CachedLanguageModelMode = CachedLanguageModelMode.READ_WRITE,
+            parameters: Optional[Mapping[str, Any]] = None,
+            max_size: Optional[int] = None,
+            access_flush_interval: int = 1000
+    ) -> None:
+        """
+        Instantiates a new cached language model.
+        :param language_model: language model to cache the responses of, may only be absent in replay mode
+        :param path: path of the SQLite database, created if it does not exist
+        :param mode: mode of the cache
+        :param parameters: sampling parameters of the language model, such as the model name and the temperature
+        :param max_size: maximum size of all cached responses in bytes, unbounded if absent
+        :param access_flush_interval: number of pending access times of cache hits that are written at once
+        """
+        if language_model is None and mode != CachedLanguageModelMode.REPLAY:
+            raise LanguageModelException(f'Language model must be present in mode {mode.value}')
+        if max_size is not None and max_size < 1:
+            raise LanguageModelException('Maximum size must be positive')
+        if access_flush_interval < 1:
+            raise LanguageModelException('Access flush interval must be positive')
+        self._language_model = language_model
+        self._mode = mode
+        self._parameters = parameters if parameters is not None else {}
+        self._max_size = max_size
+        self._connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._connection.execute(_CREATE_TABLE)
+        self._connection.execute(_CREATE_INDEX)
+        self._lock = Lock()
+        self._size = self._read_size()
+        self._access_counter = self._connection.execute('SELECT COALESCE(MAX(accessed), 0) FROM responses').fetchone()[0]
+        self._access_flush_interval = access_flush_interval
+        self._pending_accesses = {}
+        self._occurrences = {}
+        self._n_hits = 0
+        self._n_misses = 0
+
+    def create_key(self, prompt: Prompt, state: State, occurrence: int = 0) -> str:
+        """
+        Creates the canonical key of a prompt with an input state.
+        :param prompt: prompt to consume
+        :param state: input state to apply
+        :param occurrence: index of the identical prompt with the input state within the session
+        :return: key of the response
+        """
+        components: Dict[str, Any] = {
+            'instruction': prompt.instruction,
+            'examples': [{'input': example.input, 'output': example.output} for example in prompt.examples],
+            'state': state,
+            'parameters': self._parameters
+        }
+        if occurrence > 0:
+            # the first occurrence keeps the key of responses cached without occurrence index
+            components['occurrence'] = occurrence
+        canonical = json.dumps(
+                components,
+                sort_keys=True,
+                separators=(',', ':'),
+                default=str
+        )
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def prompt(self, prompt: Prompt, state: State) -> State:
+        key = self.create_key(prompt, state)
+        with self._lock:
+            occurrence = self._occurrences.get(key, 0)
+            self._occurrences[key] = occurrence + 1
+        if occurrence > 0:
+            key = self.create_key(prompt, state, occurrence)
+        if self._mode != CachedLanguageModelMode.RECORD:
+            cached_response = self._lookup(key)
+            if cached_response is not None:
+                return cached_response
+            if self._mode == CachedLanguageModelMode.REPLAY:
+                raise LanguageModelException(f'No recorded response found for prompt {prompt} and state {state}')
+
+        if self._language_model is None:
+            raise LanguageModelException('Language model is None')
+        response = self._language_model.prompt(prompt, state)
+        self._store(key, response)
+        return response
+
+    def start_session(self) -> None:
+        """
+        Starts a new session, the occurrence indices of repeated identical prompts are counted from the start again.
+        """
+        with self._lock:
+            self._occurrences.clear()
+
+    def clear(self) -> None:
+        """
+        Removes all cached responses, resets the statistics and starts a new session.
+        """
+        with self._lock:
+            self._connection.execute('DELETE FROM responses')
+            self._pending_accesses.clear()
+            self._occurrences.clear()
+            self._size = 0
+            self._n_hits = 0
+            self._n_misses = 0
+
+    def flush(self) -> None:
+        """
+        Writes the pending access times of cache hits to the database.
+        """
+        with self._lock:
+            self._flush_accesses()
+
+    def close(self) -> None:
+        """
+        Writes the pending access times of cache hits and closes the database connection.
+        """
+        with self._lock:
+            self._flush_accesses()
+            self._connection.close()
+
+    def _lookup(self, key: str) -> Optional[State]:
+        """
+        Looks up a cached response and marks it as recently used.
+        :param key: key of the response
+        :return: cached response if present
+        """
+        with self._lock:
+            row = self._connection.execute('SELECT response FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self._n_misses += 1
+                return None
+            self._n_hits += 1
+            self._access_counter += 1
+            self._pending_accesses[key] = self._access_counter
+            if len(self._pending_accesses) >= self._access_flush_interval:
+                self._flush_accesses()
+        response: State = json.loads(row[0])
+        return response
+
+    def _store(self, key: str, response: State) -> None:
+        """
+        Stores a response and evicts the least recently used responses if the maximum size is exceeded.
+        :param key: key of the response
+        :param response: response to store
+        """
+        serialized_response = json.dumps(response, default=str)
+        size = len(serialized_response.encode('utf-8'))
+        with self._lock:
+            self._access_counter += 1
+            self._pending_accesses.pop(key, None)
+            if self._max_size is not None:
+                # the eviction order depends on the access times
+                self._flush_accesses()
+            self._connection.execute('BEGIN')
+            try:
+                row = self._connection.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+                size_delta = size - row[0] if row is not None else size
+                self._connection.execute(
+                        'INSERT OR REPLACE INTO responses (key, response, size, accessed) VALUES (?, ?, ?, ?)',
+                        (key, serialized_response, size, self._access_counter)
+                )
+                self._size += size_delta
+                if self._max_size is not None:
+                    self._evict(self._max_size)
+                self._connection.execute('COMMIT')
+            except BaseException:
+                self._connection.execute('ROLLBACK')
+                self._size = self._read_size()
+                raise
+
+    def _flush_accesses(self) -> None:
+        """
+        Writes the pending access times in a single transaction.
+        The lock must be held by the caller.
+        """
+        if len(self._pending_accesses) == 0:
+            return
+        self._connection.execute('BEGIN')
+        try:
+            self._connection.executemany(
+                    'UPDATE responses SET accessed = ? WHERE key = ?',
+                    [(accessed, key) for key, accessed in self._pending_accesses.items()]
+            )
+            self._connection.execute('COMMIT')
+        except BaseException:
+            self._connection.execute('ROLLBACK')
+            raise
+        self._pending_accesses.clear()
+
+    def _read_size(self) -> int:
+        """
+        Reads the size of all cached responses from the database.
+        :return: size in bytes
+        """
+        size: int = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        return size
+
+    def _evict(self, max_size: int) -> None:
+        """
+        Evicts the least recently used responses until the size does not exceed the maximum size.
+        The lock must be held by the caller.
+        :param max_size: maximum size in bytes
+        """
+        while self._size > max_size:
+            row = self._connection.execute(
+                    'SELECT key, size FROM responses ORDER BY accessed LIMIT 1'
+            ).fetchone()
+            if row is None:
+                break
+            evicted_key, evicted_size = row
+            self._connection.execute('DELETE FROM responses WHERE key = ?', (evicted_key,))
+            self._size -= evicted_size
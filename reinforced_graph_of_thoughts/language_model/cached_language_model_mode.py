@@ -0,0 +1,16 @@
+from enum import Enum
+
+
+class CachedLanguageModelMode(Enum):
+    """
+    Represents the mode of a cached language model.
+    """
+
+    READ_WRITE = 'read_write'
+    """Cached responses are returned, missing responses are requested and stored"""
+
+    RECORD = 'record'
+    """All responses are requested and stored, replacing cached responses"""
+
+    REPLAY = 'replay'
+    """Only cached responses are returned, missing responses raise an exception"""
@@ -0,0 +1,109 @@
+from typing import Mapping, Tuple, Self, Callable
+
+import numpy as np
+import numpy.typing as npt
+
+
+class ProbabilityTable:
+    """
+    Represents a table of probabilities of a correct behavior indexed by complexity.
+    The probabilities are compiled into a dense array covering all complexities up to the largest measured complexity.
+    Complexities outside the table have probability 0.
+    """
+
+    _probabilities: npt.NDArray[np.float64]
+    _probability_values: Tuple[float, ...]
+
+    @property
+    def probabilities(self) -> npt.NDArray[np.float64]:
+        """The dense probabilities indexed by complexity"""
+        return self._probabilities
+
+    @property
+    def max_complexity(self) -> int:
+        """The largest complexity covered by the table"""
+        return len(self._probability_values) - 1
+
+    def __init__(self, probabilities: npt.NDArray[np.float64]) -> None:
+        """
+        Instantiates a new probability table.
+        :param probabilities: dense probabilities indexed by complexity
+        """
+        self._probabilities = np.array(probabilities, dtype=np.float64)
+        self._probabilities.flags.writeable = False
+        self._probability_values = tuple(self._probabilities.tolist())
+
+    @classmethod
+    def of(cls, probabilities: Mapping[int, float]) -> Self:
+        """
+        Compiles measured probabilities into a table.
+        Complexities without a measurement have probability 0.
+        :param probabilities: probabilities by complexity
+        :return: probability table
+        """
+        dense_probabilities = np.zeros(max(probabilities.keys()) + 1, dtype=np.float64)
+        for complexity, probability in probabilities.items():
+            dense_probabilities[complexity] = probability
+        return cls(dense_probabilities)
+
+    @classmethod
+    def interpolated(cls, probabilities: Mapping[int, float]) -> Self:
+        """
+        Compiles measured probabilities into a table by interpolating linearly between the measurements.
+        Complexities below the smallest measured complexity are extrapolated from the first two measurements.
+        The probabilities are clipped to the range from 0 to 1.
+        :param probabilities: probabilities by complexity, at least two measurements are required
+        :return: probability table
+        """
+        measured_complexities = np.array(sorted(probabilities.keys()), dtype=np.int64)
+        measured_probabilities = np.array(
+                [probabilities[int(complexity)] for complexity in measured_complexities], dtype=np.float64
+        )
+        complexities = np.arange(measured_complexities[-1] + 1, dtype=np.int64)
+
+        # each complexity is interpolated between the enclosing measurements, evaluated like a scalar interpolation
+        upper = np.maximum(np.searchsorted(measured_complexities, complexities, side='right'), 1)
+        upper = np.minimum(upper, len(measured_complexities) - 1)
+        x0, x1 = measured_complexities[upper - 1], measured_complexities[upper]
+        y0, y1 = measured_probabilities[upper - 1], measured_probabilities[upper]
+        t = (complexities - x0) / (x1 - x0)
+        dense_probabilities = y0 + t * (y1 - y0)
+        dense_probabilities[measured_complexities] = measured_probabilities
+        return cls(np.clip(dense_probabilities, 0.0, 1.0))
+
+    @classmethod
+    def compiled(cls, probability: Callable[[int], float], max_complexity: int) -> Self:
+        """
+        Compiles a probability function into a table by evaluating it once for each complexity.
+        :param probability: probability function of a complexity
+        :param max_complexity: largest complexity covered by the table
+        :return: probability table
+        """
+        return cls(np.array([probability(complexity) for complexity in range(max_complexity + 1)], dtype=np.float64))
+
+    def deterministic(self) -> 'ProbabilityTable':
+        """
+        Derives a deterministic table, the probabilities are 1 where they are 1 in this table and 0 elsewhere.
+        :return: deterministic probability table
+        """
+        return ProbabilityTable(np.where(self._probabilities == 1.0, 1.0, 0.0))
+
+    def lookup(self, complexity: int) -> float:
+        """
+        Looks up the probability of a single complexity.
+        :param complexity: complexity to look up
+        :return: probability of the complexity
+        """
+        if 0 <= complexity < len(self._probability_values):
+            return self._probability_values[complexity]
+        return 0.0
+
+    def batch_lookup(self, complexities: npt.ArrayLike) -> npt.NDArray[np.float64]:
+        """
+        Looks up the probabilities of many complexities at once.
+        :param complexities: complexities to look up
+        :return: probabilities of the complexities
+        """
+        complexities = np.asarray(complexities, dtype=np.int64)
+        in_range = (complexities >= 0) & (complexities < len(self._probability_values))
+        return np.where(in_range, self._probabilities[np.where(in_range, complexities, 0)], 0.0)
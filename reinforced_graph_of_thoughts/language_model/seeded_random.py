@@ -0,0 +1,138 @@
+from random import Random
+from typing import Tuple, Any, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+RandomState = Tuple[Any, ...]
+"""Represents the internal state of a seeded random number generator."""
+
+_RANDOM_VERSION = 3
+"""The version of the state of the random number generator of the standard library"""
+
+_MT_STATE_SIZE = 624
+"""The number of words of the state of the Mersenne Twister"""
+
+_WORD_SHIFTS = np.array([5, 6], dtype=np.uint64)
+"""The shifts of the two words of a float, such that 27 and 26 random bits remain"""
+
+_WORD_SCALES = np.array([67108864.0 / 9007199254740992.0, 1.0 / 9007199254740992.0], dtype=np.float64)
+"""The scales of the two words of a float, such that the float is composed of 53 random bits"""
+
+
+class SeededRandom(Random):
+    """
+    A random number generator producing the same stream of floats as a random number generator
+    of the standard library with the same seed, while also drawing many floats in a single vectorized call.
+    The stream is generated by the Mersenne Twister of NumPy, which is initialized from the state of the standard library,
+    and floats are assembled from two 32-bit words like the standard library does.
+    The number of floats drawn is counted, hence, the position in the stream can be determined and skipped ahead.
+    Only floats are drawn from the stream, all derived methods of the random number generator are based on them.
+    """
+
+    _stream_seed: int
+    _n_draws: int
+    _bit_generator: Optional[np.random.MT19937] = None
+
+    @property
+    def stream_seed(self) -> int:
+        """The seed of the stream"""
+        return self._stream_seed
+
+    @property
+    def n_draws(self) -> int:
+        """The number of floats drawn since seeding"""
+        return self._n_draws
+
+    def __init__(self, seed: int) -> None:
+        """
+        Instantiates a new seeded random number generator.
+        :param seed: seed of the stream
+        """
+        super().__init__(seed)
+
+    def seed(self, a: Any = None, version: int = 2) -> None:
+        """
+        Initializes the stream from a seed.
+        :param a: integer seed of the stream
+        :param version: version of the seeding algorithm of the standard library
+        """
+        if not isinstance(a, int):
+            raise ValueError(f'Seed must be an integer: {a}')
+        super().seed(a, version)
+        self._stream_seed = a
+        self._n_draws = 0
+        self._bit_generator = np.random.MT19937()
+        self._set_words(super().getstate()[1])
+
+    def random(self) -> float:
+        """
+        Draws the next float in [0, 1).
+        :return: float
+        """
+        bit_generator = self._present_bit_generator
+        self._n_draws += 1
+        a = bit_generator.random_raw() >> 5
+        b = bit_generator.random_raw() >> 6
+        return (a * 67108864.0 + b) * (1.0 / 9007199254740992.0)
+
+    def random_batch(self, n: int) -> npt.NDArray[np.float64]:
+        """
+        Draws the next floats in [0, 1) in a single call.
+        The floats are equal to drawing each float in order.
+        :param n: number of floats to draw
+        :return: floats
+        """
+        words = np.right_shift(self._present_bit_generator.random_raw(2 * n).reshape(n, 2), _WORD_SHIFTS)
+        self._n_draws += n
+        # both scaled words are exactly representable and their sum has 53 bits, hence, no rounding occurs
+        floats: npt.NDArray[np.float64] = np.dot(words, _WORD_SCALES)
+        return floats
+
+    def skip(self, n: int) -> None:
+        """
+        Skips the next floats of the stream.
+        :param n: number of floats to skip
+        """
+        if n < 0:
+            raise ValueError(f'Number of floats to skip must not be negative: {n}')
+        self._present_bit_generator.random_raw(2 * n)
+        self._n_draws += n
+
+    def getstate(self) -> RandomState:
+        """
+        Gets the state of the random number generator, including the seed and the position in the stream.
+        :return: state
+        """
+        state = self._present_bit_generator.state['state']
+        words = tuple(int(word) for word in state['key']) + (int(state['pos']),)
+        return self._stream_seed, self._n_draws, (_RANDOM_VERSION, words, None)
+
+    def setstate(self, state: RandomState) -> None:
+        """
+        Sets the state of the random number generator.
+        :param state: state to set
+        """
+        stream_seed, n_draws, (_, words, _) = state
+        self._stream_seed = stream_seed
+        self._n_draws = n_draws
+        self._set_words(words)
+
+    @property
+    def _present_bit_generator(self) -> np.random.MT19937:
+        if self._bit_generator is None:
+            raise ValueError('Random number generator is not seeded')
+        return self._bit_generator
+
+    def _set_words(self, words: Tuple[int, ...]) -> None:
+        """
+        Sets the state of the Mersenne Twister from the words of the state of the standard library.
+        :param words: state words followed by the position
+        """
+        bit_generator = self._present_bit_generator
+        state = bit_generator.state
+        state['state'] = {
+            'key': np.array(words[:_MT_STATE_SIZE], dtype=np.uint32),
+            'pos': words[_MT_STATE_SIZE]
+        }
+        bit_generator.state = state
@@ -0,0 +1,117 @@
+from typing import Sequence, Tuple, Dict, List, Mapping
+
+import numpy as np
+
+from pure_graph_of_thoughts.api.language_model import Prompt, LanguageModelException
+from pure_graph_of_thoughts.api.state import State
+from pure_graph_of_thoughts.language_model import SimulatedLanguageModel, SimulatedLanguageModelBehavior, \
+    MockLanguageModel
+from .batched_language_model import BatchedLanguageModel
+from .seeded_random import SeededRandom, RandomState
+
+StreamPosition = Tuple[int, int]
+"""Represents a position in the stream of a random number generator, consisting of the seed and the number of draws."""
+
+
+class SeededSimulatedLanguageModel(SimulatedLanguageModel, BatchedLanguageModel):
+    """
+    A simulated language model exposing the state of its random number generator.
+    The simulation behaves exactly like a simulated language model of the same seed,
+    but the state of the random number generator can be captured and restored.
+    """
+
+    _random: SeededRandom
+
+    _simulated_behaviors: Dict[Prompt, SimulatedLanguageModelBehavior]
+
+    @property
+    def seed(self) -> int:
+        """The seed of the random number generator"""
+        return self._seed
+
+    @property
+    def simulated_behaviors(self) -> Mapping[Prompt, SimulatedLanguageModelBehavior]:
+        """The simulated behaviors by prompt"""
+        return self._simulated_behaviors
+
+    @property
+    def random_state(self) -> RandomState:
+        """The current state of the random number generator"""
+        return self._random.getstate()
+
+    @random_state.setter
+    def random_state(self, random_state: RandomState) -> None:
+        """
+        Sets the state of the random number generator.
+        :param random_state: state to set
+        """
+        self._random.setstate(random_state)
+
+    @property
+    def stream_position(self) -> StreamPosition:
+        """The current position in the stream of the random number generator"""
+        return self._random.stream_seed, self._random.n_draws
+
+    def __init__(self, seed: int, simulated_behaviors: Sequence[SimulatedLanguageModelBehavior]) -> None:
+        """
+        Instantiates a new seeded simulated language model.
+        :param seed: seed to use for random number generator
+        :param simulated_behaviors: simulated behaviors
+        """
+        self._seed = seed
+        self._random = SeededRandom(self._seed)
+        self._simulated_behaviors = {
+            simulated_behavior.prompt: simulated_behavior for simulated_behavior in simulated_behaviors
+        }
+        mocked_behaviors = {
+            simulated_behavior.prompt: self._create_mocked_behavior(self._random, simulated_behavior)
+            for simulated_behavior in simulated_behaviors
+        }
+        MockLanguageModel.__init__(self, mocked_behaviors)
+
+    def seek(self, stream_position: StreamPosition) -> None:
+        """
+        Advances the random number generator to a later position of its current stream.
+        The numbers in between are skipped, as if the language model had been prompted.
+        :param stream_position: position to advance to
+        """
+        stream_seed, n_draws = stream_position
+        if stream_seed != self._random.stream_seed or n_draws < self._random.n_draws:
+            raise LanguageModelException(
+                    f'Cannot seek position {stream_position} from position {self.stream_position}'
+            )
+        self._random.skip(n_draws - self._random.n_draws)
+
+    def prompt_batch(self, requests: Sequence[Tuple[Prompt, State]]) -> Sequence[State]:
+        """
+        Processes many prompts with their states at once.
+        The outcomes of all requests are drawn in a single vectorized call in order of the requests,
+        hence, the answers and the state of the random number generator afterward
+        are equal to processing each request in order.
+        Requests of different language models are not batched together,
+        as each language model draws from its own seeded stream.
+        :param requests: prompts with their states to apply
+        :return: answers of the language model in order of the requests
+        """
+        # prompts are hashed by their string representation, hence, the behaviors are resolved once per prompt
+        behaviors_by_prompt_id: Dict[int, SimulatedLanguageModelBehavior] = {}
+        behaviors: List[SimulatedLanguageModelBehavior] = []
+        for prompt, _ in requests:
+            behavior = behaviors_by_prompt_id.get(id(prompt))
+            if behavior is None:
+                if prompt not in self._simulated_behaviors:
+                    raise LanguageModelException(f'No mocked behavior found for prompt {prompt}')
+                behavior = self._simulated_behaviors[prompt]
+                behaviors_by_prompt_id[id(prompt)] = behavior
+            behaviors.append(behavior)
+
+        probabilities = np.array(
+                [behavior.probability(prompt, state) for behavior, (prompt, state) in zip(behaviors, requests)],
+                dtype=np.float64
+        )
+        outcomes = self._random.random_batch(len(requests)) < probabilities
+        return [
+            behavior.mocked_correct_behavior(prompt, state) if outcome
+            else behavior.mocked_incorrect_behavior(prompt, state)
+            for behavior, outcome, (prompt, state) in zip(behaviors, outcomes, requests)
+        ]
@@ -1,16 +1,18 @@
-import re
 from collections import Counter
 from typing import Sequence, Mapping, Dict, Any, Callable
 
 from pure_graph_of_thoughts.api.language_model import Prompt
 from pure_graph_of_thoughts.api.operation import PromptOperation
 from pure_graph_of_thoughts.api.state import State
-from pure_graph_of_thoughts.language_model import SimulatedLanguageModel, SimulatedLanguageModelBehavior
+from pure_graph_of_thoughts.language_model import SimulatedLanguageModelBehavior
+from .probability_table import ProbabilityTable
+from .seeded_simulated_language_model import SeededSimulatedLanguageModel
 
 from .simulated_language_model_exception import SimulatedLanguageModelException
 from ..tasks.count_keywords import op_merge, op_split
+from ..tasks.keyword_matcher import KeywordMatcher
 
-_count_keywords_probabilities: Mapping[int, float] = {
+_count_keywords_probabilities: ProbabilityTable = ProbabilityTable.interpolated({
     10: 1.0,
     20: 0.88,
     30: 0.71,
@@ -21,9 +23,9 @@ _count_keywords_probabilities: Mapping[int, float] = {
     80: 0.12,
     90: 0.06,
     100: 0.02
-}
+})
 
-_split_text_probabilities: Mapping[int, float] = {
+_measured_split_text_probabilities: Mapping[int, float] = {
     10: 0.62,
     20: 0.41,
     30: 0.75,
@@ -36,18 +38,37 @@ _split_text_probabilities: Mapping[int, float] = {
     100: 0.8
 }
 
+# lengths between the measurements are interpolated from the count keywords curve, like the original simulation does
+_split_text_probabilities: ProbabilityTable = ProbabilityTable.compiled(
+    lambda length: _measured_split_text_probabilities.get(length, _count_keywords_probabilities.lookup(length)),
+    max(_measured_split_text_probabilities.keys())
+)
+
+_deterministic_count_keywords_probabilities: ProbabilityTable = _count_keywords_probabilities.deterministic()
+
+_deterministic_split_text_probabilities: ProbabilityTable = _split_text_probabilities.deterministic()
+
+
+def create_count_keywords_probability_tables(op_count: PromptOperation) -> Mapping[Prompt, ProbabilityTable]:
+    """
+    Creates the probability tables of the realistic simulation by prompt,
+    indexed by the local complexity of the prompted thoughts.
+    :param op_count: count operation
+    :return: probability tables by prompt
+    """
+    return {
+        op_count.prompt: _count_keywords_probabilities,
+        op_split.prompt: _split_text_probabilities
+    }
+
 
 def count_keywords(keywords: Sequence[str], text: str) -> Mapping[str, int]:
-    counter: Counter[str] = Counter()
-    for keyword in keywords:
-        matches = re.findall(rf'{re.escape(keyword)}', text, flags=re.IGNORECASE)
-        count = len(matches)
-        if count > 0:
-            counter.update({keyword: count})
-    return dict(counter)
+    return dict(KeywordMatcher(keywords).count(text))
 
 
 def create_count_keywords_correctly(keywords: Sequence[str]) -> Callable[[Prompt, State], State]:
+    keyword_matcher = KeywordMatcher(keywords)
+
     def count_keywords_correctly(prompt: Prompt, state: State) -> State:
         if 'text' not in state:
             return {
@@ -56,7 +77,7 @@ def create_count_keywords_correctly(keywords: Sequence[str]) -> Callable[[Prompt
                 }
             }
         text = state['text']
-        counts = count_keywords(keywords, text)
+        counts = dict(keyword_matcher.count(text))
         return {
             'counts': counts
         }
@@ -70,46 +91,19 @@ def _count_keywords_incorrectly(prompt: Prompt, state: State) -> State:
     }
 
 
-def _interpolate(length: int, complexities: Sequence[int], probabilities: Mapping[int, float]) -> float:
-    for i in range(1, len(complexities)):
-        if length < complexities[i]:
-            x0, x1 = complexities[i - 1], complexities[i]
-            y0, y1 = _count_keywords_probabilities[x0], _count_keywords_probabilities[x1]
-
-            t = (length - x0) / (x1 - x0)
-            return min(1.0, y0 + t * (y1 - y0))
-    return 0.0
-
-
-def _get_count_keywords_probability(prompt: Prompt, state: State) -> float:
+def _get_count_keywords_probability(
+        prompt: Prompt, state: State, probabilities: ProbabilityTable = _count_keywords_probabilities
+) -> float:
     if 'text' in state:
-        length = len(state['text'].split())
-
-        if length in _count_keywords_probabilities:
-            return _count_keywords_probabilities[length]
-
-        complexities = sorted(_count_keywords_probabilities.keys())
-        if length > max(complexities):
-            return 0.0
-
-        return _interpolate(length, complexities, _count_keywords_probabilities)
-
+        return probabilities.lookup(len(state['text'].split()))
     return 0.0
 
 
-def _get_split_text_probability(prompt: Prompt, state: State) -> float:
+def _get_split_text_probability(
+        prompt: Prompt, state: State, probabilities: ProbabilityTable = _split_text_probabilities
+) -> float:
     if 'text' in state:
-        length = len(state['text'].split())
-
-        if length in _split_text_probabilities:
-            return _split_text_probabilities[length]
-
-        complexities = sorted(_split_text_probabilities.keys())
-        if length > max(complexities):
-            return 0.0
-
-        return _interpolate(length, complexities, _split_text_probabilities)
-
+        return probabilities.lookup(len(state['text'].split()))
     return 0.0
 
 
@@ -189,7 +183,7 @@ def _split_text_incorrectly(prompt: Prompt, state: State) -> State:
 
 
 def create_simulated_realistic_chat_gpt_count_keywords(seed: int,
-                                                       extra_args: Mapping[str, Any]) -> SimulatedLanguageModel:
+                                                       extra_args: Mapping[str, Any]) -> SeededSimulatedLanguageModel:
     """
     Creates a simulated ChatGPT instance for the task sort_list.
     :param seed: seed to use for random number generator
@@ -204,7 +198,7 @@ def create_simulated_realistic_chat_gpt_count_keywords(seed: int,
         raise SimulatedLanguageModelException('extra_args must contain op_count PromptOperation')
     op_count: PromptOperation = extra_args['op_count']
 
-    simulated_chat_gpt = SimulatedLanguageModel(
+    simulated_chat_gpt = SeededSimulatedLanguageModel(
         seed=seed,
         simulated_behaviors=[
             SimulatedLanguageModelBehavior(
@@ -229,7 +223,7 @@ def create_simulated_realistic_chat_gpt_count_keywords(seed: int,
 
 
 def create_simulated_deterministic_chat_gpt_count_keywords(seed: int,
-                                                           extra_args: Mapping[str, Any]) -> SimulatedLanguageModel:
+                                                           extra_args: Mapping[str, Any]) -> SeededSimulatedLanguageModel:
     """
     Creates a simulated ChatGPT instance for the task sort_list.
     The probabilities are either 1.0 or 0.0.
@@ -245,20 +239,20 @@ def create_simulated_deterministic_chat_gpt_count_keywords(seed: int,
         raise SimulatedLanguageModelException('extra_args must contain op_count PromptOperation')
     op_count: PromptOperation = extra_args['op_count']
 
-    simulated_chat_gpt = SimulatedLanguageModel(
+    simulated_chat_gpt = SeededSimulatedLanguageModel(
         seed=seed,
         simulated_behaviors=[
             SimulatedLanguageModelBehavior(
                 prompt=op_count.prompt,
                 mocked_correct_behavior=create_count_keywords_correctly(keywords),
                 mocked_incorrect_behavior=_count_keywords_incorrectly,
-                probability=lambda p, s: 1.0 if _get_count_keywords_probability(p, s) == 1.0 else 0.0
+                probability=lambda p, s: _get_count_keywords_probability(p, s, _deterministic_count_keywords_probabilities)
             ),
             SimulatedLanguageModelBehavior(
                 prompt=op_split.prompt,
                 mocked_correct_behavior=_split_text_correctly,
                 mocked_incorrect_behavior=_split_text_incorrectly,
-                probability=lambda p, s: 1.0 if _get_split_text_probability(p, s) == 1.0 else 0.0
+                probability=lambda p, s: _get_split_text_probability(p, s, _deterministic_split_text_probabilities)
             ),
             SimulatedLanguageModelBehavior(
                 prompt=op_merge.prompt,
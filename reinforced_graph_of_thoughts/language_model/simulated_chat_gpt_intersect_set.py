@@ -2,11 +2,13 @@ from typing import Sequence, List, Mapping, Any
 
 from pure_graph_of_thoughts.api.language_model import Prompt
 from pure_graph_of_thoughts.api.state import State
-from pure_graph_of_thoughts.language_model import SimulatedLanguageModel, SimulatedLanguageModelBehavior
+from pure_graph_of_thoughts.language_model import SimulatedLanguageModelBehavior
+from .probability_table import ProbabilityTable
+from .seeded_simulated_language_model import SeededSimulatedLanguageModel
 
 from reinforced_graph_of_thoughts.tasks.intersect_set import op_intersect
 
-_intersect_set_probabilities: Mapping[int, float] = {
+_intersect_set_probabilities: ProbabilityTable = ProbabilityTable.of({
     1: 1.0,
     2: 1.0,
     3: 1.0,
@@ -39,7 +41,14 @@ _intersect_set_probabilities: Mapping[int, float] = {
     30: 0.25,
     31: 0.13,
     32: 0.18
+})
+
+_deterministic_intersect_set_probabilities: ProbabilityTable = _intersect_set_probabilities.deterministic()
+
+INTERSECT_SET_PROBABILITY_TABLES: Mapping[Prompt, ProbabilityTable] = {
+    op_intersect.prompt: _intersect_set_probabilities,
 }
+"""The probability tables of the realistic simulation by prompt, indexed by the local complexity of the thoughts"""
 
 
 def _intersect_set_correctly(prompt: Prompt, state: State) -> State:
@@ -62,22 +71,22 @@ def _intersect_set_incorrectly(prompt: Prompt, state: State) -> State:
     }
 
 
-def _get_intersect_set_probability(prompt: Prompt, state: State) -> float:
+def _get_intersect_set_probability(
+        prompt: Prompt, state: State, probabilities: ProbabilityTable = _intersect_set_probabilities
+) -> float:
     if 'set1' in state and 'set2' in state:
-        length = min(len(state['set1']), len(state['set2']))
-        if length in _intersect_set_probabilities:
-            return _intersect_set_probabilities[length]
+        return probabilities.lookup(min(len(state['set1']), len(state['set2'])))
     return 0.0
 
 
-def create_simulated_realistic_chat_gpt_intersect_set(seed: int, extra_args: Mapping[str, Any]) -> SimulatedLanguageModel:
+def create_simulated_realistic_chat_gpt_intersect_set(seed: int, extra_args: Mapping[str, Any]) -> SeededSimulatedLanguageModel:
     """
     Creates a simulated ChatGPT instance for the task intersect_set.
     :param seed: seed to use for random number generator
     :param extra_args: extra arguments, ignored for this function
     :return: simulated ChatGPT instance for the task intersect_set
     """
-    simulated_chat_gpt = SimulatedLanguageModel(
+    simulated_chat_gpt = SeededSimulatedLanguageModel(
         seed=seed,
         simulated_behaviors=[
             SimulatedLanguageModelBehavior(
@@ -90,7 +99,7 @@ def create_simulated_realistic_chat_gpt_intersect_set(seed: int, extra_args: Map
     return simulated_chat_gpt
 
 
-def create_simulated_deterministic_chat_gpt_intersect_set(seed: int, extra_args: Mapping[str, Any]) -> SimulatedLanguageModel:
+def create_simulated_deterministic_chat_gpt_intersect_set(seed: int, extra_args: Mapping[str, Any]) -> SeededSimulatedLanguageModel:
     """
     Creates a simulated ChatGPT instance for the task intersect_set.
     The probabilities are either 1.0 or 0.0.
@@ -98,14 +107,14 @@ def create_simulated_deterministic_chat_gpt_intersect_set(seed: int, extra_args:
     :param extra_args: extra arguments, ignored for this function
     :return: simulated ChatGPT instance for the task intersect_set
     """
-    simulated_chat_gpt = SimulatedLanguageModel(
+    simulated_chat_gpt = SeededSimulatedLanguageModel(
         seed=seed,
         simulated_behaviors=[
             SimulatedLanguageModelBehavior(
                 prompt=op_intersect.prompt,
                 mocked_correct_behavior=_intersect_set_correctly,
                 mocked_incorrect_behavior=_intersect_set_incorrectly,
-                probability=lambda p, s: 1.0 if _get_intersect_set_probability(p, s) == 1.0 else 0.0
+                probability=lambda p, s: _get_intersect_set_probability(p, s, _deterministic_intersect_set_probabilities)
             )
         ])
     return simulated_chat_gpt
@@ -2,20 +2,32 @@ from typing import Mapping, Any, List
 
 from pure_graph_of_thoughts.api.language_model import Prompt
 from pure_graph_of_thoughts.api.state import State
-from pure_graph_of_thoughts.language_model import SimulatedLanguageModel, SimulatedLanguageModelBehavior
+from pure_graph_of_thoughts.language_model import SimulatedLanguageModelBehavior
+from .probability_table import ProbabilityTable
+from .seeded_simulated_language_model import SeededSimulatedLanguageModel
 
 from ..tasks.merge_docs import op_merge, op_improve
 
-_merge_docs_probabilities: Mapping[int, float] = {
+_merge_docs_probabilities: ProbabilityTable = ProbabilityTable.of({
      1: 0.96,
      2: 0.68,
      3: 0.43,
      4: 0.31
-}
+})
 
-_improve_docs_probabilities: Mapping[int, float] = {
+_improve_docs_probabilities: ProbabilityTable = ProbabilityTable.of({
     1: 0.96
+})
+
+_deterministic_merge_docs_probabilities: ProbabilityTable = _merge_docs_probabilities.deterministic()
+
+_deterministic_improve_docs_probabilities: ProbabilityTable = _improve_docs_probabilities.deterministic()
+
+MERGE_DOCS_PROBABILITY_TABLES: Mapping[Prompt, ProbabilityTable] = {
+    op_merge.prompt: _merge_docs_probabilities,
+    op_improve.prompt: _improve_docs_probabilities,
 }
+"""The probability tables of the realistic simulation by prompt, indexed by the local complexity of the thoughts"""
 
 
 def _merge_docs_correctly(prompt: Prompt, state: State) -> State:
@@ -29,12 +41,11 @@ def _merge_docs_incorrectly(prompt: Prompt, state: State) -> State:
     return {'merged': ''}
 
 
-def _get_merge_docs_probability(prompt: Prompt, state: State) -> float:
+def _get_merge_docs_probability(
+        prompt: Prompt, state: State, probabilities: ProbabilityTable = _merge_docs_probabilities
+) -> float:
     documents: List[str] = state.get('documents', [])
-    cardinality = len(documents)
-    if cardinality in _merge_docs_probabilities:
-        return _merge_docs_probabilities[cardinality]
-    return 0.0
+    return probabilities.lookup(len(documents))
 
 
 def _improve_docs_correctly(prompt: Prompt, state: State) -> State:
@@ -49,23 +60,22 @@ def _improve_docs_incorrectly(prompt: Prompt, state: State) -> State:
     return {'merged': ''}
 
 
-def _get_improve_docs_probability(prompt: Prompt, state: State) -> float:
+def _get_improve_docs_probability(
+        prompt: Prompt, state: State, probabilities: ProbabilityTable = _improve_docs_probabilities
+) -> float:
     documents: List[str] = state.get('documents', [])
     merged: List[str] = [state.get('merged', '')]
-    cardinality = max(len(merged), len(documents))
-    if cardinality in _improve_docs_probabilities:
-        return _improve_docs_probabilities[cardinality]
-    return 0.0
+    return probabilities.lookup(max(len(merged), len(documents)))
 
 
-def create_simulated_realistic_chat_gpt_merge_docs(seed: int, extra_args: Mapping[str, Any]) -> SimulatedLanguageModel:
+def create_simulated_realistic_chat_gpt_merge_docs(seed: int, extra_args: Mapping[str, Any]) -> SeededSimulatedLanguageModel:
     """
     Creates a simulated ChatGPT instance for the task merge_docs.
     :param seed: seed to use for random number generator
     :param extra_args: extra arguments, ignored for this function
     :return: simulated ChatGPT instance for the task merge_docs
     """
-    simulated_chat_gpt = SimulatedLanguageModel(
+    simulated_chat_gpt = SeededSimulatedLanguageModel(
         seed=seed,
         simulated_behaviors=[
             SimulatedLanguageModelBehavior(
@@ -84,7 +94,7 @@ def create_simulated_realistic_chat_gpt_merge_docs(seed: int, extra_args: Mappin
     return simulated_chat_gpt
 
 
-def create_simulated_deterministic_chat_gpt_merge_docs(seed: int, extra_args: Mapping[str, Any]) -> SimulatedLanguageModel:
+def create_simulated_deterministic_chat_gpt_merge_docs(seed: int, extra_args: Mapping[str, Any]) -> SeededSimulatedLanguageModel:
     """
     Creates a simulated ChatGPT instance for the task merge_docs.
     The probabilities are either 1.0 or 0.0.
@@ -92,20 +102,20 @@ def create_simulated_deterministic_chat_gpt_merge_docs(seed: int, extra_args: Ma
     :param extra_args: extra arguments, ignored for this function
     :return: simulated ChatGPT instance for the task merge_docs
     """
-    simulated_chat_gpt = SimulatedLanguageModel(
+    simulated_chat_gpt = SeededSimulatedLanguageModel(
         seed=seed,
         simulated_behaviors=[
             SimulatedLanguageModelBehavior(
                 prompt=op_merge.prompt,
                 mocked_correct_behavior=_merge_docs_correctly,
                 mocked_incorrect_behavior=_merge_docs_incorrectly,
-                probability=lambda p, s: 1.0 if _get_merge_docs_probability(p, s) == 1.0 else 0.0
+                probability=lambda p, s: _get_merge_docs_probability(p, s, _deterministic_merge_docs_probabilities)
             ),
             SimulatedLanguageModelBehavior(
                 prompt=op_improve.prompt,
                 mocked_correct_behavior=_improve_docs_correctly,
                 mocked_incorrect_behavior=_improve_docs_incorrectly,
-                probability=lambda p, s: 1.0 if _get_improve_docs_probability(p, s) == 1.0 else 0.0
+                probability=lambda p, s: _get_improve_docs_probability(p, s, _deterministic_improve_docs_probabilities)
             ),
         ])
     return simulated_chat_gpt
\ No newline at end of file
@@ -2,11 +2,13 @@ from typing import Sequence, List, Mapping, Any
 
 from pure_graph_of_thoughts.api.language_model import Prompt
 from pure_graph_of_thoughts.api.state import State
-from pure_graph_of_thoughts.language_model import SimulatedLanguageModel, SimulatedLanguageModelBehavior
+from pure_graph_of_thoughts.language_model import SimulatedLanguageModelBehavior
+from .probability_table import ProbabilityTable
+from .seeded_simulated_language_model import SeededSimulatedLanguageModel
 
 from ..tasks.sort_list import op_sort, op_split, op_merge
 
-_sort_list_probabilities: Mapping[int, float] = {
+_sort_list_probabilities: ProbabilityTable = ProbabilityTable.of({
     1: 1.0,
     2: 1.0,
     3: 1.0,
@@ -39,9 +41,9 @@ _sort_list_probabilities: Mapping[int, float] = {
     30: 0.17,
     31: 0.13,
     32: 0.14
-}
+})
 
-_split_list_probabilities: Mapping[int, float] = {
+_split_list_probabilities: ProbabilityTable = ProbabilityTable.of({
     # filled in values, not measured
     1: 1.0,
     2: 1.0,
@@ -108,9 +110,9 @@ _split_list_probabilities: Mapping[int, float] = {
     62: 0.78,
     63: 0.95,
     64: 0.75
-}
+})
 
-_merge_list_probabilities: Mapping[int, float] = {
+_merge_list_probabilities: ProbabilityTable = ProbabilityTable.of({
     8: 1.0,
     9: 1.0,
     10: 1.0,
@@ -136,7 +138,20 @@ _merge_list_probabilities: Mapping[int, float] = {
     30: 0.98,
     31: 0.99,
     32: 0.99
+})
+
+_deterministic_sort_list_probabilities: ProbabilityTable = _sort_list_probabilities.deterministic()
+
+_deterministic_split_list_probabilities: ProbabilityTable = _split_list_probabilities.deterministic()
+
+_deterministic_merge_list_probabilities: ProbabilityTable = _merge_list_probabilities.deterministic()
+
+SORT_LIST_PROBABILITY_TABLES: Mapping[Prompt, ProbabilityTable] = {
+    op_sort.prompt: _sort_list_probabilities,
+    op_split.prompt: _split_list_probabilities,
+    op_merge.prompt: _merge_list_probabilities,
 }
+"""The probability tables of the realistic simulation by prompt, indexed by the local complexity of the thoughts"""
 
 
 def _sort_list_correctly(prompt: Prompt, state: State) -> State:
@@ -153,29 +168,29 @@ def _sort_list_incorrectly(prompt: Prompt, state: State) -> State:
     return state
 
 
-def _get_sort_list_probability(prompt: Prompt, state: State) -> float:
+def _get_sort_list_probability(
+        prompt: Prompt, state: State, probabilities: ProbabilityTable = _sort_list_probabilities
+) -> float:
     if 'list' in state:
-        length = len(state['list'])
-        if length in _sort_list_probabilities:
-            return _sort_list_probabilities[length]
+        return probabilities.lookup(len(state['list']))
     return 0.0
 
 
-def _get_split_list_probability(prompt: Prompt, state: State) -> float:
+def _get_split_list_probability(
+        prompt: Prompt, state: State, probabilities: ProbabilityTable = _split_list_probabilities
+) -> float:
     if 'sum' in state:
-        return _split_list_probabilities[1]
+        return probabilities.lookup(1)
     if 'list' in state:
-        length = len(state['list'])
-        if length in _split_list_probabilities:
-            return _split_list_probabilities[length]
+        return probabilities.lookup(len(state['list']))
     return 0.0
 
 
-def _get_merge_list_probability(prompt: Prompt, state: State) -> float:
+def _get_merge_list_probability(
+        prompt: Prompt, state: State, probabilities: ProbabilityTable = _merge_list_probabilities
+) -> float:
     length = len(state['list']) if 'list' in state else len(state['lists'][0]) if ('lists' in state and len(state['lists']) == 2) else -1
-    if length in _merge_list_probabilities:
-        return _merge_list_probabilities[length]
-    return 0.0
+    return probabilities.lookup(length)
 
 
 def _merge_lists_correctly(prompt: Prompt, state: State) -> State:
@@ -248,14 +263,14 @@ def _split_list_incorrectly(prompt: Prompt, state: State) -> State:
     }
 
 
-def create_simulated_realistic_chat_gpt_sort_list(seed: int, extra_args: Mapping[str, Any]) -> SimulatedLanguageModel:
+def create_simulated_realistic_chat_gpt_sort_list(seed: int, extra_args: Mapping[str, Any]) -> SeededSimulatedLanguageModel:
     """
     Creates a simulated ChatGPT instance for the task sort_list.
     :param seed: seed to use for random number generator
     :param extra_args: extra arguments, ignored for this function
     :return: simulated ChatGPT instance for the task sort_list
     """
-    simulated_chat_gpt = SimulatedLanguageModel(
+    simulated_chat_gpt = SeededSimulatedLanguageModel(
         seed=seed,
         simulated_behaviors=[
             SimulatedLanguageModelBehavior(
@@ -280,7 +295,7 @@ def create_simulated_realistic_chat_gpt_sort_list(seed: int, extra_args: Mapping
     return simulated_chat_gpt
 
 
-def create_simulated_deterministic_chat_gpt_sort_list(seed: int, extra_args: Mapping[str, Any]) -> SimulatedLanguageModel:
+def create_simulated_deterministic_chat_gpt_sort_list(seed: int, extra_args: Mapping[str, Any]) -> SeededSimulatedLanguageModel:
     """
     Creates a simulated ChatGPT instance for the task sort_list.
     The probabilities are either 1.0 or 0.0.
@@ -288,26 +303,26 @@ def create_simulated_deterministic_chat_gpt_sort_list(seed: int, extra_args: Map
     :param extra_args: extra arguments, ignored for this function
     :return: simulated ChatGPT instance for the task sort_list
     """
-    simulated_chat_gpt = SimulatedLanguageModel(
+    simulated_chat_gpt = SeededSimulatedLanguageModel(
         seed=seed,
         simulated_behaviors=[
             SimulatedLanguageModelBehavior(
                 prompt=op_sort.prompt,
                 mocked_correct_behavior=_sort_list_correctly,
                 mocked_incorrect_behavior=_sort_list_incorrectly,
-                probability=lambda p, s: 1.0 if _get_sort_list_probability(p, s) == 1.0 else 0.0
+                probability=lambda p, s: _get_sort_list_probability(p, s, _deterministic_sort_list_probabilities)
             ),
             SimulatedLanguageModelBehavior(
                 prompt=op_split.prompt,
                 mocked_correct_behavior=_split_list_correctly,
                 mocked_incorrect_behavior=_split_list_incorrectly,
-                probability=lambda p, s: 1.0 if _get_split_list_probability(p, s) == 1.0 else 0.0
+                probability=lambda p, s: _get_split_list_probability(p, s, _deterministic_split_list_probabilities)
             ),
             SimulatedLanguageModelBehavior(
                 prompt=op_merge.prompt,
                 mocked_correct_behavior=_merge_lists_correctly,
                 mocked_incorrect_behavior=_sort_list_incorrectly,
-                probability=lambda p, s: 1.0 if _get_merge_list_probability(p, s) == 1.0 else 0.0
+                probability=lambda p, s: _get_merge_list_probability(p, s, _deterministic_merge_list_probabilities)
             ),
         ])
     return simulated_chat_gpt
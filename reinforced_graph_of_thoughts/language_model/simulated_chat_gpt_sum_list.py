@@ -2,10 +2,12 @@ from typing import Sequence, List, Mapping, Any
 
 from pure_graph_of_thoughts.api.language_model import Prompt
 from pure_graph_of_thoughts.api.state import State
-from pure_graph_of_thoughts.language_model import SimulatedLanguageModel, SimulatedLanguageModelBehavior
+from pure_graph_of_thoughts.language_model import SimulatedLanguageModelBehavior
+from .probability_table import ProbabilityTable
+from .seeded_simulated_language_model import SeededSimulatedLanguageModel
 from ..tasks.sum_list import op_sum, op_split, op_merge
 
-_sum_list_probabilities: Mapping[int, float] = {
+_sum_list_probabilities: ProbabilityTable = ProbabilityTable.of({
     1: 1.0,
     2: 1.0,
     3: 1.0,
@@ -38,9 +40,9 @@ _sum_list_probabilities: Mapping[int, float] = {
     30: 0.01,
     31: 0.0,
     32: 0.05
-}
+})
 
-_split_list_probabilities: Mapping[int, float] = {
+_split_list_probabilities: ProbabilityTable = ProbabilityTable.of({
     # filled in values, not measured
     1: 1.0,
     2: 1.0,
@@ -107,9 +109,9 @@ _split_list_probabilities: Mapping[int, float] = {
     62: 0.78,
     63: 0.95,
     64: 0.75
-}
+})
 
-_merge_list_probabilities: Mapping[int, float] = {
+_merge_list_probabilities: ProbabilityTable = ProbabilityTable.of({
     # filled in values, not measured
     1: 1.0,
     2: 1.0,
@@ -144,7 +146,20 @@ _merge_list_probabilities: Mapping[int, float] = {
     30: 0.98,
     31: 0.99,
     32: 0.99
+})
+
+_deterministic_sum_list_probabilities: ProbabilityTable = _sum_list_probabilities.deterministic()
+
+_deterministic_split_list_probabilities: ProbabilityTable = _split_list_probabilities.deterministic()
+
+_deterministic_merge_list_probabilities: ProbabilityTable = _merge_list_probabilities.deterministic()
+
+SUM_LIST_PROBABILITY_TABLES: Mapping[Prompt, ProbabilityTable] = {
+    op_sum.prompt: _sum_list_probabilities,
+    op_split.prompt: _split_list_probabilities,
+    op_merge.prompt: _merge_list_probabilities,
 }
+"""The probability tables of the realistic simulation by prompt, indexed by the local complexity of the thoughts"""
 
 
 def _sum_list_correctly(prompt: Prompt, state: State) -> State:
@@ -164,33 +179,33 @@ def _sum_list_incorrectly(prompt: Prompt, state: State) -> State:
     }
 
 
-def _get_sum_list_probability(prompt: Prompt, state: State) -> float:
+def _get_sum_list_probability(
+        prompt: Prompt, state: State, probabilities: ProbabilityTable = _sum_list_probabilities
+) -> float:
     if 'sum' in state:
-        return _sum_list_probabilities[1]
+        return probabilities.lookup(1)
     if 'list' in state:
-        length = len(state['list'])
-        if length in _sum_list_probabilities:
-            return _sum_list_probabilities[length]
+        return probabilities.lookup(len(state['list']))
     return 0.0
 
 
-def _get_split_list_probability(prompt: Prompt, state: State) -> float:
+def _get_split_list_probability(
+        prompt: Prompt, state: State, probabilities: ProbabilityTable = _split_list_probabilities
+) -> float:
     if 'sum' in state:
-        return _split_list_probabilities[1]
+        return probabilities.lookup(1)
     if 'list' in state:
-        length = len(state['list'])
-        if length in _split_list_probabilities:
-            return _split_list_probabilities[length]
+        return probabilities.lookup(len(state['list']))
     return 0.0
 
 
-def _get_merge_list_probability(prompt: Prompt, state: State) -> float:
+def _get_merge_list_probability(
+        prompt: Prompt, state: State, probabilities: ProbabilityTable = _merge_list_probabilities
+) -> float:
     if 'sum' in state:
-        return _merge_list_probabilities[1]
+        return probabilities.lookup(1)
     if 'lists' in state and len(state['lists']) > 0:
-        length = max([len(l) for l in state['lists']])
-        if length in _merge_list_probabilities:
-            return _merge_list_probabilities[length]
+        return probabilities.lookup(max([len(l) for l in state['lists']]))
     return 0.0
 
 
@@ -258,14 +273,14 @@ def _split_list_incorrectly(prompt: Prompt, state: State) -> State:
     }
 
 
-def create_simulated_realistic_chat_gpt_sum_list(seed: int, extra_args: Mapping[str, Any]) -> SimulatedLanguageModel:
+def create_simulated_realistic_chat_gpt_sum_list(seed: int, extra_args: Mapping[str, Any]) -> SeededSimulatedLanguageModel:
     """
     Creates a simulated ChatGPT instance for the task sum_list.
     :param seed: seed to use for random number generator
     :param extra_args: extra arguments, ignored for this function
     :return: simulated ChatGPT instance for the task sum_list
     """
-    simulated_chat_gpt = SimulatedLanguageModel(
+    simulated_chat_gpt = SeededSimulatedLanguageModel(
         seed=seed,
         simulated_behaviors=[
             SimulatedLanguageModelBehavior(
@@ -290,7 +305,7 @@ def create_simulated_realistic_chat_gpt_sum_list(seed: int, extra_args: Mapping[
     return simulated_chat_gpt
 
 
-def create_simulated_deterministic_chat_gpt_sum_list(seed: int, extra_args: Mapping[str, Any]) -> SimulatedLanguageModel:
+def create_simulated_deterministic_chat_gpt_sum_list(seed: int, extra_args: Mapping[str, Any]) -> SeededSimulatedLanguageModel:
     """
     Creates a simulated ChatGPT instance for the task sum_list.
     The probabilities are either 1.0 or 0.0.
@@ -298,26 +313,26 @@ def create_simulated_deterministic_chat_gpt_sum_list(seed: int, extra_args: Mapp
     :param extra_args: extra arguments, ignored for this function
     :return: simulated ChatGPT instance for the task sum_list
     """
-    simulated_chat_gpt = SimulatedLanguageModel(
+    simulated_chat_gpt = SeededSimulatedLanguageModel(
         seed=seed,
         simulated_behaviors=[
             SimulatedLanguageModelBehavior(
                 prompt=op_sum.prompt,
                 mocked_correct_behavior=_sum_list_correctly,
                 mocked_incorrect_behavior=_sum_list_incorrectly,
-                probability=lambda p, s: 1.0 if _get_sum_list_probability(p, s) == 1.0 else 0.0
+                probability=lambda p, s: _get_sum_list_probability(p, s, _deterministic_sum_list_probabilities)
             ),
             SimulatedLanguageModelBehavior(
                 prompt=op_split.prompt,
                 mocked_correct_behavior=_split_list_correctly,
                 mocked_incorrect_behavior=_split_list_incorrectly,
-                probability=lambda p, s: 1.0 if _get_split_list_probability(p, s) == 1.0 else 0.0
+                probability=lambda p, s: _get_split_list_probability(p, s, _deterministic_split_list_probabilities)
             ),
             SimulatedLanguageModelBehavior(
                 prompt=op_merge.prompt,
                 mocked_correct_behavior=_merge_lists_correctly,
                 mocked_incorrect_behavior=_merge_lists_incorrectly,
-                probability=lambda p, s: 1.0 if _get_merge_list_probability(p, s) == 1.0 else 0.0
+                probability=lambda p, s: _get_merge_list_probability(p, s, _deterministic_merge_list_probabilities)
             )
         ])
     return simulated_chat_gpt
@@ -1 +1,7 @@
 from .q_learning import QLearning
+from .vec_q_learning import VecQLearning
+from .observation_encoder import ObservationEncoder
+from .sparse_q_learning import SparseQLearning
+from .graph_of_thoughts_mdp import GraphOfThoughtsMdp, GraphOfThoughtsMdpException, LayerOperations
+from .value_iteration import ValueIteration, ValueIterationException
+from .value_iteration_agent import ValueIterationAgent
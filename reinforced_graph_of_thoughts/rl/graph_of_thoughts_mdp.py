@@ -0,0 +1,492 @@
+import json
+from collections import deque
+from functools import partial
+from math import comb
+from typing import Sequence, Tuple, Dict, List, Optional, Hashable, Mapping, Deque
+
+import numpy as np
+import numpy.typing as npt
+from pure_graph_of_thoughts.api.language_model import Prompt, LanguageModelException
+from pure_graph_of_thoughts.api.state import State
+from pure_graph_of_thoughts.api.task import Task
+from pure_graph_of_thoughts.language_model import SimulatedLanguageModelBehavior
+
+from ..controller import ContinuousGraphController, LayerSnapshot
+from ..env import GraphStepRewardVersion, GraphStepReward, ActionType, LayerAction
+from ..env.graph_of_thoughts_env import calculate_final_reward, create_layer_actions
+from ..language_model import BatchedLanguageModel, SeededSimulatedLanguageModel
+
+LayerOperations = Tuple[int, ...]
+"""Represents a state of the graph construction by the encoded operations of its layers."""
+
+_Branch = Tuple[int, Optional[LayerSnapshot], float]
+
+
+class GraphOfThoughtsMdp:
+    """
+    The finite Markov decision process of constructing a graph of operations layer by layer for a complexity.
+    A state is the sequence of the operations of the layers, which determines the depth, the breadth
+    and the local complexity of the graph, and the actions are the actions of the graph of thoughts environment.
+    The answers of the simulated language model are enumerated instead of sampled,
+    hence, the rewards are the exact expected rewards of the environment, averaged over the given initial states.
+    By default, answers of prompts of the same behavior and probability are aggregated by their number of correct answers,
+    which is exact if the graph only depends on the number of correct answers of such prompts,
+    e.g. if the prompts are applied to equal thoughts, and approximate otherwise.
+    Enumerating all combinations of answers is exact, but exponential in the breadth of the layers.
+    The model is exact for policies not observing the scores of the layers,
+    and the number of executed operations is the number of operations of the current layers,
+    i.e. operations of removed layers are not retained.
+    """
+
+    _task: Task
+    _complexity: int
+    _init_states: Sequence[State]
+    _min_branch_probability: float
+    _language_model: '_BranchingLanguageModel'
+    _controllers: Sequence[ContinuousGraphController]
+    _reward_version: GraphStepRewardVersion
+    _layer_actions: Sequence[LayerAction]
+    _states: Sequence[LayerOperations]
+    _state_indices: Dict[LayerOperations, int]
+    _next_states: npt.NDArray[np.int64]
+    _rewards: npt.NDArray[np.float64]
+    _valid_actions: npt.NDArray[np.bool_]
+    _solve_probabilities: npt.NDArray[np.float64]
+
+    @property
+    def complexity(self) -> int:
+        """The complexity of the initial state"""
+        return self._complexity
+
+    @property
+    def init_states(self) -> Sequence[State]:
+        """The initial states"""
+        return self._init_states
+
+    @property
+    def states(self) -> Sequence[LayerOperations]:
+        """All states, the initial state without any layers first"""
+        return self._states
+
+    @property
+    def n_states(self) -> int:
+        """The number of states"""
+        return len(self._states)
+
+    @property
+    def n_actions(self) -> int:
+        """The number of actions"""
+        return self._rewards.shape[1]
+
+    @property
+    def next_states(self) -> npt.NDArray[np.int64]:
+        """The index of the next state by state and action, -1 if the action terminates the episode or is invalid"""
+        return self._next_states
+
+    @property
+    def rewards(self) -> npt.NDArray[np.float64]:
+        """The expected reward by state and action"""
+        return self._rewards
+
+    @property
+    def valid_actions(self) -> npt.NDArray[np.bool_]:
+        """Whether an action is valid by state and action"""
+        return self._valid_actions
+
+    @property
+    def solve_probabilities(self) -> npt.NDArray[np.float64]:
+        """The probability of solving the task when stopping by state"""
+        return self._solve_probabilities
+
+    def __init__(
+            self,
+            task: Task,
+            language_model: SeededSimulatedLanguageModel,
+            complexity: int,
+            init_states: Sequence[State],
+            max_depth: int,
+            max_breadth: int,
+            divergence_cutoff_factor: float,
+            max_complexity: int,
+            max_operations: int,
+            reward_version: GraphStepRewardVersion,
+            min_branch_probability: float = 0.0,
+            aggregate_outcomes: bool = True
+    ) -> None:
+        """
+        Instantiates a new graph of thoughts MDP by enumerating all states reachable from the initial states.
+        :param task: task to solve
+        :param language_model: simulated language model providing the probabilities and answers
+        :param complexity: complexity of the initial states
+        :param init_states: initial states to average the rewards over
+        :param max_depth: maximum depth of the graph of operations
+        :param max_breadth: maximum breadth of the graph of operations
+        :param divergence_cutoff_factor: factor used to calculate the divergence cutoff
+        :param max_complexity: maximum local complexity
+        :param max_operations: maximum number of executed operations
+        :param reward_version: reward version of the environment
+        :param min_branch_probability: minimum probability of a branch of answers to be followed,
+            branches of lower probability are dropped and the MDP is approximate if positive
+        :param aggregate_outcomes: whether the answers of prompts of the same behavior and probability
+            are aggregated by their number of correct answers, otherwise all combinations of answers are enumerated,
+            which is exact but exponential in the breadth of the layers
+        """
+        if len(init_states) == 0:
+            raise GraphOfThoughtsMdpException('Initial states must not be empty')
+        self._task = task
+        self._complexity = complexity
+        self._init_states = init_states
+        self._min_branch_probability = min_branch_probability
+        self._language_model = _BranchingLanguageModel(language_model.simulated_behaviors, aggregate_outcomes)
+        self._controllers = [
+            ContinuousGraphController(
+                    language_model=self._language_model,
+                    generate_init_state=partial(_generate_init_state, complexity, init_state),
+                    max_depth=max_depth,
+                    max_breadth=max_breadth,
+                    divergence_cutoff_factor=divergence_cutoff_factor,
+                    max_complexity=max_complexity,
+                    max_operations=max_operations
+            )
+            for init_state in init_states
+        ]
+        self._reward_version = reward_version
+        self._layer_actions = create_layer_actions(task.operations)
+        self._build()
+
+    def state_index(self, layer_operations: Sequence[int]) -> int:
+        """
+        Returns the index of a state.
+        :param layer_operations: encoded operations of the layers
+        :return: index of the state
+        """
+        key = tuple(int(operation) for operation in layer_operations)
+        if key not in self._state_indices:
+            raise GraphOfThoughtsMdpException(f'State is not reachable: {key}')
+        return self._state_indices[key]
+
+    def _build(self) -> None:
+        """
+        Enumerates all reachable states breadth-first and calculates the transitions and expected rewards.
+        The distribution of the controller snapshots of each state is propagated from its predecessor state,
+        the structure of the graph and thus the states do not depend on the initial state.
+        """
+        n_actions = len(self._layer_actions)
+        operations = self._task.operations
+        states: List[LayerOperations] = [()]
+        state_indices: Dict[LayerOperations, int] = {(): 0}
+        branches_by_state: Dict[LayerOperations, Sequence[_Branch]] = {
+            (): [(index, None, 1.0 / len(self._controllers)) for index in range(len(self._controllers))]
+        }
+        next_states: List[List[int]] = []
+        rewards: List[List[float]] = []
+        valid_actions: List[List[bool]] = []
+        solve_probabilities: List[float] = []
+
+        queue: Deque[LayerOperations] = deque([()])
+        while queue:
+            state = queue.popleft()
+            branches = branches_by_state[state]
+            state_next_states = [-1 for _ in range(n_actions)]
+            state_rewards = [0.0 for _ in range(n_actions)]
+            state_valid_actions = [False for _ in range(n_actions)]
+
+            stop_reward, solve_probability = self._evaluate_stop(branches)
+            state_rewards[ActionType.STOP.value] = stop_reward
+            state_valid_actions[ActionType.STOP.value] = True
+            solve_probabilities.append(solve_probability)
+
+            controller_index, snapshot, _ = branches[0]
+            controller = self._controllers[controller_index]
+            controller.restore(snapshot)
+            if controller.validate_remove_sink_layer():
+                state_next_states[ActionType.BACKTRACK.value] = state_indices[state[:-1]]
+                state_rewards[ActionType.BACKTRACK.value] = self._evaluate_backtrack(branches)
+                state_valid_actions[ActionType.BACKTRACK.value] = True
+
+            controller.restore(snapshot)
+            for encoded_operation, is_valid in enumerate(controller.validate_append_operations(operations)):
+                if not is_valid:
+                    continue
+                action_id = ActionType.APPEND_OPERATION.value + encoded_operation
+                next_state = (*state, encoded_operation)
+                reward, next_branches = self._evaluate_append(branches, action_id)
+                state_indices[next_state] = len(states)
+                states.append(next_state)
+                branches_by_state[next_state] = next_branches
+                queue.append(next_state)
+                state_next_states[action_id] = state_indices[next_state]
+                state_rewards[action_id] = reward
+                state_valid_actions[action_id] = True
+
+            next_states.append(state_next_states)
+            rewards.append(state_rewards)
+            valid_actions.append(state_valid_actions)
+            # the branches are only required to expand the successors
+            del branches_by_state[state]
+
+        self._states = states
+        self._state_indices = state_indices
+        self._next_states = np.array(next_states, dtype=np.int64)
+        self._rewards = np.array(rewards, dtype=np.float64)
+        self._valid_actions = np.array(valid_actions, dtype=np.bool_)
+        self._solve_probabilities = np.array(solve_probabilities, dtype=np.float64)
+
+    def _evaluate_stop(self, branches: Sequence[_Branch]) -> Tuple[float, float]:
+        """
+        Evaluates stopping in each branch of a state.
+        :param branches: branches of the state
+        :return: tuple of expected reward and solve probability
+        """
+        expected_reward = 0.0
+        solve_probability = 0.0
+        for controller_index, snapshot, probability in branches:
+            controller = self._controllers[controller_index]
+            controller.restore(snapshot)
+            reward = calculate_final_reward(
+                    self._task, controller, self._create_reward(ActionType.STOP.value, controller, snapshot)
+            )
+            expected_reward += probability * float(reward)
+            if reward.is_solved:
+                solve_probability += probability
+        return expected_reward, solve_probability
+
+    def _evaluate_backtrack(self, branches: Sequence[_Branch]) -> float:
+        """
+        Evaluates removing the sink layer in each branch of a state.
+        :param branches: branches of the state
+        :return: expected reward
+        """
+        expected_reward = 0.0
+        for controller_index, snapshot, probability in branches:
+            controller = self._controllers[controller_index]
+            controller.restore(snapshot)
+            reward = self._create_reward(ActionType.BACKTRACK.value, controller, snapshot)
+            result = controller.remove_sink_layer()
+            reward.depth = controller.current_depth
+            reward.n_operations = controller.n_operations
+            if result.is_scored:
+                reward = reward.scored(result.score == 1.0)
+            expected_reward += probability * float(reward)
+        return expected_reward
+
+    def _evaluate_append(self, branches: Sequence[_Branch], action_id: int) -> Tuple[float, Sequence[_Branch]]:
+        """
+        Evaluates appending a layer in each branch of a state for every answer of the language model.
+        Branches resulting in equal snapshots are merged, and branches below the minimum probability are dropped.
+        :param branches: branches of the state
+        :param action_id: index of the append action
+        :return: tuple of expected reward and branches of the next state
+        """
+        operation = self._layer_actions[action_id].operation
+        if operation is None:
+            raise GraphOfThoughtsMdpException(f'Action does not append an operation: {action_id}')
+        expected_reward = 0.0
+        next_branches: Dict[Hashable, _Branch] = {}
+        for controller_index, snapshot, probability in branches:
+            controller = self._controllers[controller_index]
+            outcome_index = 0
+            n_outcomes = 1
+            while outcome_index < n_outcomes:
+                controller.restore(snapshot)
+                self._language_model.select_outcome(outcome_index)
+                reward = self._create_reward(action_id, controller, snapshot)
+                result = controller.append_layer(operation)
+                next_snapshot = controller.snapshot
+                if not result.is_valid or next_snapshot is None:
+                    raise GraphOfThoughtsMdpException(f'Appending the operation is invalid: {operation}')
+                reward.depth = controller.current_depth
+                reward.n_operations = controller.n_operations
+                if result.is_scored:
+                    reward = reward.scored(result.score == 1.0)
+
+                outcome_probability = probability * self._language_model.probability
+                expected_reward += outcome_probability * float(reward)
+                key = (controller_index, self._create_key(next_snapshot))
+                if key in next_branches:
+                    _, merged_snapshot, merged_probability = next_branches[key]
+                    next_branches[key] = (controller_index, merged_snapshot, merged_probability + outcome_probability)
+                else:
+                    next_branches[key] = (controller_index, next_snapshot, outcome_probability)
+                n_outcomes = self._language_model.n_outcomes
+                outcome_index += 1
+        followed_branches = [
+            branch for branch in next_branches.values() if branch[2] >= self._min_branch_probability
+        ]
+        if len(followed_branches) == 0:
+            # the states are enumerated along the branches, hence, the most probable branch is always followed
+            followed_branches = [max(next_branches.values(), key=lambda branch: branch[2])]
+        return expected_reward, followed_branches
+
+    def _create_reward(
+            self, action_id: int, controller: ContinuousGraphController, snapshot: Optional[LayerSnapshot]
+    ) -> GraphStepReward:
+        """
+        Creates the reward of an action like the environment, the previous score being the score of the sink layer.
+        :param action_id: index of the action
+        :param controller: controller the action is taken by
+        :param snapshot: snapshot the action is taken in
+        :return: reward
+        """
+        return GraphStepReward(
+                version=self._reward_version,
+                action=self._layer_actions[action_id],
+                max_depth=controller.max_depth,
+                max_operations=controller.max_operations,
+                prev_scored=snapshot.score == 1.0 if snapshot is not None and snapshot.score is not None else None
+        )
+
+    @staticmethod
+    def _create_key(snapshot: LayerSnapshot) -> Hashable:
+        """
+        Creates the key of a snapshot, snapshots of equal keys evolve equally.
+        :param snapshot: snapshot
+        :return: key of the snapshot
+        """
+        return (
+            json.dumps(
+                    [
+                        [[thought.state, thought.score, thought.cumulative_score] for thought in node_thoughts]
+                        for node_thoughts in snapshot.thoughts
+                    ],
+                    sort_keys=True,
+                    default=str
+            ),
+            json.dumps(
+                    [[thought.state, thought.score] for thought in snapshot.sink_thoughts], sort_keys=True, default=str
+            ),
+            tuple(snapshot.is_reachable),
+            tuple(snapshot.thought_layer_indices),
+            snapshot.sink_thought_layer_index,
+            snapshot.score
+        )
+
+
+def _generate_init_state(complexity: int, init_state: State) -> Tuple[int, State]:
+    return complexity, init_state
+
+
+class _BranchingLanguageModel(BatchedLanguageModel):
+    """
+    A language model answering a batch of prompts with a selected combination of correct and incorrect answers.
+    Only prompts answered correctly with a probability strictly between zero and one are branched.
+    If the outcomes are aggregated, prompts of the same behavior and probability form a group,
+    and a combination only determines the number of correct answers of each group,
+    the first prompts of a group being answered correctly.
+    Otherwise, every combination of correct and incorrect answers is enumerated.
+    """
+
+    outcome_index: int
+    """The index of the combination of answers of the next batch"""
+
+    n_outcomes: int
+    """The number of combinations of answers of the last batch"""
+
+    probability: float
+    """The probability of the combination of answers of the last batch"""
+
+    _simulated_behaviors: Mapping[Prompt, SimulatedLanguageModelBehavior]
+    _behaviors_by_prompt_id: Dict[int, SimulatedLanguageModelBehavior]
+    _aggregate_outcomes: bool
+
+    def __init__(
+            self, simulated_behaviors: Mapping[Prompt, SimulatedLanguageModelBehavior], aggregate_outcomes: bool
+    ) -> None:
+        self._simulated_behaviors = simulated_behaviors
+        self._behaviors_by_prompt_id = {}
+        self._aggregate_outcomes = aggregate_outcomes
+        self.outcome_index = 0
+        self.n_outcomes = 1
+        self.probability = 1.0
+
+    def select_outcome(self, outcome_index: int) -> None:
+        """
+        Selects the combination of answers of the next batch.
+        The number and the probability of the combinations are reset, as layers might not prompt at all.
+        :param outcome_index: index of the combination of answers
+        """
+        self.outcome_index = outcome_index
+        self.n_outcomes = 1
+        self.probability = 1.0
+
+    def prompt(self, prompt: Prompt, state: State) -> State:
+        raise LanguageModelException('Prompts are only answered in batches')
+
+    def prompt_batch(self, requests: Sequence[Tuple[Prompt, State]]) -> Sequence[State]:
+        behaviors: List[SimulatedLanguageModelBehavior] = []
+        for prompt, _ in requests:
+            # prompts are hashed by their string representation, hence, the behaviors are resolved once per prompt
+            behavior = self._behaviors_by_prompt_id.get(id(prompt))
+            if behavior is None:
+                if prompt not in self._simulated_behaviors:
+                    raise LanguageModelException(f'No simulated behavior found for prompt {prompt}')
+                behavior = self._simulated_behaviors[prompt]
+                self._behaviors_by_prompt_id[id(prompt)] = behavior
+            behaviors.append(behavior)
+        probabilities = [behavior.probability(prompt, state) for behavior, (prompt, state) in zip(behaviors, requests)]
+
+        outcomes = [probability > 0.0 for probability in probabilities]
+        if self._aggregate_outcomes:
+            self._select_aggregated_outcomes(behaviors, probabilities, outcomes)
+        else:
+            self._select_outcomes(probabilities, outcomes)
+        return [
+            behavior.mocked_correct_behavior(prompt, state) if outcome
+            else behavior.mocked_incorrect_behavior(prompt, state)
+            for behavior, outcome, (prompt, state) in zip(behaviors, outcomes, requests)
+        ]
+
+    def _select_outcomes(self, probabilities: Sequence[float], outcomes: List[bool]) -> None:
+        """
+        Selects the combination of answers of the outcome index among all combinations of the branched prompts.
+        :param probabilities: probabilities of a correct answer of each prompt
+        :param outcomes: outcomes of each prompt, updated in place
+        """
+        self.probability = 1.0
+        n_branched = 0
+        for index, probability in enumerate(probabilities):
+            if 0.0 < probability < 1.0:
+                outcomes[index] = (self.outcome_index >> n_branched) & 1 == 0
+                self.probability *= probability if outcomes[index] else 1.0 - probability
+                n_branched += 1
+        self.n_outcomes = 2 ** n_branched
+
+    def _select_aggregated_outcomes(
+            self,
+            behaviors: Sequence[SimulatedLanguageModelBehavior],
+            probabilities: Sequence[float],
+            outcomes: List[bool]
+    ) -> None:
+        """
+        Selects the numbers of correct answers of the outcome index among all numbers of the groups of branched prompts.
+        :param behaviors: behaviors of each prompt
+        :param probabilities: probabilities of a correct answer of each prompt
+        :param outcomes: outcomes of each prompt, updated in place
+        """
+        groups: Dict[Tuple[int, float], List[int]] = {}
+        for index, (behavior, probability) in enumerate(zip(behaviors, probabilities)):
+            if 0.0 < probability < 1.0:
+                groups.setdefault((id(behavior), probability), []).append(index)
+
+        self.probability = 1.0
+        self.n_outcomes = 1
+        remaining_index = self.outcome_index
+        for (_, probability), indices in groups.items():
+            # the outcome index is decoded in mixed radix, each group has one digit per number of correct answers
+            n_indices = len(indices)
+            n_correct = remaining_index % (n_indices + 1)
+            remaining_index //= n_indices + 1
+            for position, index in enumerate(indices):
+                outcomes[index] = position < n_correct
+            self.probability *= comb(n_indices, n_correct) * probability ** n_correct * (
+                    1.0 - probability) ** (n_indices - n_correct)
+            self.n_outcomes *= n_indices + 1
+
+
+class GraphOfThoughtsMdpException(Exception):
+    """
+    An exception that is raised in context of the graph of thoughts MDP.
+    """
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
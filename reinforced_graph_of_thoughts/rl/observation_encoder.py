@@ -0,0 +1,123 @@
+from typing import Mapping, Any, List, Tuple, Sequence, Optional
+
+import numpy as np
+import numpy.typing as npt
+from gymnasium import spaces
+
+from .q_learning import QLearningException
+from ..space import OrdinalDiscreteSpace
+
+
+class ObservationEncoder:
+    """
+    An encoder of dictionary observations into compact integer keys.
+    Each component is decoded into its discrete values, which are packed by mixed-radix encoding,
+    hence, distinct observations are encoded into distinct keys in the range [0, n_keys).
+    Supported components are ordinal discrete, discrete, multi-discrete and multi-binary spaces.
+    """
+
+    _components: Sequence[Tuple[str, spaces.Space[Any], Sequence[int]]]
+    """The name, the space and the radices of each component"""
+
+    _n_keys: int
+    """The number of distinct keys"""
+
+    @property
+    def n_keys(self) -> int:
+        """The number of distinct keys"""
+        return self._n_keys
+
+    def __init__(self, observation_space: spaces.Dict) -> None:
+        """
+        Instantiates a new observation encoder.
+        :param observation_space: dictionary observation space
+        """
+        components: List[Tuple[str, spaces.Space[Any], Sequence[int]]] = []
+        for name, space in observation_space.spaces.items():
+            components.append((name, space, self._get_radices(name, space)))
+        self._components = components
+        self._n_keys = 1
+        for _, _, radices in self._components:
+            for radix in radices:
+                self._n_keys *= radix
+
+    def encode(self, observation: Mapping[str, Any]) -> int:
+        """
+        Encodes an observation into its key.
+        :param observation: observation
+        :return: key
+        """
+        key = 0
+        for name, space, radices in self._components:
+            for value, radix in zip(self._decode(space, observation[name]), radices):
+                key = key * radix + value
+        return key
+
+    def encode_batch(self, observations: Mapping[str, Any]) -> npt.NDArray[np.int64]:
+        """
+        Encodes a batch of observations into their keys at once.
+        :param observations: observations, each component stacked along the first axis
+        :return: keys
+        """
+        keys: Optional[npt.NDArray[np.int64]] = None
+        for name, space, radices in self._components:
+            values = self._decode_batch(space, observations[name], len(radices))
+            if keys is None:
+                keys = np.zeros(values.shape[0], dtype=np.int64)
+            for value, radix in zip(values.T, radices):
+                keys = keys * radix + value
+        if keys is None:
+            raise QLearningException('Observations must not be empty')
+        return keys
+
+    @staticmethod
+    def _get_radices(name: str, space: spaces.Space[Any]) -> Sequence[int]:
+        """
+        Gets the radices of the discrete values of a component.
+        :param name: name of the component
+        :param space: space of the component
+        :return: radices
+        """
+        if isinstance(space, OrdinalDiscreteSpace):
+            return [space.n]
+        if isinstance(space, spaces.Discrete):
+            return [int(space.n)]
+        if isinstance(space, spaces.MultiDiscrete):
+            return [int(n) for n in np.asarray(space.nvec).reshape(-1)]
+        if isinstance(space, spaces.MultiBinary):
+            return [2 for _ in range(int(np.prod(space.shape)))]
+        raise QLearningException(f'Observation component {name} is not discrete: {space}')
+
+    @staticmethod
+    def _decode(space: spaces.Space[Any], value: Any) -> Sequence[int]:
+        """
+        Decodes the value of a component into its discrete values starting from zero.
+        :param space: space of the component
+        :param value: value of the component
+        :return: discrete values
+        """
+        if isinstance(space, OrdinalDiscreteSpace):
+            return [space.inverse_transform(float(np.asarray(value).reshape(-1)[0])) - space.discrete_low]
+        if isinstance(space, spaces.Discrete):
+            return [int(value) - int(space.start)]
+        if isinstance(space, spaces.MultiDiscrete):
+            return [int(v) - int(s) for v, s in zip(np.asarray(value).reshape(-1), np.asarray(space.start).reshape(-1))]
+        return [int(v) for v in np.asarray(value).reshape(-1)]
+
+    @staticmethod
+    def _decode_batch(space: spaces.Space[Any], values: Any, n_values: int) -> npt.NDArray[np.int64]:
+        """
+        Decodes a batch of values of a component into their discrete values starting from zero.
+        :param space: space of the component
+        :param values: values of the component, stacked along the first axis
+        :param n_values: number of discrete values of the component
+        :return: discrete values of shape (n, n_values)
+        """
+        array = np.asarray(values).reshape(-1, n_values)
+        if isinstance(space, OrdinalDiscreteSpace):
+            return space.batch_inverse_transform(array) - space.discrete_low
+        if isinstance(space, spaces.Discrete):
+            return array.astype(np.int64) - int(space.start)
+        if isinstance(space, spaces.MultiDiscrete):
+            return array.astype(np.int64) - np.asarray(space.start, dtype=np.int64).reshape(1, -1)
+        return array.astype(np.int64)
@@ -0,0 +1,162 @@
+from typing import Mapping, Any, Dict
+
+import numpy as np
+import numpy.typing as npt
+from gymnasium import Env
+from gymnasium.vector.utils import spaces
+
+from .observation_encoder import ObservationEncoder
+from .q_learning import QLearningException
+
+
+class SparseQLearning:
+    """
+    Implementation of the Q-learning algorithm for dictionary observations.
+    The observations are encoded into integer keys and the Q table only contains rows of visited states,
+    it grows whenever a new state is visited.
+    """
+
+    _env: Env[Mapping[str, Any], np.int64]
+    """The environment"""
+
+    _seed: int
+    """The seed for the random number generator"""
+
+    _np_random: np.random.Generator
+    """The random number generator"""
+
+    _alpha: float
+    """The learning rate"""
+
+    _gamma: float
+    """The discount factor"""
+
+    _epsilon: float
+    """The exploration rate"""
+
+    _encoder: ObservationEncoder
+    """The encoder of the observations"""
+
+    _state_indices: Dict[int, int]
+    """The row indices of the Q table by key of the visited states"""
+
+    _Q: npt.NDArray[np.float32]
+    """The Q table, of which only the rows of visited states are used"""
+
+    @property
+    def Q(self) -> npt.NDArray[np.float32]:
+        """The Q table of the visited states"""
+        return self._Q[:len(self._state_indices)]
+
+    @property
+    def n_states(self) -> int:
+        """The number of visited states"""
+        return len(self._state_indices)
+
+    @property
+    def encoder(self) -> ObservationEncoder:
+        """The encoder of the observations"""
+        return self._encoder
+
+    def __init__(
+            self,
+            env: Env[Mapping[str, Any], np.int64],
+            alpha: float,
+            gamma: float,
+            epsilon: float,
+            seed: int,
+            initial_capacity: int = 1024
+    ) -> None:
+        """
+        Instantiates a new sparse Q-learning algorithm.
+        :param env: environment
+        :param alpha: learning rate
+        :param gamma: discount factor
+        :param epsilon: exploration rate
+        :param seed: seed
+        :param initial_capacity: initial number of rows of the Q table
+        """
+        if initial_capacity < 1:
+            raise QLearningException('Initial capacity must be positive')
+        self._env = env
+        self._seed = seed
+        self._np_random = np.random.default_rng(seed=seed)
+        self._alpha = alpha
+        self._gamma = gamma
+        self._epsilon = epsilon
+        if not isinstance(self._env.observation_space, spaces.Dict):
+            raise QLearningException('Observation space must be a dictionary')
+        if not isinstance(self._env.action_space, spaces.Discrete):
+            raise QLearningException('Action space must be discrete')
+        self._encoder = ObservationEncoder(self._env.observation_space)
+        action_space: spaces.Discrete = self._env.action_space
+        action_space.seed(self._seed)
+        self._state_indices = {}
+        self._Q = np.zeros((initial_capacity, action_space.n), dtype=np.float32)
+        self._env.reset(seed=seed)
+
+    def learn(self, total_episodes: int, verbose: bool = False) -> None:
+        """
+        Executes the learning process for a given number of episodes.
+        :param total_episodes: total episodes to train on
+        :param verbose: whether to log verbosely
+        """
+
+        for episode in range(total_episodes):
+            terminated = False
+            truncated = False
+            total_rewards = 0.0
+            obs, _ = self._env.reset()
+            state = self._get_or_add_state_index(obs)
+
+            while not terminated and not truncated:
+                if self._np_random.uniform(0, 1) < self._epsilon:
+                    # exploration
+                    action = self._env.action_space.sample()
+                else:
+                    # exploitation
+                    action = np.argmax(self._Q[state])
+                # act
+                new_obs, reward, terminated, truncated, info = self._env.step(action)
+                new_state = self._get_or_add_state_index(new_obs)
+                reward = float(reward)
+
+                # update Q table
+                self._Q[state, action] = self._Q[state, action] + self._alpha * (
+                        reward + self._gamma * np.max(self._Q[new_state]) - self._Q[state, action]
+                )
+
+                state = new_state
+                total_rewards += reward
+
+            if verbose and episode % 100 == 0:
+                print(f"Episode: {episode}, Total Reward: {total_rewards}, States: {self.n_states}")
+        self._env.close()
+
+    def predict(self, obs: Mapping[str, Any]) -> np.int64:
+        """
+        Predicts the best action at a given observation.
+        The first action is predicted for observations of states that have not been visited.
+        :param obs: current observation
+        :return: action
+        """
+        key = self._encoder.encode(obs)
+        if key not in self._state_indices:
+            return np.int64(0)
+        return np.argmax(self._Q[self._state_indices[key]])
+
+    def _get_or_add_state_index(self, obs: Mapping[str, Any]) -> int:
+        """
+        Gets the row index of the Q table of an observation, a row is added if the state has not been visited.
+        The capacity of the Q table is doubled if it is exhausted.
+        :param obs: observation
+        :return: row index
+        """
+        key = self._encoder.encode(obs)
+        state_index = self._state_indices.get(key)
+        if state_index is None:
+            state_index = len(self._state_indices)
+            if state_index == self._Q.shape[0]:
+                self._Q = np.concatenate([self._Q, np.zeros_like(self._Q)])
+            self._state_indices[key] = state_index
+        return state_index
@@ -0,0 +1,97 @@
+from typing import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from .graph_of_thoughts_mdp import GraphOfThoughtsMdp
+from ..env import ActionType
+
+
+class ValueIteration:
+    """
+    Implementation of the value iteration algorithm for the finite horizon of a graph of thoughts MDP.
+    The values of all states are updated at once for each remaining number of steps,
+    hence, the optimal policy depends on the number of steps taken, like the truncation of the environment.
+    """
+
+    _mdp: GraphOfThoughtsMdp
+    """The MDP to solve"""
+
+    _horizon: int
+    """The maximum number of steps"""
+
+    _gamma: float
+    """The discount factor"""
+
+    _values: npt.NDArray[np.float64]
+    """The optimal values by number of steps taken and state"""
+
+    _policy: npt.NDArray[np.int64]
+    """The optimal actions by number of steps taken and state"""
+
+    @property
+    def mdp(self) -> GraphOfThoughtsMdp:
+        """The solved MDP"""
+        return self._mdp
+
+    @property
+    def values(self) -> npt.NDArray[np.float64]:
+        """The optimal values by number of steps taken and state"""
+        return self._values
+
+    @property
+    def policy(self) -> npt.NDArray[np.int64]:
+        """The optimal actions by number of steps taken and state"""
+        return self._policy
+
+    def __init__(self, mdp: GraphOfThoughtsMdp, horizon: int, gamma: float = 1.0) -> None:
+        """
+        Instantiates a new value iteration algorithm.
+        :param mdp: MDP to solve
+        :param horizon: maximum number of steps, the episode is truncated afterward
+        :param gamma: discount factor
+        """
+        if horizon < 1:
+            raise ValueIterationException('Horizon must be positive')
+        self._mdp = mdp
+        self._horizon = horizon
+        self._gamma = gamma
+        self._values = np.zeros((horizon + 1, mdp.n_states), dtype=np.float64)
+        self._policy = np.zeros((horizon, mdp.n_states), dtype=np.int64)
+
+    def solve(self) -> None:
+        """
+        Solves the MDP by backward induction from the truncation of the episode.
+        """
+        next_states = self._mdp.next_states
+        is_terminal = next_states < 0
+        next_state_indices = np.where(is_terminal, 0, next_states)
+        invalid_penalty = np.where(self._mdp.valid_actions, 0.0, -np.inf)
+        for n_steps in range(self._horizon - 1, -1, -1):
+            next_values = np.where(is_terminal, 0.0, self._values[n_steps + 1][next_state_indices])
+            q_values = self._mdp.rewards + self._gamma * next_values + invalid_penalty
+            self._policy[n_steps] = np.argmax(q_values, axis=1)
+            self._values[n_steps] = np.max(q_values, axis=1)
+
+    def predict(self, layer_operations: Sequence[int], n_steps: int) -> np.int64:
+        """
+        Predicts the optimal action at a given state.
+        Once the horizon is reached, the environment truncates the episode on any action, hence, stop is predicted.
+        :param layer_operations: encoded operations of the layers
+        :param n_steps: number of steps taken
+        :return: action
+        """
+        if n_steps < 0:
+            raise ValueIterationException(f'Number of steps must not be negative: {n_steps}')
+        if n_steps >= self._horizon:
+            return np.int64(ActionType.STOP.value)
+        return np.int64(self._policy[n_steps, self._mdp.state_index(layer_operations)])
+
+
+class ValueIterationException(Exception):
+    """
+    An exception that is raised in context of the value iteration algorithm.
+    """
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
@@ -0,0 +1,151 @@
+from random import Random
+from typing import Dict
+
+import numpy as np
+
+from .graph_of_thoughts_mdp import GraphOfThoughtsMdp
+from .value_iteration import ValueIteration, ValueIterationException
+from ..env import GraphObservationComponent
+from ..env.graph_of_thoughts_env import ObsType, ActType, create_observation_space
+from ..experiment import Experiment
+from ..experiment.experiment_task_type import ExperimentTaskType
+from ..language_model import SeededSimulatedLanguageModel
+from ..space import OrdinalDiscreteSpace
+
+
+class ValueIterationAgent:
+    """
+    An agent acting by the optimal policy of the graph of thoughts MDP of an experiment.
+    The MDP of each observed complexity is solved once, averaged over generated initial states of that complexity.
+    The observations must contain the complexity and the graph operations,
+    the number of steps taken is tracked by the agent and reset whenever an observation without layers is acted on.
+    """
+
+    _experiment: Experiment
+    """The experiment"""
+
+    _n_init_states: int
+    """The number of initial states to average the MDP of a complexity over"""
+
+    _init_state_seed: int
+    """The seed for the generation of the initial states"""
+
+    _min_branch_probability: float
+    """The minimum probability of a branch of answers to be followed"""
+
+    _aggregate_outcomes: bool
+    """Whether the answers are aggregated by their number of correct answers"""
+
+    _gamma: float
+    """The discount factor"""
+
+    _complexities: Dict[float, int]
+    """The complexities by their observed representation"""
+
+    _absent_operation: int
+    """The observed representation of an absent layer operation"""
+
+    _solutions: Dict[int, ValueIteration]
+    """The solved MDPs by complexity"""
+
+    _n_steps: int
+    """The number of steps taken in the current episode"""
+
+    def __init__(
+            self,
+            experiment: Experiment,
+            n_init_states: int = 4,
+            init_state_seed: int = 0,
+            gamma: float = 1.0,
+            min_branch_probability: float = 0.0,
+            aggregate_outcomes: bool = True
+    ) -> None:
+        """
+        Instantiates a new value iteration agent.
+        :param experiment: experiment to act in
+        :param n_init_states: number of initial states to average the MDP of a complexity over
+        :param init_state_seed: seed for the generation of the initial states
+        :param gamma: discount factor
+        :param min_branch_probability: minimum probability of a branch of answers to be followed
+        :param aggregate_outcomes: whether the answers are aggregated by their number of correct answers,
+            otherwise all combinations of answers are enumerated, which is exponential in the breadth
+        """
+        if n_init_states < 1:
+            raise ValueIterationException('Number of initial states must be positive')
+        self._experiment = experiment
+        self._n_init_states = n_init_states
+        self._init_state_seed = init_state_seed
+        self._gamma = gamma
+        self._min_branch_probability = min_branch_probability
+        self._aggregate_outcomes = aggregate_outcomes
+        config = experiment.config
+        observation_space = create_observation_space(
+                len(config.task.operations), config.max_depth, config.max_breadth, config.max_complexity, 0, config.seed
+        )
+        complexity_space = observation_space.spaces[GraphObservationComponent.COMPLEXITY.value]
+        if not isinstance(complexity_space, OrdinalDiscreteSpace):
+            raise ValueIterationException('Complexity space must be ordinal discrete')
+        # the representations are compared exactly, as the observations are transformed equally
+        self._complexities = {
+            float(complexity_space.transform(complexity)[0]): complexity
+            for complexity in range(complexity_space.discrete_low, complexity_space.discrete_high + 1)
+        }
+        self._absent_operation = len(config.task.operations)
+        self._solutions = {}
+        self._n_steps = 0
+
+    def solve(self, complexity: int) -> ValueIteration:
+        """
+        Solves the MDP of a complexity if it has not been solved yet.
+        :param complexity: complexity to solve the MDP of
+        :return: solved MDP
+        """
+        if complexity not in self._solutions:
+            config = self._experiment.config
+            task_type = config.task_type if config.task_type is not None else ExperimentTaskType.from_task(config.task)
+            language_model = config.lm_simulation_type.get_factory_function(task_type)(config.seed, config.extra_args)
+            if not isinstance(language_model, SeededSimulatedLanguageModel):
+                raise ValueIterationException('Language model must be a seeded simulated language model')
+            rnd = Random(self._init_state_seed + complexity)
+            init_states = [
+                config.generate_init_state(rnd, [complexity], config.task)[1] for _ in range(self._n_init_states)
+            ]
+            mdp = GraphOfThoughtsMdp(
+                    task=config.task,
+                    language_model=language_model,
+                    complexity=complexity,
+                    init_states=init_states,
+                    max_depth=config.max_depth,
+                    max_breadth=config.max_breadth,
+                    divergence_cutoff_factor=config.divergence_cutoff_factor,
+                    max_complexity=config.max_complexity,
+                    max_operations=config.max_operations,
+                    reward_version=config.reward_version,
+                    min_branch_probability=self._min_branch_probability,
+                    aggregate_outcomes=self._aggregate_outcomes
+            )
+            value_iteration = ValueIteration(mdp, config.max_steps, self._gamma)
+            value_iteration.solve()
+            self._solutions[complexity] = value_iteration
+        return self._solutions[complexity]
+
+    def act(self, obs: ObsType) -> ActType:
+        """
+        Acts optimally on an observation, intended to be passed as agent call to the agent evaluation.
+        :param obs: observation
+        :return: action
+        """
+        components = {GraphObservationComponent.COMPLEXITY.value, GraphObservationComponent.GRAPH_OPERATIONS.value}
+        if not components.issubset(obs.keys()):
+            raise ValueIterationException(f'Observation must contain the components {sorted(components)}')
+        observed_complexity = float(np.asarray(obs[GraphObservationComponent.COMPLEXITY.value]).reshape(-1)[0])
+        if observed_complexity not in self._complexities:
+            raise ValueIterationException(f'Observed complexity is not in the observation space: {observed_complexity}')
+        complexity = self._complexities[observed_complexity]
+        graph_operations = np.asarray(obs[GraphObservationComponent.GRAPH_OPERATIONS.value])
+        layer_operations = graph_operations[graph_operations != self._absent_operation].tolist()
+        if len(layer_operations) == 0:
+            self._n_steps = 0
+        action = self.solve(complexity).predict(layer_operations, self._n_steps)
+        self._n_steps += 1
+        return action
@@ -0,0 +1,174 @@
+from typing import Optional, Any
+
+import numpy as np
+import numpy.typing as npt
+from gymnasium.vector.utils import spaces
+from stable_baselines3.common.vec_env import VecEnv
+from stable_baselines3.common.vec_env.base_vec_env import VecEnvObs
+
+from .observation_encoder import ObservationEncoder
+from .q_learning import QLearningException
+
+
+class VecQLearning:
+    """
+    Implementation of the Q-learning algorithm stepping a vectorized environment.
+    The actions of all environments are selected at once, all environments are stepped in a single call
+    and the Q table is updated once per step of all environments.
+    The updates of state-action pairs visited by multiple environments in the same step are averaged,
+    as they are computed from the same Q table, hence, the learning rate does not grow with the number of environments.
+    Dictionary observations are encoded into integer keys, the Q table has a row per key,
+    hence, the observations should be filtered to few components.
+    """
+
+    _env: VecEnv
+    """The vectorized environment"""
+
+    _seed: int
+    """The seed for the random number generator"""
+
+    _np_random: np.random.Generator
+    """The random number generator"""
+
+    _alpha: float
+    """The learning rate"""
+
+    _gamma: float
+    """The discount factor"""
+
+    _epsilon: float
+    """The exploration rate"""
+
+    _encoder: Optional[ObservationEncoder]
+    """The encoder of dictionary observations, absent for discrete observations"""
+
+    _Q: npt.NDArray[np.float32]
+    """The Q table"""
+
+    @property
+    def Q(self) -> npt.NDArray[np.float32]:
+        """The Q table"""
+        return self._Q
+
+    @property
+    def n_envs(self) -> int:
+        """The number of environments"""
+        return self._env.num_envs
+
+    @property
+    def encoder(self) -> Optional[ObservationEncoder]:
+        """The encoder of dictionary observations, absent for discrete observations"""
+        return self._encoder
+
+    def __init__(
+            self,
+            env: VecEnv,
+            alpha: float,
+            gamma: float,
+            epsilon: float,
+            seed: int
+    ) -> None:
+        """
+        Instantiates a new vectorized Q-learning algorithm.
+        :param env: vectorized environment with discrete or dictionary observations and discrete actions,
+            e.g. a graph of thoughts vectorized environment
+        :param alpha: learning rate
+        :param gamma: discount factor
+        :param epsilon: exploration rate
+        :param seed: seed, the environment at index i is seeded with seed + i
+        """
+        self._env = env
+        self._seed = seed
+        self._np_random = np.random.default_rng(seed=seed)
+        self._alpha = alpha
+        self._gamma = gamma
+        self._epsilon = epsilon
+        observation_space = env.observation_space
+        action_space = env.action_space
+        n_states: int
+        if isinstance(observation_space, spaces.Discrete):
+            self._encoder = None
+            n_states = int(observation_space.n)
+        elif isinstance(observation_space, spaces.Dict):
+            self._encoder = ObservationEncoder(observation_space)
+            n_states = self._encoder.n_keys
+        else:
+            raise QLearningException('Observation space must be discrete or a dictionary')
+        if not isinstance(action_space, spaces.Discrete):
+            raise QLearningException('Action space must be discrete')
+        self._Q = np.zeros((n_states, int(action_space.n)), dtype=np.float32)
+        self._env.seed(seed)
+
+    def learn(self, total_episodes: int, verbose: bool = False) -> None:
+        """
+        Executes the learning process for a given number of episodes.
+        The episodes are distributed over the environments, hence, the last step may complete more episodes than given.
+        The environments are reset automatically by the vectorized environment at the end of their episodes.
+        :param total_episodes: total episodes to train on
+        :param verbose: whether to log verbosely
+        """
+        n_envs = self.n_envs
+        n_actions = self._Q.shape[1]
+        states = self._encode(self._env.reset())
+        total_rewards = np.zeros(n_envs, dtype=np.float64)
+        episode = 0
+
+        while episode < total_episodes:
+            # exploration or exploitation of all environments
+            is_exploration = self._np_random.uniform(0, 1, size=n_envs) < self._epsilon
+            random_actions = self._np_random.integers(n_actions, size=n_envs)
+            actions = np.where(is_exploration, random_actions, np.argmax(self._Q[states], axis=1))
+
+            # act in all environments at once
+            observations, step_rewards, dones, infos = self._env.step(actions)
+            rewards = np.asarray(step_rewards, dtype=np.float32)
+            total_rewards += rewards
+            reset_states = self._encode(observations)
+            new_states = reset_states.copy()
+            for i in np.flatnonzero(dones):
+                # the observation of a finished episode is the first observation of the next episode
+                new_states[i] = self._encode_single(infos[i]['terminal_observation'])
+                if verbose and episode % 100 == 0:
+                    print(f"Episode: {episode}, Total Reward: {total_rewards[i]}")
+                episode += 1
+                total_rewards[i] = 0.0
+
+            # update Q table
+            td_errors = rewards + self._gamma * np.max(self._Q[new_states], axis=1) - self._Q[states, actions]
+            pairs, pair_indices = np.unique(states * n_actions + actions, return_inverse=True)
+            mean_td_errors = np.bincount(pair_indices, weights=td_errors) / np.bincount(pair_indices)
+            q_values = self._Q.reshape(-1)
+            q_values[pairs] += (self._alpha * mean_td_errors).astype(np.float32)
+
+            states = reset_states
+        self._env.close()
+
+    def _encode(self, observations: VecEnvObs) -> npt.NDArray[np.int64]:
+        """
+        Encodes the observations of all environments into their states.
+        :param observations: observations of all environments
+        :return: states
+        """
+        if self._encoder is None:
+            return np.asarray(observations, dtype=np.int64).reshape(self.n_envs)
+        if not isinstance(observations, dict):
+            raise QLearningException('Observations must be dictionaries')
+        return self._encoder.encode_batch(observations)
+
+    def _encode_single(self, observation: Any) -> np.int64:
+        """
+        Encodes the observation of a single environment into its state.
+        :param observation: observation of a single environment
+        :return: state
+        """
+        if self._encoder is None:
+            return np.int64(np.asarray(observation).reshape(-1)[0])
+        return np.int64(self._encoder.encode(observation))
+
+    def predict(self, state: np.int64) -> np.int64:
+        """
+        Predicts the best action at a given state.
+        :param state: current state
+        :return: action
+        """
+        return np.argmax(self._Q[state])
@@ -13,4 +13,4 @@ class MultiDiscreteSpace(TransformingSpace[Sequence[int], npt.NDArray[np.int64]]
     """
 
     def transform(self, value: Sequence[int]) -> npt.NDArray[np.int64]:
-        return np.array(value, dtype=np.int64)
+        return np.asarray(value, dtype=np.int64)
@@ -1,3 +1,5 @@
+from typing import Any
+
 import numpy as np
 import numpy.typing as npt
 from gymnasium.vector.utils import spaces
@@ -52,6 +54,26 @@ class OrdinalDiscreteSpace(TransformingSpace[int, npt.NDArray[ORDINAL_DISCRETE_T
         scaled_value = (((value - self._low) * (SCALED_HIGH - SCALED_LOW)) / (self._high - self._low)) + SCALED_LOW
         return np.array([scaled_value], dtype=ORDINAL_DISCRETE_TYPE)
 
+    def batch_transform(self, values: npt.NDArray[np.int64]) -> npt.NDArray[ORDINAL_DISCRETE_TYPE]:
+        """
+        Transforms a batch of values at once.
+        :param values: values to transform
+        :return: transformed values of shape (n, 1)
+        """
+        scaled_values = (((values - self._low) * (SCALED_HIGH - SCALED_LOW)) / (self._high - self._low)) + SCALED_LOW
+        return scaled_values.astype(ORDINAL_DISCRETE_TYPE).reshape(-1, 1)
+
     def inverse_transform(self, value: float) -> int:
         unscaled_value = self._low + (value - SCALED_LOW) * (self._high - self._low) / (SCALED_HIGH - SCALED_LOW)
-        return int(unscaled_value)
\ No newline at end of file
+        return round(unscaled_value)
+
+    def batch_inverse_transform(self, values: npt.NDArray[Any]) -> npt.NDArray[np.int64]:
+        """
+        Inversely transforms a batch of values at once.
+        :param values: transformed values
+        :return: values
+        """
+        unscaled_values = self._low + (np.asarray(values, dtype=np.float64) - SCALED_LOW) * (
+                self._high - self._low) / (SCALED_HIGH - SCALED_LOW)
+        discrete_values: npt.NDArray[np.int64] = np.rint(unscaled_values).astype(np.int64)
+        return discrete_values
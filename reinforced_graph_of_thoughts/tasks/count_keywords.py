@@ -1,4 +1,3 @@
-import re
 from collections import Counter
 from typing import Mapping, Callable, Set, Sequence
 
@@ -7,6 +6,7 @@ from pure_graph_of_thoughts.api.operation import PromptOperation, OperationType,
     absolute_complexity, ScoreExecOperation, ExecOperation
 from pure_graph_of_thoughts.api.state import State
 from pure_graph_of_thoughts.api.task import Evaluator, Task
+from .keyword_matcher import KeywordMatcher
 
 
 def validate_op_split(previous_state: State, current_state: State, output_states: Sequence[State]) -> bool:
@@ -200,14 +200,7 @@ def _count_keywords(keywords: Set[str], text: str) -> Mapping[str, int]:
     :param text: text to search for keywords in
     :return: count result
     """
-    counter: Counter[str] = Counter()
-    for keyword in keywords:
-        matches = re.findall(rf'{re.escape(keyword)}', text, flags=re.IGNORECASE)
-        count = len(matches)
-        if count > 0:
-            counter.update({keyword: count})
-
-    return counter
+    return KeywordMatcher(keywords).count(text)
 
 
 def count_number_of_count_errors(keywords: Set[str], text: str, current_count: Mapping[str, int]) -> int:
@@ -233,6 +226,7 @@ def create_score_op_count(keywords: Set[str]) -> Callable[[float, State, State,
     :param keywords: set of keywords
     :return: score operation for the count operation
     """
+    keyword_matcher = KeywordMatcher(keywords)
 
     def score_op_count(cumulative_score: float, previous_state: State, current_state: State,
                        output_states: Sequence[State]) -> float:
@@ -248,8 +242,8 @@ def create_score_op_count(keywords: Set[str]) -> Callable[[float, State, State,
             return -1.0
         current_count = current_state['counts'] if 'counts' in current_state else None
         previous_count = (
-            _count_keywords(keywords, previous_state['text']) if 'text' in previous_state
-            else _count_keywords(keywords, ' '.join(previous_state['texts'])) if 'texts' in previous_state
+            keyword_matcher.count(previous_state['text']) if 'text' in previous_state
+            else keyword_matcher.count(' '.join(previous_state['texts'])) if 'texts' in previous_state
             else None
         )
         if current_count is not None and previous_count is not None and current_count == previous_count:
@@ -304,12 +298,13 @@ def _create_keep_best_from_10(keywords: Set[str]) -> ExecOperation:
 
 def create_count_keywords_task(keywords: Set[str], op_count: PromptOperation) -> Task:
     op_keep_best_from_10 = _create_keep_best_from_10(keywords)
+    keyword_matcher = KeywordMatcher(keywords)
     return Task(
         operations=[op_count, op_split, op_merge, op_branch_10, op_keep_best_from_10],
         evaluator=Evaluator(
             lambda initial_state, state: 'text' in initial_state
                                          and 'counts' in state
-                                         and _count_keywords(keywords, initial_state['text']) == state['counts']
+                                         and keyword_matcher.count(initial_state['text']) == state['counts']
         )
     )
 
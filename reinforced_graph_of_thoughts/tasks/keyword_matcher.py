@@ -0,0 +1,131 @@
+from collections import Counter
+from functools import lru_cache
+from typing import Sequence, Dict, List, Iterable
+
+
+@lru_cache(maxsize=None)
+def _fold_character(character: str) -> str:
+    """
+    Folds the case of a character into a single character.
+    Like case-insensitive regular expressions, the simple lowercase mapping is used,
+    such that characters with equal uppercase forms (e.g. 'ı' and 'i') are folded equally.
+    :param character: character to fold
+    :return: folded character
+    """
+    folded = character.lower()[0]
+    upper = folded.upper()
+    if len(upper) == 1 and len(upper.lower()) == 1:
+        return upper.lower()
+    return folded
+
+
+def _fold_case(text: str) -> str:
+    """
+    Folds the case of a text character by character, such that the positions of the text are retained.
+    :param text: text to fold
+    :return: folded text
+    """
+    return ''.join(map(_fold_character, text))
+
+
+class KeywordMatcher:
+    """
+    A matcher counting the case-insensitive occurrences of a set of keywords in a single pass over a text.
+    The keywords are compiled once into an Aho-Corasick automaton.
+    Like a separate regular expression search per keyword, the occurrences of each keyword are counted without overlaps,
+    while occurrences of different keywords may overlap.
+    """
+
+    _keywords: Sequence[str]
+    _patterns: Sequence[str]
+    _keyword_patterns: Sequence[int]
+    _transitions: List[Dict[str, int]]
+    _failures: List[int]
+    _outputs: List[List[int]]
+
+    @property
+    def keywords(self) -> Sequence[str]:
+        """The keywords to count"""
+        return self._keywords
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        """
+        Instantiates a new keyword matcher.
+        :param keywords: keywords to count
+        """
+        self._keywords = list(keywords)
+        pattern_indices: Dict[str, int] = {}
+        for keyword in self._keywords:
+            pattern_indices.setdefault(_fold_case(keyword), len(pattern_indices))
+        self._patterns = list(pattern_indices.keys())
+        self._keyword_patterns = [pattern_indices[_fold_case(keyword)] for keyword in self._keywords]
+        self._transitions = [{}]
+        self._failures = [0]
+        self._outputs = [[]]
+        for pattern_index, pattern in enumerate(self._patterns):
+            self._insert(pattern, pattern_index)
+        self._link_failures()
+
+    def count(self, text: str) -> Counter[str]:
+        """
+        Counts the occurrences of the keywords in a text.
+        :param text: text to search for keywords in
+        :return: counts of the keywords occurring at least once, in order of the keywords
+        """
+        pattern_counts = [0 for _ in self._patterns]
+        next_starts = [0 for _ in self._patterns]
+        for pattern_index, pattern in enumerate(self._patterns):
+            if len(pattern) == 0:
+                # an empty keyword matches at every position, including the end of the text
+                pattern_counts[pattern_index] = len(text) + 1
+
+        state = 0
+        for position, character in enumerate(_fold_case(text)):
+            while state > 0 and character not in self._transitions[state]:
+                state = self._failures[state]
+            state = self._transitions[state].get(character, 0)
+            for pattern_index in self._outputs[state]:
+                start = position - len(self._patterns[pattern_index]) + 1
+                if start >= next_starts[pattern_index]:
+                    pattern_counts[pattern_index] += 1
+                    next_starts[pattern_index] = position + 1
+
+        counter: Counter[str] = Counter()
+        for keyword, pattern_index in zip(self._keywords, self._keyword_patterns):
+            count = pattern_counts[pattern_index]
+            if count > 0:
+                counter.update({keyword: count})
+        return counter
+
+    def _insert(self, pattern: str, pattern_index: int) -> None:
+        """
+        Inserts a pattern into the trie of the automaton.
+        :param pattern: case-folded pattern
+        :param pattern_index: index of the pattern
+        """
+        if len(pattern) == 0:
+            return
+        state = 0
+        for character in pattern:
+            if character not in self._transitions[state]:
+                self._transitions.append({})
+                self._failures.append(0)
+                self._outputs.append([])
+                self._transitions[state][character] = len(self._transitions) - 1
+            state = self._transitions[state][character]
+        self._outputs[state].append(pattern_index)
+
+    def _link_failures(self) -> None:
+        """
+        Links the failure transitions of the automaton in breadth-first order
+        and merges the outputs of each state with the outputs of its failure state.
+        """
+        queue = list(self._transitions[0].values())
+        for state in queue:
+            for character, next_state in self._transitions[state].items():
+                failure = self._failures[state]
+                while failure > 0 and character not in self._transitions[failure]:
+                    failure = self._failures[failure]
+                self._failures[next_state] = self._transitions[failure].get(character, 0)
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._failures[next_state]]
+                queue.append(next_state)
@@ -0,0 +1,26 @@
+import pytest
+from pure_graph_of_thoughts.api.graph.operation import GraphOfOperations
+
+from reinforced_graph_of_thoughts.baseline import BaselineConfig, BaselineResultCache, BaselineStrategyException, \
+    RandomBaselineStrategy
+from reinforced_graph_of_thoughts.baseline.model import BaselineIterationResult
+from reinforced_graph_of_thoughts.tasks.sort_list import sort_list_task
+
+
+def _evaluate_graph(graph_of_operations: GraphOfOperations, iteration: int) -> BaselineIterationResult:
+    raise NotImplementedError()
+
+
+def test_result_cache_requires_evaluation_key() -> None:
+    config = BaselineConfig(
+            max_depth=8,
+            max_breadth=8,
+            divergence_cutoff_factor=0.5,
+            operations=sort_list_task.operations,
+            evaluate_graph=_evaluate_graph,
+            seed=0,
+            result_cache=BaselineResultCache()
+    )
+
+    with pytest.raises(BaselineStrategyException):
+        RandomBaselineStrategy(config)
@@ -0,0 +1,68 @@
+import threading
+from random import Random
+from typing import Set, Sequence
+
+from pure_graph_of_thoughts.api.language_model import LanguageModel, Prompt
+from pure_graph_of_thoughts.api.state import State
+
+from reinforced_graph_of_thoughts.controller import ContinuousGraphController
+from reinforced_graph_of_thoughts.experiment import generate_init_state_sum_list
+from reinforced_graph_of_thoughts.language_model.simulated_chat_gpt_sum_list import \
+    create_simulated_deterministic_chat_gpt_sum_list
+from reinforced_graph_of_thoughts.tasks.sum_list import sum_list_task
+
+MAX_CONCURRENCY = 4
+
+
+class _ThreadRecordingLanguageModel(LanguageModel):
+    """
+    A language model answering prompts one at a time and recording the threads prompting it.
+    """
+
+    def __init__(self, language_model: LanguageModel) -> None:
+        self._language_model = language_model
+        self._lock = threading.Lock()
+        self.threads: Set[threading.Thread] = set()
+
+    def prompt(self, prompt: Prompt, state: State) -> State:
+        with self._lock:
+            self.threads.add(threading.current_thread())
+            return self._language_model.prompt(prompt, state)
+
+
+def _create_controller(language_model: LanguageModel, max_concurrency: int) -> ContinuousGraphController:
+    rnd = Random(0)
+    return ContinuousGraphController(
+            language_model=language_model,
+            generate_init_state=lambda: generate_init_state_sum_list(rnd, [32], sum_list_task),
+            max_depth=8,
+            max_breadth=16,
+            divergence_cutoff_factor=0.5,
+            max_complexity=64,
+            max_operations=64,
+            max_concurrency=max_concurrency
+    )
+
+
+def _append_layers(controller: ContinuousGraphController) -> Sequence[State]:
+    operations = {operation.name: operation for operation in sum_list_task.operations}
+    for name in ['split', 'split', 'split', 'sum', 'merge', 'merge', 'merge']:
+        assert controller.append_layer(operations[name]).is_valid
+    assert controller.sink_thoughts is not None
+    return [thought.state for thought in controller.sink_thoughts]
+
+
+def test_layers_reuse_worker_threads() -> None:
+    language_model = _ThreadRecordingLanguageModel(create_simulated_deterministic_chat_gpt_sum_list(0, {}))
+    controller = _create_controller(language_model, MAX_CONCURRENCY)
+    sequential_controller = _create_controller(create_simulated_deterministic_chat_gpt_sum_list(0, {}), 1)
+
+    sink_states = _append_layers(controller)
+    controller.close()
+
+    assert sink_states == _append_layers(sequential_controller)
+    # layers of a single operation node are processed by the calling thread,
+    # all other layers by the same worker threads, which are joined once the controller is closed
+    worker_threads = language_model.threads - {threading.current_thread()}
+    assert 1 < len(worker_threads) <= MAX_CONCURRENCY
+    assert not any(thread.is_alive() for thread in worker_threads)
@@ -0,0 +1,46 @@
+import asyncio
+
+import numpy as np
+
+from reinforced_graph_of_thoughts.env import GraphObservationComponent, GraphStepRewardVersion
+from reinforced_graph_of_thoughts.env.graph_of_thoughts_env import ObsType, ActType
+from reinforced_graph_of_thoughts.experiment import Experiment, ExperimentConfiguration, LanguageModelSimulationType, \
+    async_evaluate_agent, generate_init_state_sum_list
+from reinforced_graph_of_thoughts.tasks.sum_list import sum_list_task
+
+
+def _create_experiment() -> Experiment:
+    return Experiment(ExperimentConfiguration(
+            seed=0,
+            task=sum_list_task,
+            reward_version=GraphStepRewardVersion.V7,
+            max_steps=8,
+            observation_filter={component for component in GraphObservationComponent},
+            max_depth=4,
+            max_breadth=4,
+            divergence_cutoff_factor=0.5,
+            train_complexities=[32],
+            eval_complexities=[16, 32],
+            max_complexity=64,
+            max_operations=32,
+            lm_simulation_type=LanguageModelSimulationType.REALISTIC,
+            generate_init_state=generate_init_state_sum_list
+    ))
+
+
+# the next action after the previous action, the initial previous action is padded
+_NEXT_ACTIONS = {5: 3, 3: 2, 2: 4}
+
+
+def _split_sum_merge(obs: ObsType) -> ActType:
+    return np.int64(_NEXT_ACTIONS.get(int(obs['prev_actions'][-1]), 0))
+
+
+def test_episodes_do_not_depend_on_concurrency() -> None:
+    experiment = _create_experiment()
+
+    sequential = asyncio.run(async_evaluate_agent(experiment, 'sequential', 3, _split_sum_merge, 1))
+    concurrent = asyncio.run(async_evaluate_agent(experiment, 'concurrent', 3, _split_sum_merge, 4))
+
+    assert sequential.episodes == concurrent.episodes
+
@@ -0,0 +1,45 @@
+import os
+from random import Random
+from tempfile import TemporaryDirectory
+
+import pytest
+from pure_graph_of_thoughts.api.language_model import LanguageModel, Prompt, LanguageModelException
+from pure_graph_of_thoughts.api.state import State
+
+from reinforced_graph_of_thoughts.language_model import CachedLanguageModel, CachedLanguageModelMode
+
+PROMPT = Prompt('Sample a number as JSON.')
+STATE: State = {'list': [1, 2, 3]}
+
+
+class _RandomLanguageModel(LanguageModel):
+    """
+    A stochastic language model answering every prompt with a random number.
+    """
+
+    def __init__(self, seed: int) -> None:
+        self._random = Random(seed)
+
+    def prompt(self, prompt: Prompt, state: State) -> State:
+        return {'number': self._random.random()}
+
+
+def test_replay_repeated_prompts() -> None:
+    with TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'cache.sqlite')
+        recording = CachedLanguageModel(_RandomLanguageModel(0), path, mode=CachedLanguageModelMode.RECORD)
+        recorded_responses = [recording.prompt(PROMPT, STATE) for _ in range(3)]
+        recording.close()
+        replaying = CachedLanguageModel(None, path, mode=CachedLanguageModelMode.REPLAY)
+
+        replayed_responses = [replaying.prompt(PROMPT, STATE) for _ in range(3)]
+        # the recorded session did not contain a fourth occurrence
+        with pytest.raises(LanguageModelException):
+            replaying.prompt(PROMPT, STATE)
+        replaying.start_session()
+        restarted_response = replaying.prompt(PROMPT, STATE)
+        replaying.close()
+
+    assert len({response['number'] for response in recorded_responses}) == 3
+    assert replayed_responses == recorded_responses
+    assert restarted_response == recorded_responses[0]
@@ -0,0 +1,37 @@
+from reinforced_graph_of_thoughts.env import GraphObservationComponent, GraphStepRewardVersion
+from reinforced_graph_of_thoughts.experiment import Experiment, ExperimentConfiguration, LanguageModelSimulationType, \
+    evaluate_agent, generate_init_state_sum_list
+from reinforced_graph_of_thoughts.rl import ValueIterationAgent
+from reinforced_graph_of_thoughts.tasks.sum_list import sum_list_task
+
+MAX_STEPS = 20
+
+
+def _create_experiment() -> Experiment:
+    return Experiment(ExperimentConfiguration(
+            seed=0,
+            task=sum_list_task,
+            reward_version=GraphStepRewardVersion.V7,
+            max_steps=MAX_STEPS,
+            observation_filter={component for component in GraphObservationComponent},
+            max_depth=4,
+            max_breadth=4,
+            divergence_cutoff_factor=0.5,
+            train_complexities=[32],
+            eval_complexities=[32],
+            max_complexity=64,
+            max_operations=32,
+            lm_simulation_type=LanguageModelSimulationType.REALISTIC,
+            generate_init_state=generate_init_state_sum_list
+    ))
+
+
+def test_evaluate_agent_past_truncation() -> None:
+    experiment = _create_experiment()
+    agent = ValueIterationAgent(experiment, n_init_states=4)
+
+    evaluation = evaluate_agent(experiment, 'value iteration', 3, agent.act)
+
+    assert len(evaluation.episodes) == 3
+    # stopping is penalized, hence, the optimal policy is stepped until the environment truncates the episode
+    assert all(episode.length == MAX_STEPS + 1 for episode in evaluation.episodes)
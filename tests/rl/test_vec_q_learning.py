@@ -0,0 +1,59 @@
+from typing import Tuple, Dict, Any, Optional
+
+import numpy as np
+from gymnasium import Env
+from gymnasium.spaces import Discrete
+from gymnasium.wrappers import TimeLimit
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+from reinforced_graph_of_thoughts.rl import QLearning, VecQLearning
+
+N_STATES = 6
+
+
+class _ChainEnv(Env[np.int64, np.int64]):
+    """
+    A deterministic chain, moving left or right is penalized and reaching the right end terminates with a reward.
+    """
+
+    def __init__(self) -> None:
+        self.observation_space = Discrete(N_STATES)
+        self.action_space = Discrete(2)
+        self._state = 0
+
+    def reset(
+            self, *, seed: Optional[int] = None, options: Optional[Dict[str, Any]] = None
+    ) -> Tuple[np.int64, Dict[str, Any]]:
+        super().reset(seed=seed)
+        self._state = 0
+        return np.int64(self._state), {}
+
+    def step(self, action: np.int64) -> Tuple[np.int64, float, bool, bool, Dict[str, Any]]:
+        self._state = max(0, min(N_STATES - 1, self._state + (1 if action == 1 else -1)))
+        terminated = self._state == N_STATES - 1
+        return np.int64(self._state), 1.0 if terminated else -0.1, terminated, False, {}
+
+
+def _create_env() -> Env[np.int64, np.int64]:
+    return TimeLimit(_ChainEnv(), max_episode_steps=20)
+
+
+def test_single_env_matches_q_learning() -> None:
+    # greedy actions are drawn from the Q table only, hence, both algorithms visit the same transitions
+    q_learning = QLearning(_create_env(), alpha=0.5, gamma=0.9, epsilon=0.0, seed=0)
+    q_learning.learn(50)
+    vec_q_learning = VecQLearning(DummyVecEnv([_create_env]), alpha=0.5, gamma=0.9, epsilon=0.0, seed=0)
+    vec_q_learning.learn(50)
+
+    assert np.allclose(vec_q_learning.Q, q_learning.Q, atol=1e-5)
+
+
+def test_many_envs_stay_bounded() -> None:
+    vec_q_learning = VecQLearning(
+            DummyVecEnv([_create_env for _ in range(64)]), alpha=0.5, gamma=0.9, epsilon=0.1, seed=0
+    )
+    vec_q_learning.learn(2000)
+
+    # the returns are bounded by the terminal reward, hence, so are the converged Q values
+    assert np.max(np.abs(vec_q_learning.Q)) <= 1.0 + 1e-5
+    assert vec_q_learning.predict(np.int64(0)) == 1